@@ -0,0 +1,107 @@
+"""
+Нагрузочный бенчмарк API на синтетическом каталоге.
+
+Создает в БД из .env каталог из --menus меню, --submenus подменю в каждом
+и --dishes блюд в каждом подменю, прогоняет сценарии для всех маршрутов меню,
+подменю и блюд и печатает результаты в JSON. После прогона каталог удаляется.
+
+    python -m benchmarks --menus 20 --submenus 5 --dishes 20 --requests 300 --concurrency 10 \\
+        --output bench_output.json
+
+По умолчанию запросы выполняются внутри процесса через ASGI, что позволяет
+посчитать запросы к БД. С --base-url запросы идут на запущенный сервер,
+а db_statements_per_request не заполняется.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import time
+
+from cashews import cache
+from httpx import AsyncClient
+
+from benchmarks.generator import build_catalog, delete_catalog, insert_catalog
+from benchmarks.runner import run_scenario
+from benchmarks.scenarios import SCENARIOS, Context
+from my_app.config import async_session, engine
+from my_app.main_onion import app
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--menus', type=int, default=10)
+    parser.add_argument('--submenus', type=int, default=5)
+    parser.add_argument('--dishes', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--requests', type=int, default=200, help='измеряемых запросов на сценарий')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--scenarios', help='имена сценариев через запятую, по умолчанию все')
+    parser.add_argument('--base-url', help='адрес запущенного API вместо вызова приложения в процессе')
+    parser.add_argument('--cache',
+                        help='адрес бэкенда cashews (например, mem:// или redis://...), по умолчанию без кеша')
+    parser.add_argument('--output', help='файл для результатов, по умолчанию stdout')
+    return parser.parse_args()
+
+
+async def main(args: argparse.Namespace) -> dict:
+    scenarios = SCENARIOS
+    if args.scenarios:
+        names = set(args.scenarios.split(','))
+        scenarios = [scenario for scenario in SCENARIOS if scenario.name in names]
+
+    # Логирование SQL искажает задержки
+    engine.echo = False
+    if args.cache:
+        cache.setup(args.cache)
+
+    catalog = build_catalog(args.menus, args.submenus, args.dishes, args.seed)
+    async with async_session() as session:
+        await delete_catalog(args.seed, session)
+        started = time.perf_counter()
+        await insert_catalog(catalog, session)
+        seed_seconds = time.perf_counter() - started
+
+    ctx = Context(catalog, args.seed)
+    client_options = {'base_url': args.base_url} if args.base_url else {'app': app, 'base_url': 'http://bench'}
+    results = []
+    try:
+        async with AsyncClient(timeout=60, **client_options) as client:
+            for scenario in scenarios:
+                results.append(await run_scenario(client, scenario, ctx, args.requests, args.concurrency,
+                                                  count_db=not args.base_url))
+    finally:
+        async with async_session() as session:
+            await delete_catalog(args.seed, session)
+
+    return {
+        'commit': current_commit(),
+        'python': platform.python_version(),
+        'params': {
+            'menus': args.menus, 'submenus': args.submenus, 'dishes': args.dishes, 'seed': args.seed,
+            'requests': args.requests, 'concurrency': args.concurrency,
+            'target': args.base_url or 'asgi', 'cache': args.cache,
+        },
+        'seed_seconds': round(seed_seconds, 3),
+        'scenarios': results,
+    }
+
+
+if __name__ == '__main__':
+    arguments = parse_args()
+    report = json.dumps(asyncio.run(main(arguments)), indent=2)
+    if arguments.output:
+        with open(arguments.output, 'w') as output:
+            output.write(report)
+    else:
+        print(report)
@@ -0,0 +1,58 @@
+"""
+Сравнение двух результатов бенчмарка, например до и после изменения:
+
+    python -m benchmarks.compare base.json head.json
+
+Для каждого сценария печатает пропускную способность, p95 и число запросов
+к БД в обоих прогонах и относительное изменение.
+"""
+import argparse
+import json
+
+
+def change(before: float | None, after: float | None) -> str:
+    if not before or after is None:
+        return '-'
+    return f'{(after - before) / before * 100:+.1f}%'
+
+
+def compare(base: dict, head: dict) -> list[dict]:
+    head_scenarios = {result['scenario']: result for result in head['scenarios']}
+    rows = []
+    for before in base['scenarios']:
+        after = head_scenarios.get(before['scenario'])
+        if after is None:
+            continue
+        rows.append({
+            'scenario': before['scenario'],
+            'throughput_rps': (before['throughput_rps'], after['throughput_rps'],
+                               change(before['throughput_rps'], after['throughput_rps'])),
+            'p95_ms': (before['latency_ms']['p95'], after['latency_ms']['p95'],
+                       change(before['latency_ms']['p95'], after['latency_ms']['p95'])),
+            'db_statements': (before['db_statements_per_request'], after['db_statements_per_request'],
+                              change(before['db_statements_per_request'], after['db_statements_per_request'])),
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.compare', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('base')
+    parser.add_argument('head')
+    args = parser.parse_args()
+
+    with open(args.base) as base, open(args.head) as head:
+        rows = compare(json.load(base), json.load(head))
+
+    print(f'{"scenario":<22}{"rps":>28}{"p95, ms":>30}{"db statements":>22}')
+    for row in rows:
+        cells = [f'{row["scenario"]:<22}']
+        for key, width in (('throughput_rps', 28), ('p95_ms', 30), ('db_statements', 22)):
+            before, after, delta = row[key]
+            cells.append(f'{f"{before} -> {after} ({delta})":>{width}}')
+        print(''.join(cells))
+
+
+if __name__ == '__main__':
+    main()
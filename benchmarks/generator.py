@@ -0,0 +1,64 @@
+import random
+import uuid
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from my_app.models.models import Dish, Menu, SubMenu
+
+# asyncpg ограничивает запрос 32767 параметрами, у блюда их 6
+INSERT_BATCH = 5000
+
+
+def seeded_uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def title_prefix(seed: int) -> str:
+    # Все записи бенчмарка, включая созданные сценариями, находятся по этому префиксу
+    return f'Bench {seed} '
+
+
+def build_catalog(menus: int, submenus: int, dishes: int, seed: int) -> dict[str, list[dict]]:
+    """
+    Строит синтетический каталог: menus меню, по submenus подменю в каждом
+    и по dishes блюд в каждом подменю. Одинаковый seed дает одинаковые id,
+    названия и цены.
+
+    Returns:
+        dict[str, list[dict]]: Строки для таблиц menus, submenus и dishes.
+    """
+    rng = random.Random(seed)
+    catalog: dict[str, list[dict]] = {'menus': [], 'submenus': [], 'dishes': []}
+
+    for m in range(menus):
+        menu_id = seeded_uuid(rng)
+        catalog['menus'].append({'id': menu_id, 'title': f'{title_prefix(seed)}menu {m}',
+                                 'description': f'Bench menu description {m}'})
+        for s in range(submenus):
+            submenu_id = seeded_uuid(rng)
+            catalog['submenus'].append({'id': submenu_id, 'title': f'{title_prefix(seed)}submenu {m}-{s}',
+                                        'description': f'Bench submenu description {m}-{s}',
+                                        'menu_id': menu_id})
+            for d in range(dishes):
+                catalog['dishes'].append({'id': seeded_uuid(rng), 'title': f'{title_prefix(seed)}dish {m}-{s}-{d}',
+                                          'description': f'Bench dish description {m}-{s}-{d}',
+                                          'price': round(rng.uniform(50, 5000), 2), 'submenu_id': submenu_id})
+    return catalog
+
+
+async def insert_catalog(catalog: dict[str, list[dict]], session: AsyncSession) -> None:
+    for model, rows in ((Menu, catalog['menus']), (SubMenu, catalog['submenus']), (Dish, catalog['dishes'])):
+        for start in range(0, len(rows), INSERT_BATCH):
+            await session.execute(insert(model), rows[start:start + INSERT_BATCH])
+    await session.commit()
+
+
+async def delete_catalog(seed: int, session: AsyncSession) -> None:
+    """Удаляет меню каталога с подменю и блюдами, в том числе созданные сценариями."""
+    menu_ids = select(Menu.id).filter(Menu.title.startswith(title_prefix(seed)))
+    submenu_ids = select(SubMenu.id).filter(SubMenu.menu_id.in_(menu_ids))
+    await session.execute(delete(Dish).filter(Dish.submenu_id.in_(submenu_ids)))
+    await session.execute(delete(SubMenu).filter(SubMenu.menu_id.in_(menu_ids)))
+    await session.execute(delete(Menu).filter(Menu.id.in_(menu_ids)))
+    await session.commit()
@@ -0,0 +1,61 @@
+import asyncio
+import statistics
+import time
+
+from httpx import AsyncClient
+
+from benchmarks.scenarios import Context, Scenario
+from my_app.query_stats import track_queries
+
+
+def percentile(latencies: list[float], share: int) -> float:
+    if len(latencies) < 2:
+        return latencies[0] if latencies else 0.0
+    return statistics.quantiles(latencies, n=100, method='inclusive')[share - 1]
+
+
+async def run_scenario(client: AsyncClient, scenario: Scenario, ctx: Context,
+                       requests: int, concurrency: int, count_db: bool = True) -> dict:
+    """
+    Готовит requests запросов сценария, затем выполняет их в concurrency
+    параллельных потоках. Вспомогательные запросы подготовки не измеряются.
+
+    Returns:
+        dict: Пропускная способность, задержки p50/p95/p99 в миллисекундах,
+        ответы с ошибками по кодам и среднее число запросов к БД на HTTP-запрос.
+    """
+    prepared = [await scenario.build(client, ctx) for _ in range(requests)]
+    pending = iter(prepared)
+    latencies: list[float] = []
+    statements: list[int] = []
+    errors: dict[int, int] = {}
+
+    async def worker() -> None:
+        for method, path, payload in pending:
+            # ASGI-приложение выполняется в задаче клиента и видит этот замер
+            with track_queries() as queries:
+                started = time.perf_counter()
+                response = await client.request(method, path, json=payload)
+                latencies.append((time.perf_counter() - started) * 1000)
+            statements.append(queries.count)
+            if response.status_code >= 400:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    return {
+        'scenario': scenario.name,
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / wall, 2) if wall else 0.0,
+        'latency_ms': {
+            'mean': round(statistics.fmean(latencies), 3) if latencies else 0.0,
+            'p50': round(percentile(latencies, 50), 3),
+            'p95': round(percentile(latencies, 95), 3),
+            'p99': round(percentile(latencies, 99), 3),
+        },
+        'db_statements_per_request': round(statistics.fmean(statements), 2) if count_db and statements else None,
+    }
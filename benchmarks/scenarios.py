@@ -0,0 +1,156 @@
+import random
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import NamedTuple
+
+from httpx import AsyncClient
+
+from benchmarks.generator import title_prefix
+from my_app.main_onion import app
+
+
+class Context:
+    """Идентификаторы сгенерированного каталога и генератор уникальных названий."""
+
+    def __init__(self, catalog: dict[str, list[dict]], seed: int):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.menus = [str(menu['id']) for menu in catalog['menus']]
+        menu_of = {submenu['id']: str(submenu['menu_id']) for submenu in catalog['submenus']}
+        self.submenus = [(menu_of[submenu['id']], str(submenu['id'])) for submenu in catalog['submenus']]
+        self.dishes = [(menu_of[dish['submenu_id']], str(dish['submenu_id']), str(dish['id']))
+                       for dish in catalog['dishes']]
+
+    def title(self, kind: str) -> str:
+        return f'{title_prefix(self.seed)}{kind} {uuid.uuid4().hex}'
+
+    def menu(self) -> str:
+        return self.rng.choice(self.menus)
+
+    def submenu(self) -> tuple[str, str]:
+        return self.rng.choice(self.submenus)
+
+    def dish(self) -> tuple[str, str, str]:
+        return self.rng.choice(self.dishes)
+
+
+Request = tuple[str, str, dict | None]
+
+
+class Scenario(NamedTuple):
+    name: str
+    # Готовит измеряемый запрос до начала замера. Может выполнять вспомогательные
+    # запросы, например создать запись, которую сценарий удалит.
+    build: Callable[[AsyncClient, Context], Awaitable[Request]]
+
+
+def url(name: str, **params: str) -> str:
+    return app.url_path_for(name, **params)
+
+
+def body(ctx: Context, kind: str, **extra: str) -> dict:
+    return {'title': ctx.title(kind), 'description': f'Bench {kind} description', **extra}
+
+
+async def create(client: AsyncClient, name: str, payload: dict, **params: str) -> str:
+    response = await client.post(url(name, **params), json=payload)
+    response.raise_for_status()
+    return response.json()['id']
+
+
+async def get_menus(client, ctx):
+    return 'GET', url('get_menus'), None
+
+
+async def get_menus_with_all(client, ctx):
+    return 'GET', url('get_menus_with_all'), None
+
+
+async def get_menu(client, ctx):
+    return 'GET', url('get_menu', menu_id=ctx.menu()), None
+
+
+async def post_menu(client, ctx):
+    return 'POST', url('post_menu'), body(ctx, 'menu')
+
+
+async def patch_menu(client, ctx):
+    return 'PATCH', url('patch_menu', menu_id=ctx.menu()), body(ctx, 'menu')
+
+
+async def delete_menu(client, ctx):
+    menu_id = await create(client, 'post_menu', body(ctx, 'menu'))
+    return 'DELETE', url('delete_menu', menu_id=menu_id), None
+
+
+async def get_submenus(client, ctx):
+    return 'GET', url('get_submenus', menu_id=ctx.menu()), None
+
+
+async def get_submenu(client, ctx):
+    menu_id, submenu_id = ctx.submenu()
+    return 'GET', url('get_submenu', menu_id=menu_id, submenu_id=submenu_id), None
+
+
+async def post_submenu(client, ctx):
+    return 'POST', url('post_submenu', menu_id=ctx.menu()), body(ctx, 'submenu')
+
+
+async def patch_submenu(client, ctx):
+    menu_id, submenu_id = ctx.submenu()
+    return 'PATCH', url('patch_submenu', menu_id=menu_id, submenu_id=submenu_id), body(ctx, 'submenu')
+
+
+async def delete_submenu(client, ctx):
+    menu_id = ctx.menu()
+    submenu_id = await create(client, 'post_submenu', body(ctx, 'submenu'), menu_id=menu_id)
+    return 'DELETE', url('delete_submenu', menu_id=menu_id, submenu_id=submenu_id), None
+
+
+async def get_dishes(client, ctx):
+    menu_id, submenu_id = ctx.submenu()
+    return 'GET', url('get_dishes', menu_id=menu_id, submenu_id=submenu_id), None
+
+
+async def get_dish(client, ctx):
+    menu_id, submenu_id, dish_id = ctx.dish()
+    return 'GET', url('get_dish', menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id), None
+
+
+async def post_dish(client, ctx):
+    menu_id, submenu_id = ctx.submenu()
+    return 'POST', url('post_dish', menu_id=menu_id, submenu_id=submenu_id), body(ctx, 'dish', price='99.50')
+
+
+async def patch_dish(client, ctx):
+    menu_id, submenu_id, dish_id = ctx.dish()
+    return ('PATCH', url('patch_dish', menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id),
+            body(ctx, 'dish', price=f'{ctx.rng.uniform(50, 5000):.2f}'))
+
+
+async def delete_dish(client, ctx):
+    menu_id, submenu_id = ctx.submenu()
+    dish_id = await create(client, 'post_dish', body(ctx, 'dish', price='10.00'),
+                           menu_id=menu_id, submenu_id=submenu_id)
+    return 'DELETE', url('delete_dish', menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id), None
+
+
+# Все маршруты menu_endpoints, submenu_endpoints и dish_endpoints
+SCENARIOS = [
+    Scenario('get_menus', get_menus),
+    Scenario('get_menus_with_all', get_menus_with_all),
+    Scenario('get_menu', get_menu),
+    Scenario('post_menu', post_menu),
+    Scenario('patch_menu', patch_menu),
+    Scenario('delete_menu', delete_menu),
+    Scenario('get_submenus', get_submenus),
+    Scenario('get_submenu', get_submenu),
+    Scenario('post_submenu', post_submenu),
+    Scenario('patch_submenu', patch_submenu),
+    Scenario('delete_submenu', delete_submenu),
+    Scenario('get_dishes', get_dishes),
+    Scenario('get_dish', get_dish),
+    Scenario('post_dish', post_dish),
+    Scenario('patch_dish', patch_dish),
+    Scenario('delete_dish', delete_dish),
+]
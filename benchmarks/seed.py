@@ -0,0 +1,210 @@
+"""
+Заполнение БД синтетическим каталогом для нагрузочных тестов.
+
+Каталог из --menus меню, --submenus подменю и --dishes блюд распределяется
+по закону Ципфа с показателем --skew: первые меню и подменю получают большую
+часть блюд, остальные небольшие. При --skew 0 каталог равномерный. Одинаковые
+параметры и --seed дают одинаковые id, названия и цены.
+
+Строки загружаются через COPY пачками по --batch-size в --workers
+параллельных соединениях:
+
+    python -m benchmarks.seed --menus 100 --submenus 2000 --dishes 1000000 --skew 1.1 --replace
+
+Каталог удаляется так же, как каталог бенчмарка с тем же --seed.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import NamedTuple
+
+import asyncpg
+
+from benchmarks.generator import delete_catalog, seeded_uuid, title_prefix
+from my_app.config import (
+    DB_HOST,
+    DB_NAME,
+    DB_PASSWORD,
+    DB_PORT,
+    DB_USER,
+    async_session,
+    engine,
+)
+
+COLUMNS = {
+    'menus': ('id', 'title', 'description'),
+    'submenus': ('id', 'title', 'description', 'menu_id'),
+    'dishes': ('id', 'title', 'description', 'price', 'submenu_id'),
+}
+
+
+class Shape(NamedTuple):
+    menus: int
+    submenus: int
+    dishes: int
+    skew: float = 1.0
+
+
+def allocate(total: int, weights: list[float], minimum: int = 0) -> list[int]:
+    """
+    Делит total пропорционально weights методом наибольших остатков.
+
+    Raises:
+        ValueError: Если total не хватает, чтобы выдать каждому minimum.
+    """
+    rest = total - minimum * len(weights)
+    if rest < 0:
+        raise ValueError(f'{total} не делится на {len(weights)} частей по {minimum}')
+    scale = sum(weights)
+    shares = [rest * weight / scale for weight in weights]
+    counts = [int(share) for share in shares]
+    by_remainder = sorted(range(len(weights)), key=lambda i: shares[i] - counts[i], reverse=True)
+    for i in by_remainder[:rest - sum(counts)]:
+        counts[i] += 1
+    return [minimum + count for count in counts]
+
+
+def zipf_weights(count: int, skew: float) -> list[float]:
+    return [1 / (rank + 1) ** skew for rank in range(count)]
+
+
+def plan_catalog(shape: Shape) -> list[list[int]]:
+    """
+    Returns:
+        list[list[int]]: Количество блюд в каждом подменю каждого меню.
+        У каждого меню есть хотя бы одно подменю.
+    """
+    menu_weights = zipf_weights(shape.menus, shape.skew)
+    submenus = allocate(shape.submenus, menu_weights, minimum=1)
+    dishes = allocate(shape.dishes, menu_weights)
+    return [allocate(menu_dishes, zipf_weights(menu_submenus, shape.skew))
+            for menu_submenus, menu_dishes in zip(submenus, dishes)]
+
+
+def menu_records(plan: list[list[int]], seed: int) -> tuple[list[tuple], list[tuple]]:
+    """Строки menus и submenus. Генератор каждого меню свой, поэтому записи не зависят от порядка загрузки."""
+    prefix = title_prefix(seed)
+    menus, submenus = [], []
+    for m, dish_counts in enumerate(plan):
+        rng = random.Random(f'{seed}:{m}')
+        menu_id = seeded_uuid(rng)
+        menus.append((menu_id, f'{prefix}menu {m}', f'Seed menu description {m}'))
+        for s in range(len(dish_counts)):
+            submenus.append((seeded_uuid(rng), f'{prefix}submenu {m}-{s}', f'Seed submenu description {m}-{s}',
+                             menu_id))
+    return menus, submenus
+
+
+def dish_records(plan: list[list[int]], submenus: list[tuple], seed: int) -> Iterator[tuple]:
+    prefix = title_prefix(seed)
+    submenu_ids = iter(submenus)
+    for m, dish_counts in enumerate(plan):
+        for s, count in enumerate(dish_counts):
+            submenu_id = next(submenu_ids)[0]
+            rng = random.Random(f'{seed}:{m}:{s}')
+            for d in range(count):
+                yield (seeded_uuid(rng), f'{prefix}dish {m}-{s}-{d}', f'Seed dish description {m}-{s}-{d}',
+                       round(rng.uniform(50, 5000), 2), submenu_id)
+
+
+def batched(records: Iterable[tuple], size: int) -> Iterator[list[tuple]]:
+    iterator = iter(records)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+async def copy_batches(dsn: str, table: str, batches: Iterator[list[tuple]], workers: int) -> int:
+    """
+    Загружает пачки в workers параллельных соединениях. Каждая пачка
+    фиксируется отдельно, поэтому при ошибке часть строк остается в таблице.
+
+    Returns:
+        int: Количество загруженных строк.
+    """
+    loaded = 0
+
+    async def worker() -> None:
+        nonlocal loaded
+        connection = await asyncpg.connect(dsn)
+        try:
+            # Пачки генерируются по мере загрузки, общий итератор раздает их соединениям
+            for batch in batches:
+                await connection.copy_records_to_table(table, records=batch, columns=COLUMNS[table])
+                loaded += len(batch)
+        finally:
+            await connection.close()
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    return loaded
+
+
+def database_dsn() -> str:
+    return f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT or 5432}/{DB_NAME}'
+
+
+async def seed_catalog(shape: Shape, seed: int, batch_size: int = 20000, workers: int = 4,
+                       dsn: str | None = None) -> dict[str, int]:
+    """
+    Returns:
+        dict[str, int]: Количество загруженных строк по таблицам.
+    """
+    dsn = dsn or database_dsn()
+    plan = plan_catalog(shape)
+    menus, submenus = menu_records(plan, seed)
+    loaded = {
+        # Внешние ключи требуют загружать таблицы по очереди
+        'menus': await copy_batches(dsn, 'menus', batched(menus, batch_size), workers),
+        'submenus': await copy_batches(dsn, 'submenus', batched(submenus, batch_size), workers),
+        'dishes': await copy_batches(dsn, 'dishes', batched(dish_records(plan, submenus, seed), batch_size),
+                                     workers),
+    }
+    # Статистика планировщика должна соответствовать новому объему таблиц
+    connection = await asyncpg.connect(dsn)
+    try:
+        await connection.execute('ANALYZE menus, submenus, dishes')
+    finally:
+        await connection.close()
+    return loaded
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.seed', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--menus', type=int, default=100)
+    parser.add_argument('--submenus', type=int, default=1000, help='всего подменю, не меньше --menus')
+    parser.add_argument('--dishes', type=int, default=100000, help='всего блюд')
+    parser.add_argument('--skew', type=float, default=1.0, help='показатель распределения Ципфа, 0 - равномерно')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=20000)
+    parser.add_argument('--workers', type=int, default=4, help='параллельных соединений COPY')
+    parser.add_argument('--replace', action='store_true', help='сначала удалить каталог с тем же --seed')
+    args = parser.parse_args()
+    if args.submenus < args.menus:
+        parser.error('--submenus должно быть не меньше --menus')
+    return args
+
+
+async def main(args: argparse.Namespace) -> dict:
+    engine.echo = False
+    if args.replace:
+        async with async_session() as session:
+            await delete_catalog(args.seed, session)
+
+    started = time.perf_counter()
+    loaded = await seed_catalog(Shape(args.menus, args.submenus, args.dishes, args.skew), args.seed,
+                                args.batch_size, args.workers)
+    seconds = time.perf_counter() - started
+    return {
+        'seed': args.seed,
+        'rows': loaded,
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(sum(loaded.values()) / seconds) if seconds else None,
+    }
+
+
+if __name__ == '__main__':
+    print(json.dumps(asyncio.run(main(parse_args())), indent=2))
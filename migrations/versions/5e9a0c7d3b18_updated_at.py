@@ -0,0 +1,68 @@
+"""updated_at on menus, submenus and dishes
+
+Revision ID: 5e9a0c7d3b18
+Revises: c4d7e91b2a5f
+Create Date: 2026-10-19 19:48:12.604417
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '5e9a0c7d3b18'
+down_revision = 'c4d7e91b2a5f'
+branch_labels = None
+depends_on = None
+
+TABLES = (('menus', None, None), ('submenus', 'menus', 'menu_id'), ('dishes', 'submenus', 'submenu_id'))
+TOUCH_OPERATIONS = (('insert', 'NEW TABLE AS new_rows'),
+                    ('update', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+                    ('delete', 'OLD TABLE AS old_rows'))
+
+
+def upgrade() -> None:
+    for table, _, _ in TABLES:
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(timezone=True),
+                                       server_default=sa.text('clock_timestamp()'), nullable=True))
+
+    op.execute('''
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.updated_at = clock_timestamp();
+    RETURN NEW;
+END $$
+''')
+    op.execute('''
+CREATE OR REPLACE FUNCTION touch_parent() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP <> 'DELETE' THEN
+        EXECUTE format('UPDATE %I SET updated_at = clock_timestamp() WHERE id IN (SELECT %I FROM new_rows)',
+                       TG_ARGV[0], TG_ARGV[1]);
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        EXECUTE format('UPDATE %I SET updated_at = clock_timestamp() WHERE id IN (SELECT %I FROM old_rows)',
+                       TG_ARGV[0], TG_ARGV[1]);
+    END IF;
+    RETURN NULL;
+END $$
+''')
+    for table, parent, foreign_key in TABLES:
+        op.execute(f'CREATE TRIGGER {table}_set_updated_at BEFORE UPDATE ON {table} '
+                   f'FOR EACH ROW EXECUTE FUNCTION set_updated_at()')
+        if parent is None:
+            continue
+        for operation, referencing in TOUCH_OPERATIONS:
+            op.execute(f'CREATE TRIGGER {table}_touch_{parent}_on_{operation} AFTER {operation.upper()} ON {table} '
+                       f"REFERENCING {referencing} FOR EACH STATEMENT EXECUTE FUNCTION touch_parent('{parent}', "
+                       f"'{foreign_key}')")
+
+
+def downgrade() -> None:
+    for table, parent, _ in TABLES:
+        op.execute(f'DROP TRIGGER {table}_set_updated_at ON {table}')
+        if parent is not None:
+            for operation, _ in TOUCH_OPERATIONS:
+                op.execute(f'DROP TRIGGER {table}_touch_{parent}_on_{operation} ON {table}')
+        op.drop_column(table, 'updated_at')
+    op.execute('DROP FUNCTION touch_parent()')
+    op.execute('DROP FUNCTION set_updated_at()')
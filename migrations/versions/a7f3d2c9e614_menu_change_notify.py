@@ -0,0 +1,55 @@
+"""NOTIFY menu_changes on menus, submenus and dishes
+
+Revision ID: a7f3d2c9e614
+Revises: 5e9a0c7d3b18
+Create Date: 2026-10-19 21:02:37.418905
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'a7f3d2c9e614'
+down_revision = '5e9a0c7d3b18'
+branch_labels = None
+depends_on = None
+
+TABLES = (('menus', 'SELECT id, id AS menu_id FROM %I'),
+          ('submenus', 'SELECT id, menu_id FROM %I'),
+          ('dishes', 'SELECT d.id, s.menu_id FROM %I d LEFT JOIN submenus s ON s.id = d.submenu_id'))
+OPERATIONS = (('insert', 'NEW TABLE AS new_rows'),
+              ('update', 'NEW TABLE AS new_rows'),
+              ('delete', 'OLD TABLE AS old_rows'))
+
+
+def upgrade() -> None:
+    op.execute("""
+CREATE OR REPLACE FUNCTION notify_menu_change() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    payload text;
+BEGIN
+    IF pg_trigger_depth() > 1 THEN
+        RETURN NULL;
+    END IF;
+    FOR payload IN EXECUTE format(
+        'SELECT json_build_object(''table'', %L, ''op'', %L, ''menu_id'', menu_id, ''count'', count(*), '
+        || '''ids'', CASE WHEN count(*) <= 100 THEN json_agg(id) END)::text '
+        || 'FROM (' || TG_ARGV[0] || ') changed GROUP BY menu_id',
+        TG_TABLE_NAME, lower(TG_OP), CASE TG_OP WHEN 'DELETE' THEN 'old_rows' ELSE 'new_rows' END)
+    LOOP
+        PERFORM pg_notify('menu_changes', payload);
+    END LOOP;
+    RETURN NULL;
+END $$
+""")
+    for table, changed_rows in TABLES:
+        for operation, referencing in OPERATIONS:
+            op.execute(f'CREATE TRIGGER {table}_notify_on_{operation} AFTER {operation.upper()} ON {table} '
+                       f"REFERENCING {referencing} FOR EACH STATEMENT EXECUTE FUNCTION notify_menu_change("
+                       f"'{changed_rows}')")
+
+
+def downgrade() -> None:
+    for table, _ in TABLES:
+        for operation, _ in OPERATIONS:
+            op.execute(f'DROP TRIGGER {table}_notify_on_{operation} ON {table}')
+    op.execute('DROP FUNCTION notify_menu_change()')
@@ -0,0 +1,90 @@
+"""changes log with sequence numbers and tombstones
+
+Revision ID: d5b8e1f47a20
+Revises: a7f3d2c9e614
+Create Date: 2026-10-19 22:15:09.731642
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'd5b8e1f47a20'
+down_revision = 'a7f3d2c9e614'
+branch_labels = None
+depends_on = None
+
+TABLES = (('menus', 'SELECT id, id AS menu_id FROM %I'),
+          ('submenus', 'SELECT id, menu_id FROM %I'),
+          ('dishes', 'SELECT d.id, s.menu_id FROM %I d LEFT JOIN submenus s ON s.id = d.submenu_id'))
+OPERATIONS = (('insert', 'NEW TABLE AS new_rows'),
+              ('update', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+              ('delete', 'OLD TABLE AS old_rows'))
+
+
+def upgrade() -> None:
+    op.execute('CREATE SEQUENCE changes_seq')
+    op.create_table('changes',
+                    sa.Column('entity', sa.String(), nullable=False),
+                    sa.Column('entity_id', sa.UUID(), nullable=False),
+                    sa.Column('menu_id', sa.UUID(), nullable=False),
+                    sa.Column('seq', sa.BigInteger(), server_default=sa.text("nextval('changes_seq')"),
+                              nullable=False),
+                    sa.Column('xid', sa.BigInteger(), server_default=sa.text('pg_current_xact_id()::text::bigint'),
+                              nullable=False),
+                    sa.Column('deleted', sa.Boolean(), nullable=False),
+                    sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('clock_timestamp()'),
+                              nullable=True),
+                    sa.PrimaryKeyConstraint('entity', 'entity_id', 'menu_id'),
+                    sa.UniqueConstraint('seq')
+                    )
+    op.create_index('ix_changes_xid_seq', 'changes', ['xid', 'seq'], unique=False)
+    # Существующий каталог попадает в журнал, чтобы клиент мог начать с since=0
+    for table, changed_rows in TABLES:
+        op.execute(f"INSERT INTO changes (entity, entity_id, menu_id, deleted) "
+                   f"SELECT '{table}', id, menu_id, false FROM ({changed_rows.replace('%I', table)}) changed "
+                   f"WHERE menu_id IS NOT NULL")
+
+    op.execute("""
+CREATE OR REPLACE FUNCTION record_menu_change() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    upsert text := 'INSERT INTO changes (entity, entity_id, menu_id, deleted) '
+        || 'SELECT %L, id, menu_id, %L FROM (%s) changed WHERE menu_id IS NOT NULL '
+        || 'ON CONFLICT (entity, entity_id, menu_id) DO UPDATE SET seq = EXCLUDED.seq, xid = EXCLUDED.xid, '
+        || 'deleted = EXCLUDED.deleted, changed_at = EXCLUDED.changed_at';
+    moved text := 'SELECT o.id, o.menu_id AS old_menu_id, n.menu_id FROM (%s) o JOIN (%s) n ON n.id = o.id '
+        || 'WHERE n.menu_id IS DISTINCT FROM o.menu_id';
+BEGIN
+    IF pg_trigger_depth() > 1 THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'UPDATE' THEN
+        moved := format(moved, format(TG_ARGV[0], 'old_rows'), format(TG_ARGV[0], 'new_rows'));
+        EXECUTE format(upsert, TG_TABLE_NAME, true, 'SELECT id, old_menu_id AS menu_id FROM (' || moved || ') m');
+        IF TG_TABLE_NAME = 'submenus' THEN
+            EXECUTE format(upsert, 'dishes', true, 'SELECT d.id, m.old_menu_id AS menu_id FROM (' || moved
+                           || ') m JOIN dishes d ON d.submenu_id = m.id');
+            EXECUTE format(upsert, 'dishes', false, 'SELECT d.id, m.menu_id FROM (' || moved
+                           || ') m JOIN dishes d ON d.submenu_id = m.id');
+        END IF;
+    END IF;
+    EXECUTE format(upsert, TG_TABLE_NAME, TG_OP = 'DELETE',
+                   format(TG_ARGV[0], CASE TG_OP WHEN 'DELETE' THEN 'old_rows' ELSE 'new_rows' END));
+    RETURN NULL;
+END $$
+""")
+    for table, changed_rows in TABLES:
+        for operation, referencing in OPERATIONS:
+            op.execute(f'CREATE TRIGGER {table}_record_on_{operation} AFTER {operation.upper()} ON {table} '
+                       f"REFERENCING {referencing} FOR EACH STATEMENT EXECUTE FUNCTION record_menu_change("
+                       f"'{changed_rows}')")
+
+
+def downgrade() -> None:
+    for table, _ in TABLES:
+        for operation, _ in OPERATIONS:
+            op.execute(f'DROP TRIGGER {table}_record_on_{operation} ON {table}')
+    op.execute('DROP FUNCTION record_menu_change()')
+    op.drop_index('ix_changes_xid_seq', table_name='changes')
+    op.drop_table('changes')
+    op.execute('DROP SEQUENCE changes_seq')
@@ -0,0 +1,188 @@
+"""
+Управление допуском запросов к API.
+
+Маршруты делятся на классы: cached - чтения, которые обычно отдаются из кеша,
+db - остальные чтения из БД, tree - выборки всего дерева меню, write - изменения.
+Для каждого класса ограничено число одновременно обрабатываемых запросов
+(ADMISSION_LIMITS), сверх него запрос ждет не дольше ADMISSION_QUEUE_SECONDS.
+
+Когда соединения пула БД ждут ADMISSION_SHED_POOL_WAITERS запросов и больше,
+запросы классов db, tree и write сразу получают 503, не вставая в очередь пула.
+Запросы класса cached допускаются и получают 503, только если им действительно
+нужно соединение (промах кеша), поэтому попадания в кеш обслуживаются и под нагрузкой.
+"""
+import asyncio
+import os
+from collections.abc import AsyncIterator, Iterator, Sequence
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from urllib.parse import parse_qs
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from my_app.metrics import HTTP_REQUESTS_SHED, TimedAsyncQueuePool
+
+ADMISSION_LIMITS = os.environ.get('ADMISSION_LIMITS', 'cached=200;db=20;tree=4;write=10')
+ADMISSION_QUEUE_SECONDS = float(os.environ.get('ADMISSION_QUEUE_SECONDS', 1))
+# 0 отключает сброс нагрузки по очереди пула
+ADMISSION_SHED_POOL_WAITERS = int(os.environ.get('ADMISSION_SHED_POOL_WAITERS', 10))
+
+CACHED_ROUTES = frozenset({'get_menus', 'get_menu', 'get_submenus', 'get_submenu', 'get_dishes', 'get_dish',
+                           'get_menu_stats', 'get_stats'})
+TREE_ROUTES = frozenset({'get_menus_with_all'})
+# Чтения, которые принимают список id в теле POST: класс определяется маршрутом, а не методом
+DB_ROUTES = frozenset({'batch_get_dishes', 'batch_get_submenus'})
+# Поток событий открыт часами: он не занимает место в классе и не ограничен по времени
+EXEMPT_ROUTES = frozenset({'stream_menus'})
+
+# Запрос допущен без проверки пула и получает отказ при попытке взять соединение
+_shed_on_checkout: ContextVar[bool] = ContextVar('admission_shed_on_checkout', default=False)
+
+
+def match_route(scope: Scope, routes: Sequence[BaseRoute]) -> BaseRoute | None:
+    """Маршрут запроса до того, как его найдет роутер (middleware работают раньше)."""
+    return next((route for route in routes if route.matches(scope)[0] == Match.FULL), None)
+
+
+class Overloaded(Exception):
+    def __init__(self, route_class: str, reason: str):
+        self.route_class = route_class
+        self.reason = reason
+
+
+def parse_limits(value: str) -> dict[str, int]:
+    limits = {}
+    for item in value.split(';'):
+        if item.strip():
+            name, _, limit = item.strip().partition('=')
+            limits[name] = int(limit)
+    return limits
+
+
+class AdmissionPool(TimedAsyncQueuePool):
+    """Пул, который знает, сколько запросов ждут соединения."""
+
+    waiting = 0
+    shed_waiters = ADMISSION_SHED_POOL_WAITERS
+
+    def saturated(self) -> bool:
+        return 0 < self.shed_waiters <= self.waiting
+
+    def _do_get(self):
+        if _shed_on_checkout.get() and self.saturated():
+            raise Overloaded('cached', 'pool_saturated')
+        # Соединение из пула выдается без переключения задач, поэтому снаружи
+        # счетчик видит только тех, кто ждет соединение или открывает новое
+        self.waiting += 1
+        try:
+            return super()._do_get()
+        finally:
+            self.waiting -= 1
+
+
+@contextmanager
+def shed_on_checkout(enabled: bool = True) -> Iterator[None]:
+    token = _shed_on_checkout.set(enabled)
+    try:
+        yield
+    finally:
+        _shed_on_checkout.reset(token)
+
+
+class AdmissionController:
+    def __init__(self, limits: dict[str, int], pool, queue_timeout: float = ADMISSION_QUEUE_SECONDS):
+        self.limits = limits
+        self.pool = pool
+        self.queue_timeout = queue_timeout
+        self.semaphores = {name: asyncio.Semaphore(limit) for name, limit in limits.items()}
+
+    def pool_saturated(self) -> bool:
+        return isinstance(self.pool, AdmissionPool) and self.pool.saturated()
+
+    @staticmethod
+    def classify(scope: Scope, routes: Sequence[BaseRoute]) -> str | None:
+        """
+        Returns:
+            str | None: Класс маршрута или None, если запрос не ограничивается.
+        """
+        if not scope['path'].startswith('/api/'):
+            return None
+        route = match_route(scope, routes)
+        if route is None or route.name in EXEMPT_ROUTES:
+            return None
+        name = route.name
+        if name in DB_ROUTES:
+            return 'db'
+        if scope['method'] not in ('GET', 'HEAD'):
+            return 'write'
+        if name in TREE_ROUTES or (name == 'get_menu' and parse_qs(scope['query_string'].decode()).get('include')):
+            return 'tree'
+        return 'cached' if name in CACHED_ROUTES else 'db'
+
+    @asynccontextmanager
+    async def admit(self, route_class: str) -> AsyncIterator[None]:
+        """
+        Raises:
+            Overloaded: Если пул БД перегружен или место в классе не освободилось за queue_timeout.
+        """
+        if route_class != 'cached' and self.pool_saturated():
+            raise Overloaded(route_class, 'pool_saturated')
+        semaphore = self.semaphores.get(route_class)
+        if semaphore is None:
+            yield
+            return
+
+        if semaphore.locked():
+            acquire = asyncio.ensure_future(semaphore.acquire())
+            try:
+                await asyncio.wait((acquire,), timeout=self.queue_timeout)
+            except asyncio.CancelledError:
+                # Клиент отключился, пока запрос ждал места
+                if acquire.done():
+                    semaphore.release()
+                else:
+                    acquire.cancel()
+                raise
+            if not acquire.done():
+                # Отмененное ожидание семафор передает следующему в очереди
+                acquire.cancel()
+                raise Overloaded(route_class, 'queue_timeout')
+        else:
+            await semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
+async def overloaded_handler(request: Request, exc: Overloaded) -> JSONResponse:
+    HTTP_REQUESTS_SHED.labels(exc.route_class, exc.reason).inc()
+    return JSONResponse(status_code=503, content={'detail': 'service overloaded, retry later'},
+                        headers={'Retry-After': '1'})
+
+
+class AdmissionMiddleware:
+    """Допускает запрос в его класс или отвечает 503 до начала обработки."""
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController, routes: Sequence[BaseRoute]):
+        self.app = app
+        self.controller = controller
+        # Список маршрутов приложения: роутеры подключаются после middleware
+        self.routes = routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route_class = self.controller.classify(scope, self.routes) if scope['type'] == 'http' else None
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            async with self.controller.admit(route_class):
+                with shed_on_checkout(route_class == 'cached'):
+                    await self.app(scope, receive, send)
+        except Overloaded as exc:
+            response = await overloaded_handler(Request(scope), exc)
+            await response(scope, receive, send)
@@ -0,0 +1,136 @@
+"""
+Рассылка изменений меню подписчикам /api/v1/menus/stream.
+
+Триггеры на menus, submenus и dishes (models.track_changes) после каждого
+изменяющего оператора отправляют NOTIFY в канал CHANGES_CHANNEL, поэтому
+события приходят и от API, и от синхронизации с Excel. Каждый процесс API
+держит одно соединение с LISTEN и раздает события очередям подписчиков.
+"""
+import asyncio
+import json
+import logging
+import os
+from typing import Any
+
+import asyncpg
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+CHANGES_CHANNEL = 'menu_changes'
+STREAM_QUEUE_SIZE = int(os.environ.get('STREAM_QUEUE_SIZE', 100))
+STREAM_CONNECT_TIMEOUT = float(os.environ.get('STREAM_CONNECT_TIMEOUT', 5))
+STREAM_RECONNECT_SECONDS = float(os.environ.get('STREAM_RECONNECT_SECONDS', 1))
+
+# Событие для подписчиков, пропустивших изменения: данные нужно перечитать
+RESYNC = {'op': 'resync'}
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(self, menu_ids: frozenset[str] | None, size: int):
+        self.menu_ids = menu_ids
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=size)
+
+    def wants(self, event: dict[str, Any]) -> bool:
+        return event is RESYNC or self.menu_ids is None or event.get('menu_id') in self.menu_ids
+
+    def put(self, event: dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Медленный клиент не задерживает остальных: его очередь заменяется на resync
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class ChangeFeed:
+    """
+    Соединение с LISTEN открывается при первой подписке (или в start) и
+    переоткрывается при обрыве. События, отправленные без соединения, не
+    восстановить, поэтому после переподключения подписчики получают resync.
+    """
+
+    def __init__(self, engine: AsyncEngine, queue_size: int = STREAM_QUEUE_SIZE,
+                 connect_timeout: float = STREAM_CONNECT_TIMEOUT,
+                 reconnect_delay: float = STREAM_RECONNECT_SECONDS):
+        # Отдельное соединение asyncpg, а не из пула: LISTEN занимает его на все время работы
+        self.dsn = engine.url.set(drivername='postgresql').render_as_string(hide_password=False)
+        self.queue_size = queue_size
+        self.connect_timeout = connect_timeout
+        self.reconnect_delay = reconnect_delay
+        self.subscribers: set[Subscription] = set()
+        self.listening = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def publish(self, event: dict[str, Any]) -> None:
+        for subscription in list(self.subscribers):
+            if subscription.wants(event):
+                subscription.put(event)
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning('Некорректное событие в канале %s: %s', channel, payload)
+            return
+        self.publish(event)
+
+    async def _listen(self) -> None:
+        connection = await asyncpg.connect(self.dsn)
+        closed = asyncio.Event()
+        connection.add_termination_listener(lambda _: closed.set())
+        try:
+            await connection.add_listener(CHANGES_CHANNEL, self._on_notify)
+            self.listening.set()
+            await closed.wait()
+        finally:
+            self.listening.clear()
+            await connection.close()
+
+    async def _run(self) -> None:
+        connected_before = False
+        while True:
+            try:
+                if connected_before:
+                    self.publish(RESYNC)
+                connected_before = True
+                await self._listen()
+                logger.warning('Соединение LISTEN %s закрыто, переподключение', CHANGES_CHANNEL)
+            except (OSError, asyncpg.PostgresError):
+                logger.warning('Не удалось подписаться на %s', CHANGES_CHANNEL, exc_info=True)
+            await asyncio.sleep(self.reconnect_delay)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def subscribe(self, menu_ids: frozenset[str] | None = None) -> Subscription:
+        """
+        Parameters:
+            menu_ids (frozenset[str] | None): Меню, изменения которых нужны подписчику. None - все меню.
+
+        Returns:
+            Subscription: Подписка с очередью событий. После использования передается в unsubscribe.
+
+        Raises:
+            asyncio.TimeoutError: Если соединение с LISTEN не открылось за connect_timeout.
+        """
+        self.start()
+        # Подписка до LISTEN пропустила бы изменения, сделанные сразу после ответа
+        await asyncio.wait_for(self.listening.wait(), self.connect_timeout)
+        subscription = Subscription(menu_ids, self.queue_size)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscribers.discard(subscription)
@@ -0,0 +1,198 @@
+"""
+Сжатие ответов с выбором кодировки по Accept-Encoding.
+
+gzip доступен всегда, br и zstd - если установлены пакеты brotli и zstandard.
+Ответы меньше COMPRESSION_MIN_SIZE байт не сжимаются. Тяжелые эндпоинты
+(/menus/all) кешируют уже сжатые варианты ответа через cached_response,
+остальные ответы сжимает CompressionMiddleware. ETag сжатого варианта
+получает суффикс кодировки: "<etag>-gzip".
+"""
+import gzip
+import os
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from cashews import cache
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_LEVEL = int(os.environ.get('COMPRESSION_LEVEL', 6))
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+# Поток событий нельзя собирать целиком: он не заканчивается
+STREAMING_TYPES = ('text/event-stream',)
+
+# В порядке предпочтения сервера: при равных q выбирается первая кодировка
+ENCODERS: dict[str, Callable[[bytes], bytes]] = {}
+if zstandard is not None:
+    ENCODERS['zstd'] = lambda body: zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).compress(body)
+if brotli is not None:
+    ENCODERS['br'] = lambda body: brotli.compress(body, quality=COMPRESSION_LEVEL)
+ENCODERS['gzip'] = lambda body: gzip.compress(body, compresslevel=COMPRESSION_LEVEL, mtime=0)
+
+
+def negotiate(accept_encoding: str) -> str:
+    """
+    Выбирает кодировку из Accept-Encoding.
+
+    Returns:
+        str: Одна из кодировок ENCODERS или identity.
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.lower().split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip()] = quality
+
+    best, best_quality = 'identity', 0.0
+    for encoding in ENCODERS:
+        quality = weights.get(encoding, weights.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str) -> tuple[str, bytes]:
+    """
+    Returns:
+        tuple[str, bytes]: Фактическая кодировка и тело. Маленькие тела не сжимаются.
+    """
+    if encoding == 'identity' or len(body) < COMPRESSION_MIN_SIZE:
+        return 'identity', body
+    return encoding, ENCODERS[encoding](body)
+
+
+def variant_etag(etag: str, encoding: str) -> str:
+    """
+    Сильный ETag должен различаться у вариантов с разными Content-Encoding.
+    conditional.is_not_modified сравнивает ETag без этого суффикса.
+    """
+    if encoding == 'identity' or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def encoded_response(encoding: str, body: bytes, headers: dict[str, str] | None = None) -> Response:
+    response = Response(body, media_type='application/json', headers=headers)
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+        if 'etag' in response.headers:
+            response.headers['ETag'] = variant_etag(response.headers['etag'], encoding)
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+
+@cache(ttl='2m', key='{key}:json')
+async def _render(key: str, render: Callable[[], Awaitable[Any]], adapter: TypeAdapter) -> bytes:
+    # Как response_model_exclude_unset: при выборке полей незапрошенные поля не выводятся
+    return adapter.dump_json(await render(), exclude_unset=True)
+
+
+@cache(ttl='2m', key='{key}:{encoding}')
+async def _variant(key: str, encoding: str, render: Callable[[], Awaitable[Any]],
+                   adapter: TypeAdapter) -> tuple[str, bytes]:
+    return compress(await _render(key, render, adapter), encoding)
+
+
+async def cached_response(request: Request, key: str, render: Callable[[], Awaitable[Any]],
+                          adapter: TypeAdapter, headers: dict[str, str] | None = None) -> Response:
+    """
+    Отдает ответ из кеша уже сжатым в выбранной кодировке. При промахе данные
+    получаются из render и сериализуются один раз на все кодировки, а сжатие
+    выполняется один раз на кодировку.
+
+    Parameters:
+        request (Request): Запрос, из которого берется Accept-Encoding.
+        key (str): Ключ кеша. Должен включать версию данных, например ETag.
+        render (Callable): Корутина, возвращающая данные ответа.
+        adapter (TypeAdapter): Схема ответа для сериализации в JSON.
+        headers (dict[str, str], optional): Дополнительные заголовки ответа.
+
+    Returns:
+        Response: Ответ с Content-Encoding и Vary.
+    """
+    encoding = negotiate(request.headers.get('accept-encoding', ''))
+    encoding, body = await _variant(key, encoding, render, adapter)
+    return encoded_response(encoding, body, headers)
+
+
+class CompressionMiddleware:
+    """
+    Сжимает ответы, если они не сжаты эндпоинтом. Тело собирается целиком:
+    BaseHTTPMiddleware отдает даже JSON-ответы частями. Ответы с типами,
+    которые не сжимаются (выгрузки в Excel), и потоки событий передаются как есть.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get('accept-encoding', ''))
+        if encoding == 'identity':
+            await self.app(scope, receive, send)
+            return
+
+        start: Message = {}
+        chunks: list[bytes] = []
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, passthrough
+            if message['type'] == 'http.response.start':
+                if message['status'] == 304:
+                    # 304 несет ETag сжатого варианта, как и ответ 200 на тот же Accept-Encoding
+                    not_modified_headers = MutableHeaders(raw=message['headers'])
+                    if 'etag' in not_modified_headers:
+                        not_modified_headers['ETag'] = variant_etag(not_modified_headers['etag'], encoding)
+                headers = Headers(raw=message['headers'])
+                content_type = headers.get('content-type', '')
+                encoded = 'content-encoding' in headers
+                streaming = content_type.startswith(STREAMING_TYPES)
+                passthrough = encoded or streaming or not content_type.startswith(COMPRESSIBLE_TYPES)
+                if passthrough:
+                    await send(message)
+                else:
+                    start = message
+                return
+            if passthrough:
+                await send(message)
+                return
+
+            chunks.append(message.get('body', b''))
+            if message.get('more_body', False):
+                return
+
+            applied, body = compress(b''.join(chunks), encoding)
+            headers = MutableHeaders(raw=start['headers'])
+            if applied != 'identity':
+                headers['Content-Encoding'] = applied
+                if 'etag' in headers:
+                    headers['ETag'] = variant_etag(headers['etag'], applied)
+            headers['Content-Length'] = str(len(body))
+            headers.add_vary_header('Accept-Encoding')
+            await send(start)
+            await send({'type': 'http.response.body', 'body': body})
+
+        await self.app(scope, receive, send_wrapper)
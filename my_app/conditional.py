@@ -0,0 +1,98 @@
+import hashlib
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, NamedTuple
+
+from fastapi import Depends, Request, Response
+
+
+class Version(NamedTuple):
+    """Версия ответа: ETag и время последнего изменения входящих в него записей."""
+    etag: str
+    last_modified: datetime | None
+
+
+class NotModified(Exception):
+    def __init__(self, headers: dict[str, str]):
+        self.headers = headers
+
+
+def make_version(rows: Iterable[tuple[Any, datetime]]) -> Version:
+    """
+    Строит версию по парам (id, updated_at) в порядке, в котором записи попадают в ответ.
+    updated_at подменю и меню меняется вместе с вложенными записями, поэтому
+    для списков и деревьев достаточно версий записей верхнего уровня.
+    """
+    digest = hashlib.sha1()
+    last_modified = None
+    for entity_id, updated_at in rows:
+        digest.update(f'{entity_id}:{updated_at.isoformat()};'.encode())
+        if last_modified is None or updated_at > last_modified:
+            last_modified = updated_at
+    return Version(f'"{digest.hexdigest()}"', last_modified)
+
+
+def make_list_version(rows: Iterable[tuple[Any, datetime]]) -> Version:
+    """
+    Версия списка - только ETag. Удаление записи не меняет updated_at остальных,
+    поэтому время изменения списка по ним не определить, а If-Modified-Since
+    получил бы 304 после удаления.
+    """
+    return make_version(rows)._replace(last_modified=None)
+
+
+def version_headers(version: Version) -> dict[str, str]:
+    headers = {'ETag': version.etag}
+    if version.last_modified is not None:
+        headers['Last-Modified'] = format_datetime(version.last_modified, usegmt=True)
+    return headers
+
+
+def strip_encoding(tag: str) -> str:
+    # Сжатые варианты отдаются с ETag "<etag>-<кодировка>" (compression.variant_etag)
+    base, dash, _ = tag.rpartition('-')
+    return f'{base}"' if dash and tag.endswith('"') else tag
+
+
+def is_not_modified(request: Request, version: Version) -> bool:
+    # If-Modified-Since учитывается, только если клиент не прислал If-None-Match
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        tags = [strip_encoding(tag.strip().removeprefix('W/')) for tag in if_none_match.split(',')]
+        return '*' in tags or version.etag in tags
+
+    if_modified_since = request.headers.get('if-modified-since')
+    if not if_modified_since or version.last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    # Last-Modified передается с точностью до секунды
+    return version.last_modified.replace(microsecond=0) <= since
+
+
+def conditional(version_dependency: Callable) -> Callable:
+    """
+    Зависимость для GET-эндпоинта. Получает версию ответа из version_dependency,
+    отвечает 304 без вызова эндпоинта, если версия клиента актуальна, и иначе
+    добавляет ETag и Last-Modified в ответ. Если version_dependency вернула None
+    (записи нет), эндпоинт сам отвечает 404.
+    """
+    async def check_version(request: Request, response: Response,
+                            version: Version | None = Depends(version_dependency)) -> None:
+        if version is None:
+            return
+        headers = version_headers(version)
+        if is_not_modified(request, version):
+            raise NotModified(headers)
+        response.headers.update(headers)
+
+    return check_version
+
+
+async def not_modified_handler(request: Request, exc: NotModified) -> Response:
+    return Response(status_code=304, headers=exc.headers)
@@ -4,6 +4,8 @@ from dotenv import load_dotenv
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+from my_app.admission import AdmissionPool
+
 load_dotenv()
 
 DB_HOST = os.environ.get('DB_HOST')
@@ -14,7 +16,7 @@ DB_USER = os.environ.get('DB_USER')
 
 DATABASE_URL = f'postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}'
 
-engine = create_async_engine(DATABASE_URL, echo=True, future=True)
+engine = create_async_engine(DATABASE_URL, echo=True, future=True, poolclass=AdmissionPool)
 
 async_session = sessionmaker(bind=engine, class_=AsyncSession)
 
@@ -0,0 +1,149 @@
+"""
+Бюджеты времени запросов к API.
+
+Бюджет в секундах задается для шаблона маршрута в ROUTE_TIMEOUTS, например
+'/api/v1/menus/all=10;*=5', * - для остальных маршрутов /api/. Бюджет соблюдается
+дважды: транзакции БД начинаются с SET LOCAL statement_timeout на оставшееся
+время, а обработка запроса прерывается asyncio-таймаутом. Отмена задачи отменяет
+выполняющийся запрос asyncpg на сервере, и соединение возвращается в пул.
+Не уложившийся в бюджет запрос получает 504 и учитывается в http_request_timeouts_total.
+"""
+import asyncio
+import os
+import time
+from collections.abc import Sequence
+from contextvars import ContextVar
+from typing import NamedTuple
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from my_app.admission import EXEMPT_ROUTES, match_route
+from my_app.metrics import HTTP_REQUEST_TIMEOUTS
+
+ROUTE_TIMEOUTS = os.environ.get('ROUTE_TIMEOUTS', '/api/v1/menus/all=10;/api/v1/imports/=60;*=5')
+# БД прерывает запрос немного раньше приложения: ошибка БД оставляет соединение исправным
+DEADLINE_DB_MARGIN = float(os.environ.get('DEADLINE_DB_MARGIN', 0.05))
+
+# canceling statement due to statement timeout
+QUERY_CANCELED = '57014'
+
+
+class Budget(NamedTuple):
+    # Шаблон маршрута
+    route: str
+    seconds: float
+    # Момент time.monotonic(), к которому должна закончиться обработка запроса
+    deadline: float
+
+
+# Бюджет текущего HTTP-запроса
+_budget: ContextVar[Budget | None] = ContextVar('request_budget', default=None)
+
+
+class DeadlineExceeded(Exception):
+    def __init__(self, route: str, seconds: float, source: str):
+        self.route = route
+        self.seconds = seconds
+        self.source = source
+
+
+def parse_timeouts(value: str) -> dict[str, float]:
+    """
+    Raises:
+        ValueError: Если бюджет не положительное число.
+    """
+    timeouts = {}
+    for item in value.split(';'):
+        if not item.strip():
+            continue
+        route, _, seconds = item.strip().rpartition('=')
+        if not route or float(seconds) <= 0:
+            raise ValueError(f'Некорректный бюджет времени: {item}')
+        timeouts[route] = float(seconds)
+    return timeouts
+
+
+def install_statement_timeout(engine: AsyncEngine) -> None:
+    """Подключает SET LOCAL statement_timeout к движку. Повторный вызов ничего не делает."""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, 'begin', _set_statement_timeout):
+        return
+
+    event.listen(sync_engine, 'begin', _set_statement_timeout)
+    event.listen(sync_engine, 'handle_error', _statement_timeout_error)
+
+
+def _set_statement_timeout(conn) -> None:
+    budget = _budget.get()
+    if budget is None:
+        return
+    remaining_ms = max(1, int((budget.deadline - time.monotonic() - DEADLINE_DB_MARGIN) * 1000))
+    # Служебная команда не входит в число запросов эндпоинта
+    conn.exec_driver_sql(f'SET LOCAL statement_timeout = {remaining_ms}', execution_options={'query_stats': False})
+
+
+def _statement_timeout_error(exception_context) -> None:
+    budget = _budget.get()
+    orig = exception_context.original_exception
+    if budget is not None and getattr(orig, 'sqlstate', None) == QUERY_CANCELED:
+        raise DeadlineExceeded(budget.route, budget.seconds, 'db') from exception_context.sqlalchemy_exception
+
+
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded) -> JSONResponse:
+    HTTP_REQUEST_TIMEOUTS.labels(exc.route, exc.source).inc()
+    return JSONResponse(status_code=504,
+                        content={'detail': f'request exceeded its time budget of {exc.seconds:g} s'})
+
+
+class DeadlineMiddleware:
+    """Прерывает обработку запроса, не уложившегося в бюджет маршрута, и отвечает 504."""
+
+    def __init__(self, app: ASGIApp, timeouts: dict[str, float], routes: Sequence[BaseRoute]):
+        self.app = app
+        self.timeouts = timeouts
+        # Список маршрутов приложения: роутеры подключаются после middleware
+        self.routes = routes
+
+    def budget_for(self, scope: Scope) -> tuple[str, float] | None:
+        if scope['type'] != 'http' or not scope['path'].startswith('/api/'):
+            return None
+        route = match_route(scope, self.routes)
+        if route is None or route.name in EXEMPT_ROUTES:
+            return None
+        path = getattr(route, 'path_format', scope['path'])
+        seconds = self.timeouts.get(path, self.timeouts.get('*'))
+        return (path, seconds) if seconds is not None else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        matched = self.budget_for(scope)
+        if matched is None:
+            await self.app(scope, receive, send)
+            return
+
+        route, seconds = matched
+        started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal started
+            if message['type'] == 'http.response.start':
+                started = True
+            await send(message)
+
+        token = _budget.set(Budget(route, seconds, time.monotonic() + seconds))
+        try:
+            await asyncio.wait_for(self.app(scope, receive, send_wrapper), seconds)
+        except asyncio.TimeoutError:
+            exc = DeadlineExceeded(route, seconds, 'app')
+            if started:
+                # Ответ уже начал отправляться: клиент увидит оборванное соединение
+                HTTP_REQUEST_TIMEOUTS.labels(route, exc.source).inc()
+                return
+            response = await deadline_exceeded_handler(Request(scope), exc)
+            await response(scope, receive, send)
+        finally:
+            _budget.reset(token)
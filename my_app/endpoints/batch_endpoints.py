@@ -0,0 +1,162 @@
+import uuid
+from collections.abc import Awaitable, Callable
+
+from cashews import cache
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from my_app.config import get_session
+from my_app.schemas.batch_schema import (
+    BATCH_MAX_IDS,
+    BatchGetSchema,
+    DishBatchItemSchema,
+    SubMenuBatchItemSchema,
+)
+from my_app.services.dish_service import DishService
+from my_app.services.submenu_service import SubMenuService
+
+router = APIRouter()
+
+dish_service = DishService()
+submenu_service = SubMenuService()
+
+# Записи кешируются по одной, чтобы пересекающиеся пакеты использовали общий кеш
+DISH_KEY = f'{__name__}:dish:' + '{}'
+SUBMENU_KEY = f'{__name__}:submenu:' + '{}'
+ENTITY_TTL = 120
+
+
+def parse_ids(ids: str) -> list[uuid.UUID]:
+    """
+    Raises:
+        HTTPException: Если id не UUID или их больше BATCH_MAX_IDS.
+    """
+    try:
+        parsed = [uuid.UUID(value.strip()) for value in ids.split(',') if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail='ids must be comma-separated UUIDs')
+    if not parsed or len(parsed) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=422, detail=f'ids must contain from 1 to {BATCH_MAX_IDS} values')
+    return parsed
+
+
+async def resolve(ids: list[uuid.UUID], key: str,
+                  load: Callable[[list[uuid.UUID], AsyncSession], Awaitable[dict[str, BaseModel]]],
+                  session: AsyncSession) -> dict[str, BaseModel]:
+    """
+    Получает записи сначала из кеша, а отсутствующие в нем - одним запросом к БД.
+
+    Returns:
+        dict[str, BaseModel]: Найденные записи по id. Ненайденных id в словаре нет.
+    """
+    unique = list(dict.fromkeys(str(entity_id) for entity_id in ids))
+    found: dict[str, BaseModel] = {}
+    if not cache.is_full_disable:
+        cached = await cache.get_many(*(key.format(entity_id) for entity_id in unique))
+        found = {entity_id: value for entity_id, value in zip(unique, cached) if value is not None}
+
+    missing = [uuid.UUID(entity_id) for entity_id in unique if entity_id not in found]
+    if missing:
+        loaded = await load(missing, session)
+        found.update(loaded)
+        if loaded and not cache.is_full_disable:
+            await cache.set_many({key.format(entity_id): value for entity_id, value in loaded.items()},
+                                 expire=ENTITY_TTL)
+    return found
+
+
+async def forget(*keys: str) -> None:
+    """Удаляет записи из кеша пакетных запросов после изменения."""
+    if not cache.is_full_disable:
+        await cache.delete_many(*keys)
+
+
+async def forget_all(key: str) -> None:
+    if not cache.is_full_disable:
+        await cache.delete_match(key.format('*'))
+
+
+async def batch_dishes(ids: list[uuid.UUID], session: AsyncSession) -> list[DishBatchItemSchema]:
+    found = await resolve(ids, DISH_KEY, dish_service.read_dishes_by_ids, session)
+    return [DishBatchItemSchema(id=str(dish_id), found=str(dish_id) in found, dish=found.get(str(dish_id)))
+            for dish_id in ids]
+
+
+async def batch_submenus(ids: list[uuid.UUID], session: AsyncSession) -> list[SubMenuBatchItemSchema]:
+    found = await resolve(ids, SUBMENU_KEY, submenu_service.read_submenus_by_ids, session)
+    return [SubMenuBatchItemSchema(id=str(submenu_id), found=str(submenu_id) in found,
+                                   submenu=found.get(str(submenu_id)))
+            for submenu_id in ids]
+
+
+@router.get('/dishes', response_model=list[DishBatchItemSchema], name='get_dishes_batch', status_code=200)
+async def read_dishes_batch(ids: str = Query(description='id блюд через запятую'),
+                            session: AsyncSession = Depends(get_session)) -> list[DishBatchItemSchema]:
+    """
+    Получает блюда по списку id независимо от меню и подменю.
+
+    Parameters:
+        ids (str): Идентификаторы блюд через запятую, не больше 100.
+        session (AsyncSession): Асинхронная сессия с базой данных.
+
+    Returns:
+        JSONResponse: Блюда в порядке id из запроса. Для ненайденных id found = false.
+
+    Raises:
+        HTTPException: Если id не являются UUID или их слишком много.
+    """
+    return await batch_dishes(parse_ids(ids), session)
+
+
+@router.post('/dishes:batchGet', response_model=list[DishBatchItemSchema], name='batch_get_dishes',
+             status_code=200)
+async def batch_get_dishes(request: BatchGetSchema,
+                           session: AsyncSession = Depends(get_session)) -> list[DishBatchItemSchema]:
+    """
+    То же, что GET /dishes?ids=..., для списков id, которые не помещаются в URL.
+
+    Parameters:
+        request (BatchGetSchema): Идентификаторы блюд, не больше 100.
+        session (AsyncSession): Асинхронная сессия с базой данных.
+
+    Returns:
+        JSONResponse: Блюда в порядке id из запроса. Для ненайденных id found = false.
+    """
+    return await batch_dishes(request.ids, session)
+
+
+@router.get('/submenus', response_model=list[SubMenuBatchItemSchema], name='get_submenus_batch', status_code=200)
+async def read_submenus_batch(ids: str = Query(description='id подменю через запятую'),
+                              session: AsyncSession = Depends(get_session)) -> list[SubMenuBatchItemSchema]:
+    """
+    Получает подменю с количеством блюд по списку id независимо от меню.
+
+    Parameters:
+        ids (str): Идентификаторы подменю через запятую, не больше 100.
+        session (AsyncSession): Асинхронная сессия с базой данных.
+
+    Returns:
+        JSONResponse: Подменю в порядке id из запроса. Для ненайденных id found = false.
+
+    Raises:
+        HTTPException: Если id не являются UUID или их слишком много.
+    """
+    return await batch_submenus(parse_ids(ids), session)
+
+
+@router.post('/submenus:batchGet', response_model=list[SubMenuBatchItemSchema], name='batch_get_submenus',
+             status_code=200)
+async def batch_get_submenus(request: BatchGetSchema,
+                             session: AsyncSession = Depends(get_session)) -> list[SubMenuBatchItemSchema]:
+    """
+    То же, что GET /submenus?ids=..., для списков id, которые не помещаются в URL.
+
+    Parameters:
+        request (BatchGetSchema): Идентификаторы подменю, не больше 100.
+        session (AsyncSession): Асинхронная сессия с базой данных.
+
+    Returns:
+        JSONResponse: Подменю в порядке id из запроса. Для ненайденных id found = false.
+    """
+    return await batch_submenus(request.ids, session)
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from my_app.config import get_session
+from my_app.schemas.change_schema import (
+    CHANGES_MAX_LIMIT,
+    WATERMARK_PATTERN,
+    ChangesPageSchema,
+)
+from my_app.services.change_service import ChangeService
+
+router = APIRouter()
+
+change_service = ChangeService()
+
+
+# exclude_unset убирает из data количества подменю и блюд: журнал их не хранит
+@router.get('/', response_model=ChangesPageSchema, name='get_changes', status_code=200,
+            response_model_exclude_unset=True)
+async def read_changes(since: str = Query('0', pattern=WATERMARK_PATTERN, description='watermark предыдущего ответа'),
+                       limit: int = Query(500, ge=1, le=CHANGES_MAX_LIMIT),
+                       session: AsyncSession = Depends(get_session)) -> ChangesPageSchema:
+    """
+    Получает меню, подменю и блюда, измененные после since, для обновления локальной копии каталога.
+
+    Каждая сущность входит в ответ один раз, с номером своего последнего изменения.
+    Удаленные сущности возвращаются с deleted = true, сущность, перенесенная в другое меню, -
+    еще и удаленной из прежнего меню. since=0 отдает весь каталог.
+
+    Parameters:
+        since (str): Позиция последнего полученного изменения (watermark предыдущего ответа).
+        limit (int): Максимальное количество изменений в ответе.
+        session (AsyncSession): Асинхронная сессия с базой данных.
+
+    Returns:
+        JSONResponse: Изменения по возрастанию позиции, новый watermark и признак следующей страницы.
+    """
+    return await change_service.read_changes(since, limit, session)
@@ -1,10 +1,13 @@
 from typing import Any
 
 from cashews import cache
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from my_app.conditional import Version, conditional
 from my_app.config import get_session
+from my_app.endpoints import batch_endpoints, menu_endpoints
+from my_app.fields import Fields, sparse_fields
 from my_app.schemas.dish_schema import DishSchema, DishSchemaAdd, DishSchemaUpdate
 from my_app.services.dish_service import DishService
 
@@ -12,40 +15,72 @@ router = APIRouter()
 
 dish_service = DishService()
 
+dish_fields = sparse_fields(DishSchema)
 
-@router.get('/', response_model=list[DishSchema], name='get_dishes', status_code=200)
-@cache(ttl='2m')
-async def read_dishes(submenu_id: str,
+# Ответы блюд сбрасываются вместе с ответами их меню (menu_endpoints.forget_menu)
+DISHES_KEY = f'{__name__}:read_dishes:{menu_endpoints.MENU_SCOPE}:' + '{submenu_id}:{skip}:{limit}:{fields}'
+DISHES_VERSION_KEY = f'{__name__}:dishes_version:{menu_endpoints.MENU_SCOPE}:' + '{submenu_id}:{skip}:{limit}'
+DISH_KEY = f'{__name__}:read_one_dish:{menu_endpoints.MENU_SCOPE}:' + '{submenu_id}:{dish_id}:{fields}'
+DISH_VERSION_KEY = f'{__name__}:dish_version:{menu_endpoints.MENU_SCOPE}:' + '{submenu_id}:{dish_id}'
+
+
+@cache(ttl='2m', key=DISHES_VERSION_KEY)
+async def dishes_version(menu_id: str, submenu_id: str, skip: int = 0, limit: int = 10,
+                         session: AsyncSession = Depends(get_session)) -> Version:
+    return await dish_service.read_dishes_version(menu_id, submenu_id, skip, limit, session)
+
+
+@cache(ttl='2m', key=DISH_VERSION_KEY)
+async def dish_version(menu_id: str, submenu_id: str, dish_id: str,
+                       session: AsyncSession = Depends(get_session)) -> Version | None:
+    return await dish_service.read_one_dish_version(menu_id, submenu_id, dish_id, session)
+
+
+@router.get('/', response_model=list[DishSchema], name='get_dishes', status_code=200,
+            response_model_exclude_unset=True,
+            dependencies=[Depends(conditional(dishes_version))])
+@cache(ttl='2m', key=DISHES_KEY)
+async def read_dishes(menu_id: str,
+                      submenu_id: str,
                       skip: int = 0,
                       limit: int = 10,
+                      fields: Fields = Depends(dish_fields),
                       session: AsyncSession = Depends(get_session)) -> list[DishSchema]:
     """
     Получает список блюд для указанного подменю.
 
     Parameters:
+       menu_id (str): Идентификатор меню, к которому относится подменю.
        submenu_id (str): Идентификатор подменю.
        skip (int, optional): Количество пропускаемых блюд.
        limit (int, optional): Максимальное количество возвращаемых блюд.
+       fields (tuple[str, ...] | None): Запрошенные поля ответа, по умолчанию все.
        session (AsyncSession): Асинхронная сессия с базой данных.
 
     Returns:
        JSONResponse: Список блюд для указанного подменю.
     """
-    dishes = await dish_service.read_dishes(submenu_id, skip, limit, session)
+    dishes = await dish_service.read_dishes(menu_id, submenu_id, skip, limit, session, fields)
     return dishes
 
 
-@router.get('/{dish_id}', response_model=DishSchema, name='get_dish', status_code=200)
-@cache(ttl='2m')
-async def read_one_dish(submenu_id: str,
+@router.get('/{dish_id}', response_model=DishSchema, name='get_dish', status_code=200,
+            response_model_exclude_unset=True,
+            dependencies=[Depends(conditional(dish_version))])
+@cache(ttl='2m', key=DISH_KEY)
+async def read_one_dish(menu_id: str,
+                        submenu_id: str,
                         dish_id: str,
+                        fields: Fields = Depends(dish_fields),
                         session: AsyncSession = Depends(get_session)) -> DishSchema:
     """
     Получает информацию о конкретном блюде для указанного подменю.
 
     Parameters:
+        menu_id (str): Идентификатор меню, к которому относится подменю.
         submenu_id (str): Идентификатор подменю, к которому относится блюдо.
         dish_id (str): Идентификатор блюда.
+        fields (tuple[str, ...] | None): Запрошенные поля ответа, по умолчанию все.
         session (AsyncSession): Асинхронная сессия с базой данных.
 
     Returns:
@@ -54,70 +89,70 @@ async def read_one_dish(submenu_id: str,
     Raises:
         HTTPException: Если блюдо не найдено.
     """
-    dish = await dish_service.read_one_dish(submenu_id, dish_id, session)
+    dish = await dish_service.read_one_dish(menu_id, submenu_id, dish_id, session, fields)
     return dish
 
 
 @router.post('/', response_model=DishSchema, name='post_dish', status_code=201)
-async def create_dish(submenu_id: str,
+async def create_dish(menu_id: str,
+                      submenu_id: str,
                       dish_data: DishSchemaAdd,
-                      background_tasks: BackgroundTasks,
                       session: AsyncSession = Depends(get_session)) -> DishSchema:
     """
     Добавляет запись в БД в таблице Dish для указанного подменю по id.
 
     Parameters
+        menu_id (str): Идентификатор меню, к которому относится подменю.
         submenu_id (str): Идентификатор подменю, для которого получается список блюд.
         dish_data (DishSchemaAdd): Данные для добавления блюда.
-        background_tasks (BackgroundTasks): Объект для работы с фоновыми задачами.
         session (AsyncSession): Асинхронная сессия с базой данных.
 
     Returns:
         JSONResponse: Ответ со списком блюд для указанного подменю.
     """
-    new_dish = await dish_service.create_dish(submenu_id, dish_data, session)
-    background_tasks.add_task(cache.invalidate, read_dishes)
-    background_tasks.add_task(cache.invalidate, read_one_dish)
+    new_dish = await dish_service.create_dish(menu_id, submenu_id, dish_data, session)
+    await batch_endpoints.forget(batch_endpoints.SUBMENU_KEY.format(submenu_id))
+    await menu_endpoints.forget_menu(menu_id)
     return new_dish
 
 
 @router.patch('/{dish_id}', response_model=DishSchema, name='patch_dish', status_code=200)
-async def update_dish(submenu_id: str,
+async def update_dish(menu_id: str,
+                      submenu_id: str,
                       dish_id: str,
                       dish_data: DishSchemaUpdate,
-                      background_tasks: BackgroundTasks,
                       session: AsyncSession = Depends(get_session)) -> DishSchema:
     """
     Обновляет информацию о блюде в указанном подменю.
 
     Parameters:
+        menu_id (str): Идентификатор меню, к которому относится подменю.
         submenu_id (str): Идентификатор подменю, к которому относится блюдо.
         dish_id (str): Идентификатор блюда, которое требуется обновить.
         dish_data (DishSchemaUpdate): Обновленные данные для блюда.
-        background_tasks (BackgroundTasks): Объект для работы с фоновыми задачами.
         session (AsyncSession): Асинхронная сессия с базой данных.
 
     Returns:
         JSONResponse: Ответ с информацией об обновленном блюде.
     """
-    updated_dish = await dish_service.update_dish(submenu_id, dish_id, dish_data, session)
-    background_tasks.add_task(cache.invalidate, read_dishes)
-    background_tasks.add_task(cache.invalidate, read_one_dish)
+    updated_dish = await dish_service.update_dish(menu_id, submenu_id, dish_id, dish_data, session)
+    await batch_endpoints.forget(batch_endpoints.DISH_KEY.format(dish_id))
+    await menu_endpoints.forget_menu(menu_id)
     return updated_dish
 
 
 @router.delete('/{dish_id}', response_model=None, name='delete_dish', status_code=200)
-async def delete_dish(submenu_id: str,
+async def delete_dish(menu_id: str,
+                      submenu_id: str,
                       dish_id: str,
-                      background_tasks: BackgroundTasks,
                       session: AsyncSession = Depends(get_session)) -> dict[Any, Any]:
     """
     Удаляет указанное блюдо из подменю.
 
     Parameters:
+        menu_id (str): Идентификатор меню, к которому относится подменю.
         submenu_id (str): Идентификатор подменю.
         dish_id (str): Идентификатор удаляемого блюда.
-        background_tasks (BackgroundTasks): Объект для работы с фоновыми задачами.
         session (AsyncSession): Асинхронная сессия с базой данных.
 
     Returns:
@@ -126,10 +161,11 @@ async def delete_dish(submenu_id: str,
     Raises:
         HTTPException: Если указанное блюдо не найдено в подменю.
     """
-    removed_dish = await dish_service.delete_dish(submenu_id, dish_id, session)
+    removed_dish = await dish_service.delete_dish(menu_id, submenu_id, dish_id, session)
     if removed_dish:
-        background_tasks.add_task(cache.invalidate, read_dishes)
-        background_tasks.add_task(cache.invalidate, read_one_dish)
+        await batch_endpoints.forget(batch_endpoints.DISH_KEY.format(dish_id),
+                                     batch_endpoints.SUBMENU_KEY.format(submenu_id))
+        await menu_endpoints.forget_menu(menu_id)
         return {}
 
     raise HTTPException(status_code=404, detail='dish not found')
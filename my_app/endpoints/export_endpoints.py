@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from my_app.config import get_session
+from my_app.schemas.job_schema import JobSchema
+from my_app.services.export_service import ExportService
+
+router = APIRouter()
+
+export_service = ExportService()
+
+XLSX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+@router.post('/', response_model=JobSchema, name='post_export', status_code=202)
+async def create_export(session: AsyncSession = Depends(get_session)) -> JobSchema:
+    """
+    Запускает выгрузку каталога в файл Excel в формате Menu.xlsx.
+
+    Parameters:
+        session (AsyncSession): Асинхронная сессия с базой данных.
+
+    Returns:
+        JSONResponse: Задание выгрузки, прогресс которого можно запрашивать по id.
+
+    Raises:
+        HTTPException: 503, если задачу не удалось отправить в брокер; задание помечается неудачным.
+    """
+    job = await export_service.create_export(session)
+    return job
+
+
+@router.get('/{job_id}', response_model=JobSchema, name='get_export', status_code=200)
+async def read_export(job_id: str, session: AsyncSession = Depends(get_session)) -> JobSchema:
+    """
+    Получает состояние и прогресс задания выгрузки.
+
+    Parameters:
+        job_id (str): Идентификатор задания.
+        session (AsyncSession): Асинхронная сессия с базой данных.
+
+    Returns:
+        JSONResponse: Статус, количество выгруженных строк и общее число строк.
+
+    Raises:
+        HTTPException: Если задание не найдено.
+    """
+    job = await export_service.read_export(job_id, session)
+    return job
+
+
+@router.get('/{job_id}/file', response_class=FileResponse, name='download_export', status_code=200)
+async def download_export(job_id: str, session: AsyncSession = Depends(get_session)) -> FileResponse:
+    """
+    Отдает готовый файл выгрузки.
+
+    Parameters:
+        job_id (str): Идентификатор задания.
+        session (AsyncSession): Асинхронная сессия с базой данных.
+
+    Returns:
+        FileResponse: Файл .xlsx.
+
+    Raises:
+        HTTPException: 404, если задание не найдено, 409, если выгрузка
+        еще не завершена, 410, если файл удален.
+    """
+    path = await export_service.get_export_file(job_id, session)
+    return FileResponse(path, media_type=XLSX_MEDIA_TYPE, filename=f'menu_{job_id}.xlsx')
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from my_app.config import get_session
+from my_app.schemas.job_schema import ImportJobSchema
+from my_app.services.import_service import ImportService
+
+router = APIRouter()
+
+import_service = ImportService()
+
+
+@router.post('/', response_model=ImportJobSchema, name='post_import', status_code=202)
+async def create_import(file: UploadFile, session: AsyncSession = Depends(get_session)) -> ImportJobSchema:
+    """
+    Принимает книгу в формате Menu.xlsx и запускает ее загрузку в каталог.
+
+    Parameters:
+        file (UploadFile): Файл .xlsx.
+        session (AsyncSession): Асинхронная сессия с базой данных.
+
+    Returns:
+        JSONResponse: Задание загрузки, прогресс и ошибки которого можно запрашивать по id.
+
+    Raises:
+        HTTPException: 415, если файл не .xlsx, 413, если он больше IMPORT_MAX_BYTES,
+        503, если задачу не удалось отправить в брокер; задание помечается неудачным.
+    """
+    job = await import_service.create_import(file, session)
+    return job
+
+
+@router.get('/{job_id}', response_model=ImportJobSchema, name='get_import', status_code=200)
+async def read_import(job_id: str, session: AsyncSession = Depends(get_session)) -> ImportJobSchema:
+    """
+    Получает состояние, прогресс и ошибки строк задания загрузки.
+
+    Parameters:
+        job_id (str): Идентификатор задания.
+        session (AsyncSession): Асинхронная сессия с базой данных.
+
+    Returns:
+        JSONResponse: Статус, количество обработанных строк, общее число строк и ошибки строк.
+
+    Raises:
+        HTTPException: Если задание не найдено.
+    """
+    job = await import_service.read_import(job_id, session)
+    return job
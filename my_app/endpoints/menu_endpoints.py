@@ -1,26 +1,85 @@
 from typing import Any
 
 from cashews import cache
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from my_app.compression import cached_response
+from my_app.conditional import Version, conditional, version_headers
 from my_app.config import get_session
+from my_app.endpoints import batch_endpoints
+from my_app.fields import Fields, expansions, sparse_fields
+from my_app.schemas.dish_schema import DishSchema
 from my_app.schemas.menu_schema import (
     MenuSchema,
     MenuSchemaAdd,
     MenuSchemaUpdate,
     MenuSchemaWithAll,
+    MenuTreeSchema,
 )
+from my_app.schemas.submenu_schema import SubMenuSchema, SubMenuSchemaWithDish
 from my_app.services.menu_service import MenuService
 
 router = APIRouter()
 
 menu_service = MenuService()
 
+menus_with_all_adapter = TypeAdapter(list[MenuSchemaWithAll])
 
-@router.get('/', response_model=list[MenuSchema], name='get_menus', status_code=200)
-@cache(ttl='2m')
+menu_fields = sparse_fields(MenuSchema)
+menu_tree_fields = sparse_fields(MenuSchema, SubMenuSchema, DishSchema)
+menu_include = expansions('submenus', 'submenus.dishes')
+
+# Ключи кеша эндпоинтов строятся только из параметров пути и запроса: сессия БД
+# в ключ не входит. Ответы по одному меню, его подменю и блюдам содержат в ключе
+# menu:<id>, списки и версии всего каталога - catalog. Изменение в меню сбрасывает
+# ответы этого меню и каталога, ответы других меню остаются в кеше
+MENU_SCOPE = 'menu:{menu_id}'
+CATALOG_SCOPE = 'catalog'
+MENU_KEYS = 'my_app.endpoints.*:' + MENU_SCOPE + '*'
+CATALOG_KEYS = 'my_app.endpoints.*:' + CATALOG_SCOPE + '*'
+
+MENUS_KEY = f'{__name__}:read_menus:{CATALOG_SCOPE}:' + '{skip}:{limit}:{fields}'
+MENUS_VERSION_KEY = f'{__name__}:menus_version:{CATALOG_SCOPE}:' + '{skip}:{limit}'
+MENUS_WITH_ALL_VERSION_KEY = f'{__name__}:menus_with_all_version:{CATALOG_SCOPE}'
+MENU_KEY = f'{__name__}:read_one_menu:{MENU_SCOPE}:' + '{include}:{fields}'
+MENU_VERSION_KEY = f'{__name__}:menu_version:{MENU_SCOPE}'
+
+
+async def forget_menu(menu_id: str) -> None:
+    """Сбрасывает ответы меню, его подменю и блюд, а также списки и статистику каталога."""
+    if not cache.is_full_disable:
+        await cache.delete_match(MENU_KEYS.format(menu_id=menu_id))
+        await cache.delete_match(CATALOG_KEYS)
+
+
+menus_with_all_fields = sparse_fields(MenuSchemaWithAll, SubMenuSchemaWithDish, DishSchema)
+
+
+# Версии ответов кешируются вместе с ответами, поэтому повторный условный
+# запрос к закешированному ресурсу не обращается к БД
+@cache(ttl='2m', key=MENUS_VERSION_KEY)
+async def menus_version(skip: int = 0, limit: int = 10, session: AsyncSession = Depends(get_session)) -> Version:
+    return await menu_service.read_menus_version(skip, limit, session)
+
+
+@cache(ttl='2m', key=MENUS_WITH_ALL_VERSION_KEY)
+async def menus_with_all_version(session: AsyncSession = Depends(get_session)) -> Version:
+    return await menu_service.read_menus_with_submenus_and_dishes_version(session)
+
+
+@cache(ttl='2m', key=MENU_VERSION_KEY)
+async def menu_version(menu_id: str, session: AsyncSession = Depends(get_session)) -> Version | None:
+    return await menu_service.read_one_menu_version(menu_id, session)
+
+
+@router.get('/', response_model=list[MenuSchema], name='get_menus', status_code=200,
+            response_model_exclude_unset=True,
+            dependencies=[Depends(conditional(menus_version))])
+@cache(ttl='2m', key=MENUS_KEY)
 async def read_menus(skip: int = 0, limit: int = 10,
+                     fields: Fields = Depends(menu_fields),
                      session: AsyncSession = Depends(get_session)) -> list[MenuSchema]:
     """
     Получает все записи из БД из таблицы Menu.
@@ -28,40 +87,60 @@ async def read_menus(skip: int = 0, limit: int = 10,
     Parameters:
         skip (int, optional): Количество записей, которое нужно пропустить.
         limit (int, optional): Максимальное количество записей для возврата.
+        fields (tuple[str, ...] | None): Запрошенные поля ответа, по умолчанию все.
         session (AsyncSession): Асинхронная сессия с базой данных.
 
     Returns:
         JSONResponse: Ответ с информацией о меню.
     """
-    menus = await menu_service.read_menus(skip, limit, session)
+    menus = await menu_service.read_menus(skip, limit, session, fields)
     return menus
 
 
-@router.get('/all', response_model=list[MenuSchemaWithAll], name='get_menus_with_all', status_code=200)
-@cache(ttl='2m')
-async def read_menus_with_all(session: AsyncSession = Depends(get_session)) -> list[MenuSchemaWithAll]:
+@router.get('/all', response_model=list[MenuSchemaWithAll], name='get_menus_with_all', status_code=200,
+            dependencies=[Depends(conditional(menus_with_all_version))])
+async def read_menus_with_all(request: Request,
+                              fields: Fields = Depends(menus_with_all_fields),
+                              version: Version = Depends(menus_with_all_version),
+                              session: AsyncSession = Depends(get_session)) -> Response:
     """
     Получает все записи из БД из таблицы Menu со связными блюдами и подменю.
+    Ответ кешируется уже сериализованным и сжатым в каждой запрошенной
+    кодировке, ключ кеша включает версию каталога.
 
     Parameters:
+        request (Request): Запрос, из которого берется Accept-Encoding.
+        fields (tuple[str, ...] | None): Поля меню, подменю и блюд в ответе, по умолчанию все.
+        version (Version): Версия каталога.
         session (AsyncSession): Асинхронная сессия с базой данных.
 
     Returns:
-        JSONResponse: Ответ с информацией о меню.
+        Response: Ответ с информацией о меню.
     """
-    menus = await menu_service.read_menus_with_submenus_and_dishes(session)
-    return menus
+    return await cached_response(
+        request, f'{__name__}:read_menus_with_all:{version.etag}:{",".join(fields or "*")}',
+        lambda: menu_service.read_menus_with_submenus_and_dishes(session, fields),
+        menus_with_all_adapter, version_headers(version),
+    )
 
 
-@router.get('/{menu_id}', response_model=MenuSchema, name='get_menu', status_code=200)
-@cache(ttl='2m')
+@router.get('/{menu_id}', response_model=MenuTreeSchema, name='get_menu', status_code=200,
+            response_model_exclude_unset=True,
+            dependencies=[Depends(conditional(menu_version))])
+@cache(ttl='2m', key=MENU_KEY)
 async def read_one_menu(menu_id: str,
-                        session: AsyncSession = Depends(get_session)) -> MenuSchema:
+                        include: Fields = Depends(menu_include),
+                        fields: Fields = Depends(menu_tree_fields),
+                        session: AsyncSession = Depends(get_session)) -> MenuTreeSchema:
     """
-    Получает одну запись из БД из таблицы Menu по указанному идентификатору.
+    Получает одну запись из БД из таблицы Menu по указанному идентификатору,
+    с include=submenus - вместе с подменю, с include=submenus.dishes - с подменю и блюдами.
 
     Parameters:
-        menu_id (str): Идентификатор меню.        session (AsyncSession): Асинхронная сессия с базой данных.
+        menu_id (str): Идентификатор меню.
+        include (tuple[str, ...] | None): Вложенные записи, которые нужно вернуть вместе с меню.
+        fields (tuple[str, ...] | None): Поля меню, подменю и блюд в ответе, по умолчанию все.
+        session (AsyncSession): Асинхронная сессия с базой данных.
 
     Returns:
         JSONResponse: Ответ с информацией о меню.
@@ -70,35 +149,33 @@ async def read_one_menu(menu_id: str,
         HTTPException: Если меню с указанным идентификатором
         не найдено в базе данных.
     """
-    menu = await menu_service.read_one_menu(menu_id, session)
+    if include:
+        return await menu_service.read_menu_tree(menu_id, include, session, fields)
+    menu = await menu_service.read_one_menu(menu_id, session, fields)
     return menu
 
 
 @router.post('/', response_model=MenuSchema, name='post_menu', status_code=201)
 async def create_menu(menu_data: MenuSchemaAdd,
-                      background_tasks: BackgroundTasks,
                       session: AsyncSession = Depends(get_session)) -> MenuSchema:
     """
     Добавляет запись в БД в таблицу Menu.
 
     Parameters:
         menu_data (MenuSchemaAdd): Данные для добавления меню.
-        background_tasks (BackgroundTasks): Объект для работы с фоновыми задачами.
         session (AsyncSession): Асинхронная сессия с базой данных.
 
     Returns:
         JSONResponse: Ответ с информацией о меню.
     """
     new_menu = await menu_service.create_menu(menu_data, session)
-    background_tasks.add_task(cache.invalidate, read_menus)
-    background_tasks.add_task(cache.invalidate, read_one_menu)
+    await forget_menu(new_menu.id)
     return new_menu
 
 
 @router.patch('/{menu_id}', response_model=MenuSchema, name='patch_menu')
 async def update_menu(menu_id: str,
                       menu_data: MenuSchemaUpdate,
-                      background_tasks: BackgroundTasks,
                       session: AsyncSession = Depends(get_session)) -> MenuSchema:
     """
     Обновляет запись в БД в таблице Menu по указанному идентификатору.
@@ -106,7 +183,6 @@ async def update_menu(menu_id: str,
     Parameters:
         menu_id (str): Идентификатор меню, которое необходимо обновить.
         menu_data (MenuSchemaUpdate): Данные для обновления меню.
-        background_tasks (BackgroundTasks): Объект для работы с фоновыми задачами.
         session (AsyncSession): Асинхронная сессия с базой данных.
 
     Returns:
@@ -117,21 +193,18 @@ async def update_menu(menu_id: str,
         не найдено в базе данных.
     """
     updated_menu = await menu_service.update_menu(menu_id, menu_data, session)
-    background_tasks.add_task(cache.invalidate, read_menus)
-    background_tasks.add_task(cache.invalidate, read_one_menu)
+    await forget_menu(menu_id)
     return updated_menu
 
 
 @router.delete('/{menu_id}', response_model=None, name='delete_menu')
 async def delete_menu(menu_id: str,
-                      background_tasks: BackgroundTasks,
                       session: AsyncSession = Depends(get_session)) -> dict[Any, Any]:
     """
     Удаляет запись из БД из таблицы Menu по указанному идентификатору.
 
     Parameters:
         menu_id (str): Идентификатор меню, которое необходимо удалить.
-        background_tasks (BackgroundTasks): Объект для работы с фоновыми задачами.
         session (AsyncSession): Асинхронная сессия с базой данных.
 
     Returns:
@@ -142,8 +215,9 @@ async def delete_menu(menu_id: str,
     """
     removed_menu = await menu_service.delete_menu(menu_id, session)
     if removed_menu:
-        background_tasks.add_task(cache.invalidate, read_menus)
-        background_tasks.add_task(cache.invalidate, read_one_menu)
+        await forget_menu(menu_id)
+        await batch_endpoints.forget_all(batch_endpoints.SUBMENU_KEY)
+        await batch_endpoints.forget_all(batch_endpoints.DISH_KEY)
         return {}
 
     raise HTTPException(status_code=404, detail='menu not found')
@@ -0,0 +1,51 @@
+from cashews import cache
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from my_app.config import get_session
+from my_app.endpoints import menu_endpoints
+from my_app.schemas.stats_schema import CatalogStatsSchema, MenuStatsSchema
+from my_app.services.stats_service import StatsService
+
+router = APIRouter()
+
+stats_service = StatsService()
+
+# Статистика сбрасывается вместе с ответами меню и каталога (menu_endpoints.forget_menu)
+MENU_STATS_KEY = f'{__name__}:read_menu_stats:{menu_endpoints.MENU_SCOPE}'
+CATALOG_STATS_KEY = f'{__name__}:read_catalog_stats:{menu_endpoints.CATALOG_SCOPE}'
+
+
+@router.get('/menus/{menu_id}/stats', response_model=MenuStatsSchema, name='get_menu_stats', status_code=200)
+@cache(ttl='2m', key=MENU_STATS_KEY)
+async def read_menu_stats(menu_id: str, session: AsyncSession = Depends(get_session)) -> MenuStatsSchema:
+    """
+    Получает количество блюд и минимальную, максимальную, среднюю и медианную цену
+    блюд меню и каждого его подменю. Все значения считаются одним запросом к БД.
+
+    Parameters:
+        menu_id (str): Идентификатор меню.
+        session (AsyncSession): Асинхронная сессия с базой данных.
+
+    Returns:
+        JSONResponse: Статистика цен меню и его подменю.
+
+    Raises:
+        HTTPException: Если меню с указанным идентификатором не найдено.
+    """
+    return await stats_service.read_menu_stats(menu_id, session)
+
+
+@router.get('/stats', response_model=CatalogStatsSchema, name='get_stats', status_code=200)
+@cache(ttl='2m', key=CATALOG_STATS_KEY)
+async def read_catalog_stats(session: AsyncSession = Depends(get_session)) -> CatalogStatsSchema:
+    """
+    Получает статистику цен блюд всего каталога и каждого меню, в котором есть блюда.
+
+    Parameters:
+        session (AsyncSession): Асинхронная сессия с базой данных.
+
+    Returns:
+        JSONResponse: Статистика цен каталога и его меню.
+    """
+    return await stats_service.read_catalog_stats(session)
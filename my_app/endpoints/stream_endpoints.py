@@ -0,0 +1,71 @@
+import asyncio
+import json
+import os
+from collections.abc import AsyncIterator
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from my_app.change_feed import ChangeFeed, Subscription
+from my_app.config import engine
+
+STREAM_PING_SECONDS = float(os.environ.get('STREAM_PING_SECONDS', 15))
+# Пауза перед переподключением, которую EventSource берет из поля retry
+STREAM_RETRY_MS = int(os.environ.get('STREAM_RETRY_MS', 3000))
+
+router = APIRouter()
+
+change_feed = ChangeFeed(engine)
+
+
+def sse(event: str, data: dict[str, Any]) -> str:
+    return f'event: {event}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
+
+
+async def event_stream(feed: ChangeFeed, subscription: Subscription,
+                       ping_interval: float = STREAM_PING_SECONDS) -> AsyncIterator[str]:
+    """
+    События подписки в формате Server-Sent Events. StreamingResponse прерывает
+    генератор при отключении клиента, тогда подписка снимается.
+    """
+    try:
+        yield f'retry: {STREAM_RETRY_MS}\n\n'
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), ping_interval)
+            except asyncio.TimeoutError:
+                # Комментарий не дает прокси закрыть простаивающее соединение
+                yield ': ping\n\n'
+                continue
+            yield sse('resync' if event['op'] == 'resync' else 'change', event)
+    finally:
+        feed.unsubscribe(subscription)
+
+
+@router.get('/stream', response_class=StreamingResponse, name='stream_menus', status_code=200)
+async def stream_menus(menu_id: list[str] | None = Query(None, description='Меню, изменения которых нужны')
+                       ) -> StreamingResponse:
+    """
+    Поток изменений меню, подменю и блюд (Server-Sent Events) вместо периодического опроса.
+
+    Событие change приходит после каждого изменяющего запроса к таблице, в том числе
+    из синхронизации с Excel: {"table", "op", "menu_id", "count", "ids"}, где ids
+    отсутствует, если изменено больше 100 строк. Событие resync означает, что часть
+    изменений пропущена и данные нужно перечитать.
+
+    Parameters:
+        menu_id (list[str] | None): Идентификаторы меню (параметр можно повторять). По умолчанию - все меню.
+
+    Returns:
+        StreamingResponse: Поток text/event-stream.
+
+    Raises:
+        HTTPException: Если подписаться на изменения в БД не удалось.
+    """
+    try:
+        subscription = await change_feed.subscribe(frozenset(menu_id) if menu_id else None)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail='change stream is unavailable')
+    return StreamingResponse(event_stream(change_feed, subscription), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
@@ -1,10 +1,13 @@
 from typing import Any
 
 from cashews import cache
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from my_app.conditional import Version, conditional
 from my_app.config import get_session
+from my_app.endpoints import batch_endpoints, menu_endpoints
+from my_app.fields import Fields, sparse_fields
 from my_app.schemas.submenu_schema import (
     SubMenuSchema,
     SubMenuSchemaAdd,
@@ -16,12 +19,35 @@ router = APIRouter()
 
 submenu_service = SubMenuService()
 
+submenu_fields = sparse_fields(SubMenuSchema)
 
-@router.get('/', response_model=list[SubMenuSchema], name='get_submenus', status_code=200)
-@cache(ttl='2m')
+# Ответы подменю сбрасываются вместе с ответами их меню (menu_endpoints.forget_menu)
+SUBMENUS_KEY = f'{__name__}:read_submenus:{menu_endpoints.MENU_SCOPE}:' + '{skip}:{limit}:{fields}'
+SUBMENUS_VERSION_KEY = f'{__name__}:submenus_version:{menu_endpoints.MENU_SCOPE}:' + '{skip}:{limit}'
+SUBMENU_KEY = f'{__name__}:read_one_submenu:{menu_endpoints.MENU_SCOPE}:' + '{submenu_id}:{fields}'
+SUBMENU_VERSION_KEY = f'{__name__}:submenu_version:{menu_endpoints.MENU_SCOPE}:' + '{submenu_id}'
+
+
+@cache(ttl='2m', key=SUBMENUS_VERSION_KEY)
+async def submenus_version(menu_id: str, skip: int = 0, limit: int = 10,
+                           session: AsyncSession = Depends(get_session)) -> Version:
+    return await submenu_service.read_submenus_version(menu_id, skip, limit, session)
+
+
+@cache(ttl='2m', key=SUBMENU_VERSION_KEY)
+async def submenu_version(menu_id: str, submenu_id: str,
+                          session: AsyncSession = Depends(get_session)) -> Version | None:
+    return await submenu_service.read_one_submenu_version(menu_id, submenu_id, session)
+
+
+@router.get('/', response_model=list[SubMenuSchema], name='get_submenus', status_code=200,
+            response_model_exclude_unset=True,
+            dependencies=[Depends(conditional(submenus_version))])
+@cache(ttl='2m', key=SUBMENUS_KEY)
 async def read_submenus(menu_id: str,
                         skip: int = 0,
                         limit: int = 10,
+                        fields: Fields = Depends(submenu_fields),
                         session: AsyncSession = Depends(get_session)) -> list[SubMenuSchema]:
     """
     Получает все записи из БД из таблицы SubMenu для указанного меню по его id.
@@ -30,19 +56,23 @@ async def read_submenus(menu_id: str,
        menu_id (str): Идентификатор меню, для которого нужно получить список подменю.
        skip (int, optional): Количество записей, которое нужно пропустить.
        limit (int, optional): Максимальное количество записей для возврата.
+       fields (tuple[str, ...] | None): Запрошенные поля ответа, по умолчанию все.
        session (AsyncSession): Асинхронная сессия с базой данных.
 
     Returns:
        JSONResponse: JSON-ответ с информацией о подменю c кодом 200.
     """
-    submenus = await submenu_service.read_submenus(menu_id, skip, limit, session)
+    submenus = await submenu_service.read_submenus(menu_id, skip, limit, session, fields)
     return submenus
 
 
-@router.get('/{submenu_id}', response_model=SubMenuSchema, name='get_submenu', status_code=200)
-@cache(ttl='2m')
+@router.get('/{submenu_id}', response_model=SubMenuSchema, name='get_submenu', status_code=200,
+            response_model_exclude_unset=True,
+            dependencies=[Depends(conditional(submenu_version))])
+@cache(ttl='2m', key=SUBMENU_KEY)
 async def read_one_submenu(menu_id: str,
                            submenu_id: str,
+                           fields: Fields = Depends(submenu_fields),
                            session: AsyncSession = Depends(get_session)) -> SubMenuSchema:
     """
     Получает одну запись о конкретном подменю из БД из таблицы SubMenu
@@ -51,6 +81,7 @@ async def read_one_submenu(menu_id: str,
     Parameters:
         menu_id (str): Идентификатор меню, к которому принадлежит подменю.
         submenu_id (str): Идентификатор подменю, которое нужно получить.
+        fields (tuple[str, ...] | None): Запрошенные поля ответа, по умолчанию все.
         session (AsyncSession): Асинхронная сессия с базой данных.
 
     Returns:
@@ -60,14 +91,13 @@ async def read_one_submenu(menu_id: str,
         HTTPException: Если меню или подменю с указанными идентификаторами не
         найдены в базе данных.
     """
-    submenu = await submenu_service.read_one_submenu(menu_id, submenu_id, session)
+    submenu = await submenu_service.read_one_submenu(menu_id, submenu_id, session, fields)
     return submenu
 
 
 @router.post('/', response_model=SubMenuSchema, name='post_submenu', status_code=201)
 async def create_submenu(menu_id: str,
                          submenu_data: SubMenuSchemaAdd,
-                         background_tasks: BackgroundTasks,
                          session: AsyncSession = Depends(get_session)) -> SubMenuSchema:
     """
     Добавляет запись в БД в таблице SubMenu для указанного меню по id.
@@ -75,15 +105,13 @@ async def create_submenu(menu_id: str,
     Parameters:
         menu_id (str): Идентификатор меню, к которому добавляется подменю.
         submenu_data (SubMenuSchemaAdd): Данные для создания нового подменю.
-        background_tasks (BackgroundTasks): Объект для работы с фоновыми задачами.
         session (AsyncSession): Асинхронная сессия с базой данных.
 
     Returns:
         JSONResponse: JSON-ответ с информацией о созданном подменю и кодом 201.
     """
     new_submenu = await submenu_service.create_submenu(menu_id, submenu_data, session)
-    background_tasks.add_task(cache.invalidate, read_submenus)
-    background_tasks.add_task(cache.invalidate, read_one_submenu)
+    await menu_endpoints.forget_menu(menu_id)
     return new_submenu
 
 
@@ -91,7 +119,6 @@ async def create_submenu(menu_id: str,
 async def update_submenu(menu_id: str,
                          submenu_id: str,
                          submenu_data: SubMenuSchemaUpdate,
-                         background_tasks: BackgroundTasks,
                          session: AsyncSession = Depends(get_session)) -> SubMenuSchema:
     """
     Обновляет запись в БД в таблице SubMenu по указанному идентификатору
@@ -101,7 +128,6 @@ async def update_submenu(menu_id: str,
        menu_id (str): Идентификатор меню, к которому принадлежит подменю.
        submenu_id (str): Идентификатор подменю, которое нужно обновить.
        submenu_data (SubMenuSchemaUpdate): данные для обновления записи.
-       background_tasks (BackgroundTasks): Объект для работы с фоновыми задачами.
        session (AsyncSession): Асинхронная сессия с базой данных.
 
     Returns:
@@ -113,22 +139,22 @@ async def update_submenu(menu_id: str,
        найдены в базе данных.
     """
     updated_submenu = await submenu_service.update_submenu(menu_id, submenu_id, submenu_data, session)
-    background_tasks.add_task(cache.invalidate, read_submenus)
-    background_tasks.add_task(cache.invalidate, read_one_submenu)
+    await batch_endpoints.forget(batch_endpoints.SUBMENU_KEY.format(submenu_id))
+    await menu_endpoints.forget_menu(menu_id)
     return updated_submenu
 
 
 @router.delete('/{submenu_id}', response_model=None, name='delete_submenu', status_code=200)
-async def delete_submenu(submenu_id: str,
-                         background_tasks: BackgroundTasks,
+async def delete_submenu(menu_id: str,
+                         submenu_id: str,
                          session: AsyncSession = Depends(get_session)) -> dict[Any, Any]:
     """
     Удаляет запись из БД из таблицы SubMenu по указанному идентификатору
     подменю для указанного меню.
 
     Parameters:
+        menu_id (str): Идентификатор меню, к которому принадлежит подменю.
         submenu_id (str): Идентификатор подменю, которое нужно удалить.
-        background_tasks (BackgroundTasks): Объект для работы с фоновыми задачами.
         session (AsyncSession): Асинхронная сессия с базой данных.
 
     Returns:
@@ -138,10 +164,12 @@ async def delete_submenu(submenu_id: str,
         HTTPException: Если меню или подменю с указанными идентификаторами
         не найдены в базе данных.
     """
-    removed_submenu = await submenu_service.delete_submenu(submenu_id, session)
+    removed_submenu = await submenu_service.delete_submenu(menu_id, submenu_id, session)
     if removed_submenu:
-        background_tasks.add_task(cache.invalidate, read_submenus)
-        background_tasks.add_task(cache.invalidate, read_one_submenu)
+        await batch_endpoints.forget(batch_endpoints.SUBMENU_KEY.format(submenu_id))
+        # Блюда удаляются каскадно, их id здесь неизвестны
+        await batch_endpoints.forget_all(batch_endpoints.DISH_KEY)
+        await menu_endpoints.forget_menu(menu_id)
         return {}
 
     raise HTTPException(status_code=404, detail='submenu not found')
@@ -0,0 +1,108 @@
+"""
+Выборка полей ответа (?fields=id,title,price) и вложенных записей (?include=submenus).
+
+Репозитории читают из БД только колонки запрошенных полей (load_only), а
+количества вложенных записей считаются, только если они запрошены. Эндпоинты
+объявляются с response_model_exclude_unset=True, поэтому в ответ попадают
+только поля, переданные в схему. id возвращается всегда.
+"""
+import uuid
+from collections.abc import Callable, Collection
+from typing import Any
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import Load, load_only
+
+Fields = tuple[str, ...] | None
+
+
+def parse_fields(value: str | None, allowed: Collection[str]) -> Fields:
+    """
+    Returns:
+        tuple[str, ...] | None: Отсортированные имена полей или None, если выборка не задана.
+
+    Raises:
+        HTTPException: Если поле неизвестно или список пуст.
+    """
+    if value is None:
+        return None
+    requested = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = requested - set(allowed)
+    if not requested or unknown:
+        raise HTTPException(status_code=422,
+                            detail=f'fields must be a comma-separated subset of: {", ".join(sorted(allowed))}')
+    # Порядок не важен, отсортированный кортеж дает одинаковый ключ кеша
+    return tuple(sorted(requested | {'id'}))
+
+
+def sparse_fields(*schemas: type[BaseModel]) -> Callable:
+    """
+    Зависимость, разбирающая параметр fields. Допустимы поля всех schemas:
+    для вложенных ответов выборка применяется на каждом уровне.
+    """
+    allowed = {name for schema in schemas for name in schema.model_fields}
+
+    async def fields_dependency(fields: str | None = Query(None, description='Поля ответа через запятую')
+                                ) -> Fields:
+        return parse_fields(fields, allowed)
+
+    return fields_dependency
+
+
+def parse_include(value: str | None, allowed: Collection[str]) -> Fields:
+    """
+    Returns:
+        tuple[str, ...] | None: Отсортированные пути вложенных записей вместе с
+        родительскими путями (submenus.dishes включает submenus) или None.
+
+    Raises:
+        HTTPException: Если путь неизвестен.
+    """
+    if not value:
+        return None
+    requested = {path.strip() for path in value.split(',') if path.strip()}
+    if requested - set(allowed):
+        raise HTTPException(status_code=422, detail=f'include must be a comma-separated subset of: {", ".join(allowed)}')
+    parents = {path.rsplit('.', 1)[0] for path in requested if '.' in path}
+    return tuple(sorted(requested | parents))
+
+
+def expansions(*allowed: str) -> Callable:
+    """Зависимость, разбирающая параметр include."""
+    async def include_dependency(include: str | None = Query(None, description='Вложенные записи через запятую')
+                                 ) -> Fields:
+        return parse_include(include, allowed)
+
+    return include_dependency
+
+
+def wants(fields: Fields, name: str) -> bool:
+    return fields is None or name in fields
+
+
+def load_columns(model: type, fields: Fields) -> list[str]:
+    """
+    Колонки model, которые нужно прочитать для полей fields. Первичный и
+    внешние ключи читаются всегда: они нужны для соединений и загрузки связей.
+    """
+    return [column.key for column in model.__table__.columns
+            if wants(fields, column.key) or column.primary_key or column.foreign_keys]
+
+
+def load_fields(entity: Any, fields: Fields) -> Load:
+    """Опция load_only для модели или aliased entity."""
+    columns = load_columns(inspect(entity).mapper.class_, fields)
+    return load_only(*(getattr(entity, name) for name in columns))
+
+
+def entity_values(entity: Any, schema: type[BaseModel], fields: Fields) -> dict[str, Any]:
+    """Значения колонок entity для запрошенных полей schema. UUID передаются строками."""
+    columns = inspect(entity).mapper.columns.keys()
+    values = {}
+    for name in schema.model_fields:
+        if name in columns and wants(fields, name):
+            value = getattr(entity, name)
+            values[name] = str(value) if isinstance(value, uuid.UUID) else value
+    return values
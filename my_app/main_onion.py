@@ -1,25 +1,128 @@
 import logging
 import os
+from contextlib import asynccontextmanager
 
 from cashews import cache
 from dotenv import load_dotenv
 from fastapi import Depends, FastAPI
+from prometheus_client import REGISTRY
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from my_app.config import get_session
-from my_app.endpoints import dish_endpoints, menu_endpoints, submenu_endpoints
+from my_app.admission import (
+    ADMISSION_LIMITS,
+    AdmissionController,
+    AdmissionMiddleware,
+    Overloaded,
+    overloaded_handler,
+    parse_limits,
+)
+from my_app.compression import CompressionMiddleware
+from my_app.conditional import NotModified, not_modified_handler
+from my_app.config import engine, get_session
+from my_app.deadlines import (
+    ROUTE_TIMEOUTS,
+    DeadlineExceeded,
+    DeadlineMiddleware,
+    deadline_exceeded_handler,
+    install_statement_timeout,
+    parse_timeouts,
+)
+from my_app.endpoints import (
+    batch_endpoints,
+    change_endpoints,
+    dish_endpoints,
+    export_endpoints,
+    import_endpoints,
+    menu_endpoints,
+    stats_endpoints,
+    stream_endpoints,
+    submenu_endpoints,
+)
+from my_app.metrics import (
+    MetricsMiddleware,
+    PoolCollector,
+    cache_metrics_middleware,
+    metrics,
+)
+from my_app.profiling import (
+    PROFILE_DIR,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_SECRET,
+    ProfilingMiddleware,
+)
+from my_app.query_stats import instrument_engine, query_stats_middleware
+from my_app.rate_limit import (
+    RATE_LIMITS,
+    RateLimiter,
+    RateLimitMiddleware,
+    parse_rate_limits,
+)
+from my_app.slow_queries import SLOW_QUERY_MS, SlowQueryLog
+from my_app.warmup import ready, warm_up
 
 logging.basicConfig(level=logging.INFO)
 load_dotenv()
 
 REDIS_URL = os.environ.get('REDIS_URL')
 
-app = FastAPI()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    cache.setup(REDIS_URL)
+    if slow_query_log is not None:
+        slow_query_log.start()
+    # uvicorn начинает принимать запросы только после прогрева
+    await warm_up(app, engine)
+    yield
+    if slow_query_log is not None:
+        await slow_query_log.stop()
+    await stream_endpoints.change_feed.stop()
+    await rate_limiter.close()
+
+
+app = FastAPI(lifespan=lifespan)
+app.state.ready = False
+
+rate_limiter = RateLimiter(parse_rate_limits(RATE_LIMITS), REDIS_URL)
+admission_controller = AdmissionController(parse_limits(ADMISSION_LIMITS), engine.sync_engine.pool)
+route_timeouts = parse_timeouts(ROUTE_TIMEOUTS)
+
+instrument_engine(engine)
+install_statement_timeout(engine)
+app.middleware('http')(query_stats_middleware)
+app.add_middleware(CompressionMiddleware)
+# Внутри AdmissionMiddleware: время ожидания места в классе не входит в бюджет
+app.add_middleware(DeadlineMiddleware, timeouts=route_timeouts, routes=app.router.routes)
+app.add_middleware(AdmissionMiddleware, controller=admission_controller, routes=app.router.routes)
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+app.add_middleware(MetricsMiddleware)
+# Без секрета и доли сэмплирования профилирование не подключается вовсе
+if PROFILE_SECRET or PROFILE_SAMPLE_RATE:
+    app.add_middleware(ProfilingMiddleware, secret=PROFILE_SECRET, sample_rate=PROFILE_SAMPLE_RATE,
+                       directory=PROFILE_DIR)
+app.add_route('/metrics', metrics, include_in_schema=False)
+app.add_route('/ready', ready, include_in_schema=False)
+app.add_exception_handler(NotModified, not_modified_handler)
+app.add_exception_handler(Overloaded, overloaded_handler)
+app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
+
+slow_query_log = SlowQueryLog(engine) if SLOW_QUERY_MS > 0 else None
+
+REGISTRY.register(PoolCollector(engine))
+# Middleware cashews подключаются к бэкенду в cache.setup
+cache.add_middleware(cache_metrics_middleware)
+
+# Раньше меню: иначе /menus/stream совпадет с /menus/{menu_id}
+app.include_router(stream_endpoints.router, prefix='/api/v1/menus', tags=['Menus'])
 app.include_router(menu_endpoints.router, prefix='/api/v1/menus', tags=['Menus'])
 app.include_router(submenu_endpoints.router, prefix='/api/v1/menus/{menu_id}/submenus', tags=['Submenus'])
 app.include_router(dish_endpoints.router,
                    prefix='/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes', tags=['Dishes'])
+app.include_router(batch_endpoints.router, prefix='/api/v1', tags=['Batch'])
+app.include_router(export_endpoints.router, prefix='/api/v1/exports', tags=['Exports'])
+app.include_router(import_endpoints.router, prefix='/api/v1/imports', tags=['Imports'])
+app.include_router(change_endpoints.router, prefix='/api/v1/changes', tags=['Changes'])
+app.include_router(stats_endpoints.router, prefix='/api/v1', tags=['Stats'])
 
 
 @app.middleware('http')
@@ -27,8 +130,3 @@ async def db_session_middleware(request, call_next, session: AsyncSession = Depe
     request.state.db = session
     response = await call_next(request)
     return response
-
-
-@app.on_event('startup')
-async def startup():
-    cache.setup(REDIS_URL)
@@ -0,0 +1,143 @@
+import time
+
+from cashews import Command
+from fastapi import Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds',
+    'Длительность обработки HTTP-запроса по шаблону маршрута',
+    ['method', 'route', 'status'],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight',
+    'Количество HTTP-запросов, обрабатываемых в данный момент',
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total',
+    'Обращения к кешу cashews по закешированной функции',
+    ['function', 'result'],
+)
+CACHE_OPERATION_SECONDS = Histogram(
+    'cache_operation_duration_seconds',
+    'Длительность чтения и записи кеша cashews',
+    ['function', 'operation'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+HTTP_REQUESTS_SHED = Counter(
+    'http_requests_shed_total',
+    'Запросы, отклоненные управлением допуском, по классу маршрута и причине',
+    ['route_class', 'reason'],
+)
+HTTP_REQUEST_TIMEOUTS = Counter(
+    'http_request_timeouts_total',
+    'Запросы, не уложившиеся в бюджет времени, по маршруту и месту прерывания (app или db)',
+    ['route', 'source'],
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    'db_pool_checkout_duration_seconds',
+    'Время получения соединения из пула, включая ожидание и открытие нового соединения',
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware, которое измеряет длительность запросов по шаблону маршрута
+    (например, /api/v1/menus/{menu_id}), а не по фактическому пути.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # Маршрут записывается в scope роутером FastAPI; без него путь
+            # не попадает в метки, чтобы не плодить серии на каждый 404
+            route = scope.get('route')
+            HTTP_REQUEST_SECONDS.labels(
+                scope['method'], getattr(route, 'path_format', 'unmatched'), str(status)
+            ).observe(time.perf_counter() - started)
+
+
+def cached_function(key: str) -> str:
+    """Имя закешированной функции из ключа cashews вида module.path:function:..."""
+    module, _, rest = key.partition(':')
+    return f'{module.rpartition(".")[2]}:{rest.partition(":")[0]}'
+
+
+async def cache_metrics_middleware(call, cmd: Command, backend, *args, **kwargs):
+    if cmd not in (Command.GET, Command.SET):
+        return await call(*args, **kwargs)
+
+    key = kwargs['key'] if 'key' in kwargs else args[0]
+    function = cached_function(key)
+    started = time.perf_counter()
+    result = await call(*args, **kwargs)
+    CACHE_OPERATION_SECONDS.labels(function, cmd.value).observe(time.perf_counter() - started)
+
+    if cmd == Command.GET:
+        default = kwargs['default'] if 'default' in kwargs else (args[1] if len(args) > 1 else None)
+        CACHE_REQUESTS.labels(function, 'miss' if result is default else 'hit').inc()
+    return result
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, который измеряет время ожидания соединения."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - started)
+
+
+class PoolCollector:
+    """Снимает состояние пула соединений в момент запроса /metrics."""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+
+    def collect(self):
+        pool = self.engine.sync_engine.pool
+        if not isinstance(pool, AsyncAdaptedQueuePool):
+            return
+
+        for name, documentation, value in (
+            ('db_pool_size', 'Размер пула соединений', pool.size()),
+            ('db_pool_checked_out', 'Соединения, выданные из пула', pool.checkedout()),
+            ('db_pool_checked_in', 'Свободные соединения в пуле', pool.checkedin()),
+            # overflow() отрицателен, пока пул заполнен не полностью
+            ('db_pool_overflow', 'Соединения сверх размера пула', max(pool.overflow(), 0)),
+            ('db_pool_waiting', 'Запросы, ожидающие соединения', getattr(pool, 'waiting', 0)),
+        ):
+            yield GaugeMetricFamily(name, documentation, value=value)
+
+
+async def metrics(request: Request) -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,10 +1,143 @@
 import uuid
 
-from sqlalchemy import UUID, Column, Float, ForeignKey, String
+from sqlalchemy import (
+    DDL,
+    JSON,
+    UUID,
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    Sequence,
+    String,
+    Table,
+    event,
+    func,
+    text,
+)
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
 
+# updated_at ведется триггерами, чтобы его меняли и API, и синхронизация через COPY.
+# Изменение блюда обновляет updated_at подменю, изменение подменю - меню,
+# поэтому версия меню покрывает все его дерево
+SET_UPDATED_AT = DDL('''
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.updated_at = clock_timestamp();
+    RETURN NEW;
+END $$
+''')
+TOUCH_PARENT = DDL('''
+CREATE OR REPLACE FUNCTION touch_parent() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP <> 'DELETE' THEN
+        EXECUTE format('UPDATE %%I SET updated_at = clock_timestamp() WHERE id IN (SELECT %%I FROM new_rows)',
+                       TG_ARGV[0], TG_ARGV[1]);
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        EXECUTE format('UPDATE %%I SET updated_at = clock_timestamp() WHERE id IN (SELECT %%I FROM old_rows)',
+                       TG_ARGV[0], TG_ARGV[1]);
+    END IF;
+    RETURN NULL;
+END $$
+''')
+# Уведомление в канал menu_changes после каждого изменяющего оператора: одно событие
+# на меню с числом строк и их id (не больше 100, чтобы уложиться в лимит NOTIFY).
+# TG_ARGV[0] - запрос id и menu_id измененных строк из переходной таблицы
+NOTIFY_MENU_CHANGE = DDL("""
+CREATE OR REPLACE FUNCTION notify_menu_change() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    payload text;
+BEGIN
+    -- updated_at родителей, обновленный touch_parent, - не отдельное изменение
+    IF pg_trigger_depth() > 1 THEN
+        RETURN NULL;
+    END IF;
+    FOR payload IN EXECUTE format(
+        'SELECT json_build_object(''table'', %%L, ''op'', %%L, ''menu_id'', menu_id, ''count'', count(*), '
+        || '''ids'', CASE WHEN count(*) <= 100 THEN json_agg(id) END)::text '
+        || 'FROM (' || TG_ARGV[0] || ') changed GROUP BY menu_id',
+        TG_TABLE_NAME, lower(TG_OP), CASE TG_OP WHEN 'DELETE' THEN 'old_rows' ELSE 'new_rows' END)
+    LOOP
+        PERFORM pg_notify('menu_changes', payload);
+    END LOOP;
+    RETURN NULL;
+END $$
+""")
+# Журнал изменений для клиентов с локальной копией каталога: по строке на сущность и меню
+# с номером последнего изменения, удаленные сущности остаются в журнале с deleted = true.
+# Сущность, перенесенная в другое меню, записывается удаленной из прежнего меню
+RECORD_MENU_CHANGE = DDL("""
+CREATE OR REPLACE FUNCTION record_menu_change() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    upsert text := 'INSERT INTO changes (entity, entity_id, menu_id, deleted) '
+        || 'SELECT %%L, id, menu_id, %%L FROM (%%s) changed WHERE menu_id IS NOT NULL '
+        || 'ON CONFLICT (entity, entity_id, menu_id) DO UPDATE SET seq = EXCLUDED.seq, xid = EXCLUDED.xid, '
+        || 'deleted = EXCLUDED.deleted, changed_at = EXCLUDED.changed_at';
+    moved text := 'SELECT o.id, o.menu_id AS old_menu_id, n.menu_id FROM (%%s) o JOIN (%%s) n ON n.id = o.id '
+        || 'WHERE n.menu_id IS DISTINCT FROM o.menu_id';
+BEGIN
+    IF pg_trigger_depth() > 1 THEN
+        RETURN NULL;
+    END IF;
+    -- Номера не упорядочены по фиксации транзакций, читатели берут только записи
+    -- завершенных транзакций (changes.xid ниже pg_snapshot_xmin), поэтому блокировка не нужна
+    IF TG_OP = 'UPDATE' THEN
+        moved := format(moved, format(TG_ARGV[0], 'old_rows'), format(TG_ARGV[0], 'new_rows'));
+        EXECUTE format(upsert, TG_TABLE_NAME, true, 'SELECT id, old_menu_id AS menu_id FROM (' || moved || ') m');
+        IF TG_TABLE_NAME = 'submenus' THEN
+            -- Блюда переезжают вместе с подменю, их строки не меняются
+            EXECUTE format(upsert, 'dishes', true, 'SELECT d.id, m.old_menu_id AS menu_id FROM (' || moved
+                           || ') m JOIN dishes d ON d.submenu_id = m.id');
+            EXECUTE format(upsert, 'dishes', false, 'SELECT d.id, m.menu_id FROM (' || moved
+                           || ') m JOIN dishes d ON d.submenu_id = m.id');
+        END IF;
+    END IF;
+    EXECUTE format(upsert, TG_TABLE_NAME, TG_OP = 'DELETE',
+                   format(TG_ARGV[0], CASE TG_OP WHEN 'DELETE' THEN 'old_rows' ELSE 'new_rows' END));
+    RETURN NULL;
+END $$
+""")
+event.listen(Base.metadata, 'before_create', SET_UPDATED_AT)
+event.listen(Base.metadata, 'before_create', TOUCH_PARENT)
+event.listen(Base.metadata, 'before_create', NOTIFY_MENU_CHANGE)
+event.listen(Base.metadata, 'before_create', RECORD_MENU_CHANGE)
+
+
+def track_updates(table: Table, parent: str | None = None, foreign_key: str | None = None) -> None:
+    event.listen(table, 'after_create', DDL(
+        f'CREATE TRIGGER {table.name}_set_updated_at BEFORE UPDATE ON {table.name} '
+        f'FOR EACH ROW EXECUTE FUNCTION set_updated_at()'
+    ))
+    if parent is None:
+        return
+    # Триггеры на оператор: COPY и массовые UPDATE обновляют каждого родителя один раз
+    for operation, referencing in (('insert', 'NEW TABLE AS new_rows'),
+                                   ('update', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+                                   ('delete', 'OLD TABLE AS old_rows')):
+        event.listen(table, 'after_create', DDL(
+            f'CREATE TRIGGER {table.name}_touch_{parent}_on_{operation} AFTER {operation.upper()} ON {table.name} '
+            f"REFERENCING {referencing} FOR EACH STATEMENT EXECUTE FUNCTION touch_parent('{parent}', '{foreign_key}')"
+        ))
+
+
+def track_changes(table: Table, changed_rows: str) -> None:
+    # Журнал изменений пишется теми же триггерами, поэтому в него попадает и синхронизация через COPY
+    for operation, referencing in (('insert', 'NEW TABLE AS new_rows'),
+                                   ('update', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+                                   ('delete', 'OLD TABLE AS old_rows')):
+        for action, function in (('notify', 'notify_menu_change'), ('record', 'record_menu_change')):
+            event.listen(table, 'after_create', DDL(
+                f'CREATE TRIGGER {table.name}_{action}_on_{operation} AFTER {operation.upper()} ON {table.name} '
+                f"REFERENCING {referencing} FOR EACH STATEMENT EXECUTE FUNCTION {function}('{changed_rows}')"
+            ))
+
 
 class Menu(Base):  # type: ignore
     __tablename__ = 'menus'
@@ -12,6 +145,7 @@ class Menu(Base):  # type: ignore
     id = Column(UUID, primary_key=True, index=True, default=uuid.uuid4)
     title = Column(String, index=True, unique=True)
     description = Column(String)
+    updated_at = Column(DateTime(timezone=True), server_default=func.clock_timestamp())
 
     submenus = relationship('SubMenu', back_populates='menu', cascade='all, delete-orphan')
 
@@ -23,6 +157,7 @@ class SubMenu(Base):  # type: ignore
     title = Column(String, index=True, unique=True)
     description = Column(String)
     menu_id = Column(UUID, ForeignKey('menus.id'))
+    updated_at = Column(DateTime(timezone=True), server_default=func.clock_timestamp())
 
     menu = relationship('Menu', back_populates='submenus')
     dishes = relationship('Dish', back_populates='submenu', cascade='all, delete-orphan')
@@ -36,5 +171,76 @@ class Dish(Base):  # type: ignore
     description = Column(String)
     price = Column(Float, index=True)
     submenu_id = Column(UUID, ForeignKey('submenus.id'))
+    updated_at = Column(DateTime(timezone=True), server_default=func.clock_timestamp())
 
     submenu = relationship('SubMenu', back_populates='dishes')
+
+
+track_updates(Menu.__table__)
+track_updates(SubMenu.__table__, parent='menus', foreign_key='menu_id')
+track_updates(Dish.__table__, parent='submenus', foreign_key='submenu_id')
+track_changes(Menu.__table__, 'SELECT id, id AS menu_id FROM %%I')
+track_changes(SubMenu.__table__, 'SELECT id, menu_id FROM %%I')
+# Подменю удаляются после своих блюд, поэтому меню удаленного блюда еще известно
+track_changes(Dish.__table__, 'SELECT d.id, s.menu_id FROM %%I d LEFT JOIN submenus s ON s.id = d.submenu_id')
+
+
+class SyncRun(Base):  # type: ignore
+    __tablename__ = 'sync_runs'
+
+    id = Column(UUID, primary_key=True, index=True, default=uuid.uuid4)
+    source = Column(String)
+    mode = Column(String)
+    status = Column(String, index=True)
+    started_at = Column(DateTime(timezone=True), index=True)
+    duration = Column(Float)
+    phases = Column(JSON)
+    rows = Column(JSON)
+    error = Column(String)
+
+
+class SlowQuery(Base):  # type: ignore
+    __tablename__ = 'slow_queries'
+
+    id = Column(UUID, primary_key=True, index=True, default=uuid.uuid4)
+    statement = Column(String)
+    parameters = Column(String)
+    route = Column(String, index=True)
+    duration = Column(Float)
+    plan = Column(JSON)
+    created_at = Column(DateTime(timezone=True), index=True)
+
+
+class Job(Base):  # type: ignore
+    __tablename__ = 'jobs'
+
+    id = Column(UUID, primary_key=True, index=True, default=uuid.uuid4)
+    kind = Column(String, index=True)
+    status = Column(String, index=True, default='pending')
+    processed = Column(Integer, default=0)
+    total = Column(Integer)
+    file_path = Column(String)
+    error = Column(String)
+    # Ошибки строк загрузки: [{'row': номер строки, 'error': текст}]
+    errors = Column(JSON)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True))
+
+
+CHANGES_SEQ = Sequence('changes_seq', metadata=Base.metadata)
+
+
+class Change(Base):  # type: ignore
+    __tablename__ = 'changes'
+
+    # Имя таблицы сущности: menus, submenus или dishes
+    entity = Column(String, primary_key=True)
+    entity_id = Column(UUID, primary_key=True)
+    menu_id = Column(UUID, primary_key=True)
+    seq = Column(BigInteger, CHANGES_SEQ, server_default=CHANGES_SEQ.next_value(), nullable=False, unique=True)
+    # Транзакция изменения: журнал читается в порядке (xid, seq) только до pg_snapshot_xmin
+    xid = Column(BigInteger, server_default=text('pg_current_xact_id()::text::bigint'), nullable=False)
+    deleted = Column(Boolean, nullable=False, default=False)
+    changed_at = Column(DateTime(timezone=True), server_default=func.clock_timestamp())
+
+    __table_args__ = (Index('ix_changes_xid_seq', 'xid', 'seq'),)
@@ -0,0 +1,157 @@
+"""
+Профилирование отдельных запросов.
+
+Запрос профилируется, если в нем передан подписанный токен (заголовок
+X-Profile или параметр ?profile=) либо если его выбрал PROFILE_SAMPLE_RATE.
+Отчет сохраняется в PROFILE_DIR в формате folded stacks, который понимают
+flamegraph.pl и speedscope. Корневые кадры каждого стека содержат маршрут
+и идентификатор запроса.
+
+Токен на 10 минут:
+
+    PROFILE_SECRET=... python -m my_app.profiling --ttl 600
+"""
+import argparse
+import hashlib
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from urllib.parse import parse_qs
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROFILE_SECRET = os.environ.get('PROFILE_SECRET', '')
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+PROFILE_INTERVAL = float(os.environ.get('PROFILE_INTERVAL', 0.005))
+
+# Идентификатор запроса от клиента попадает в имя файла
+REQUEST_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,64}')
+
+
+def make_profile_token(secret: str, ttl: int) -> str:
+    expires = int(time.time()) + ttl
+    signature = hmac.new(secret.encode(), str(expires).encode(), hashlib.sha256).hexdigest()
+    return f'{expires}.{signature}'
+
+
+def check_profile_token(secret: str, token: str) -> bool:
+    expires, _, signature = token.partition('.')
+    if not secret or not expires.isdigit() or int(expires) < time.time():
+        return False
+    expected = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+class StackSampler:
+    """
+    Сэмплирующий профилировщик: фоновый поток с интервалом PROFILE_INTERVAL
+    снимает стек потока event loop. В стек попадают и другие запросы,
+    которые обрабатывались одновременно с профилируемым.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def folded(self, *root: str) -> str:
+        prefix = ';'.join(root)
+        return ''.join(f'{prefix};{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class ProfilingMiddleware:
+    """
+    ASGI-middleware профилирования. Подключается в main_onion, только если задан
+    PROFILE_SECRET или PROFILE_SAMPLE_RATE, поэтому без них не добавляет накладных расходов.
+    """
+
+    def __init__(self, app: ASGIApp, secret: str = '', sample_rate: float = 0.0,
+                 directory: str = PROFILE_DIR, interval: float = PROFILE_INTERVAL):
+        self.app = app
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.directory = directory
+        self.interval = interval
+        # Одновременно профилируется один запрос: стеки потока общие для всех запросов
+        self._busy = False
+
+    def _requested(self, scope: Scope) -> bool:
+        headers = dict(scope['headers'])
+        token = headers.get(b'x-profile', b'').decode()
+        if not token:
+            token = parse_qs(scope.get('query_string', b'').decode()).get('profile', [''])[0]
+        if token:
+            return check_profile_token(self.secret, token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or self._busy or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._busy = True
+        request_id = dict(scope['headers']).get(b'x-request-id', b'').decode()
+        if not REQUEST_ID_PATTERN.fullmatch(request_id):
+            request_id = uuid.uuid4().hex
+        file_name = f'{time.strftime("%Y%m%dT%H%M%S")}_{request_id}.folded'
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                message.setdefault('headers', [])
+                message['headers'] = [*message['headers'], (b'x-request-id', request_id.encode()),
+                                      (b'x-profile-report', file_name.encode())]
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            self._busy = False
+            route = getattr(scope.get('route'), 'path_format', scope['path'])
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, file_name), 'w') as report:
+                report.write(sampler.folded(f'{scope["method"]} {route}', f'request {request_id}'))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m my_app.profiling', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ttl', type=int, default=600, help='срок действия токена в секундах')
+    args = parser.parse_args()
+
+    if not PROFILE_SECRET:
+        parser.error('PROFILE_SECRET не задан')
+    print(make_profile_token(PROFILE_SECRET, args.ttl))
+
+
+if __name__ == '__main__':
+    main()
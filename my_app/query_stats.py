@@ -0,0 +1,106 @@
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import Scope
+
+# Добавлять в ответы заголовки X-DB-Queries и Server-Timing
+DB_QUERY_HEADERS = os.environ.get('DB_QUERY_HEADERS', 'false').lower() in ('1', 'true', 'yes')
+
+
+class QueryStats:
+    """Количество и суммарное время запросов к БД в рамках одного HTTP-запроса или теста."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __repr__(self) -> str:
+        return f'QueryStats(count={self.count}, duration={self.duration:.6f})'
+
+
+# Вложенные замеры (тест вокруг HTTP-запроса) учитывают один и тот же запрос к БД
+_active: ContextVar[tuple[QueryStats, ...]] = ContextVar('query_stats', default=())
+# scope текущего HTTP-запроса: роутер FastAPI дописывает в него маршрут
+_request_scope: ContextVar[Scope | None] = ContextVar('request_scope', default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _active.set(_active.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+def current_route() -> str | None:
+    """Метод и шаблон маршрута HTTP-запроса, в котором выполняется запрос к БД."""
+    scope = _request_scope.get()
+    if scope is None:
+        return None
+    route = scope.get('route')
+    return f'{scope["method"]} {getattr(route, "path_format", scope["path"])}'
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Подключает подсчет запросов к движку. Повторный вызов для того же движка ничего не делает."""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, 'before_cursor_execute', _before_cursor_execute):
+        return
+
+    event.listen(sync_engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(sync_engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(sync_engine, 'handle_error', _handle_error)
+
+
+def _counted(context) -> bool:
+    # Служебные команды (execution_options(query_stats=False)) не считаются запросами эндпоинта
+    return context is None or context.execution_options.get('query_stats', True)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not _counted(context):
+        return
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _finish(conn) -> None:
+    if conn is None or not conn.info.get('query_started'):
+        return
+    started = conn.info['query_started'].pop()
+    elapsed = time.perf_counter() - started
+    for stats in _active.get():
+        stats.count += 1
+        stats.duration += elapsed
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _counted(context):
+        _finish(conn)
+
+
+def _handle_error(exception_context):
+    # Запрос с ошибкой тоже выполнялся в БД
+    if _counted(exception_context.execution_context):
+        _finish(exception_context.connection)
+
+
+async def query_stats_middleware(request: Request, call_next):
+    token = _request_scope.set(request.scope)
+    try:
+        with track_queries() as stats:
+            response = await call_next(request)
+    finally:
+        _request_scope.reset(token)
+
+    if DB_QUERY_HEADERS:
+        response.headers['X-DB-Queries'] = str(stats.count)
+        response.headers['Server-Timing'] = f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"'
+    return response
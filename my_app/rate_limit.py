@@ -0,0 +1,185 @@
+"""
+Ограничение частоты запросов к API алгоритмом token bucket.
+
+Лимиты задаются для шаблонов маршрутов в RATE_LIMITS, например
+'/api/v1/menus/all=2:10;*=50:100': маршрут=токенов в секунду:размер корзины,
+* - лимит для остальных маршрутов /api/. Корзина ведется отдельно для каждого
+ключа API (заголовок X-API-Key) или, без ключа, для IP клиента.
+
+Корзины хранятся в Redis, который использует кеш cashews, и обновляются атомарно
+Lua-скриптом, поэтому лимит общий для всех процессов API. Если Redis недоступен,
+используются корзины в памяти процесса: лимит тогда действует в каждом процессе отдельно.
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+from typing import NamedTuple
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+from starlette.datastructures import Headers
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+RATE_LIMITS = os.environ.get('RATE_LIMITS', '')
+RATE_LIMIT_KEY_HEADER = os.environ.get('RATE_LIMIT_KEY_HEADER', 'X-API-Key')
+# Пока Redis недоступен, он не опрашивается на каждом запросе
+RATE_LIMIT_REDIS_RETRY_SECONDS = float(os.environ.get('RATE_LIMIT_REDIS_RETRY_SECONDS', 5))
+RATE_LIMIT_REDIS_TIMEOUT = float(os.environ.get('RATE_LIMIT_REDIS_TIMEOUT', 0.05))
+RATE_LIMIT_LOCAL_BUCKETS = 10000
+
+# Время берется у Redis, чтобы часы процессов API не влияли на корзину.
+# Возвращает 0, если запрос разрешен, иначе через сколько миллисекунд появится токен
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return wait
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimit(NamedTuple):
+    # Токенов в секунду
+    rate: float
+    # Размер корзины: сколько запросов можно сделать подряд
+    burst: int
+
+
+def parse_rate_limits(value: str) -> dict[str, RateLimit]:
+    """
+    Returns:
+        dict[str, RateLimit]: Лимиты по шаблону маршрута, * - лимит по умолчанию.
+
+    Raises:
+        ValueError: Если лимит записан не в виде маршрут=скорость:корзина.
+    """
+    limits = {}
+    for item in value.split(';'):
+        if not item.strip():
+            continue
+        route, _, limit = item.strip().rpartition('=')
+        rate, _, burst = limit.partition(':')
+        if not route or float(rate) <= 0 or int(burst or 1) < 1:
+            raise ValueError(f'Некорректный лимит запросов: {item}')
+        limits[route] = RateLimit(float(rate), int(burst or max(1, math.ceil(float(rate)))))
+    return limits
+
+
+class RateLimiter:
+    def __init__(self, limits: dict[str, RateLimit], redis_url: str | None = None):
+        self.limits = limits
+        self.client = redis.from_url(redis_url, socket_timeout=RATE_LIMIT_REDIS_TIMEOUT,
+                                     socket_connect_timeout=RATE_LIMIT_REDIS_TIMEOUT) \
+            if redis_url and redis_url.startswith(('redis://', 'rediss://')) else None
+        self.script = self.client.register_script(TOKEN_BUCKET_SCRIPT) if self.client is not None else None
+        self.redis_down_until = 0.0
+        # Корзины в памяти: ключ -> (токены, время обновления, время, когда корзина снова полна)
+        self.buckets: dict[str, tuple[float, float, float]] = {}
+
+    @property
+    def limits(self) -> dict[str, RateLimit]:
+        return self._limits
+
+    @limits.setter
+    def limits(self, limits: dict[str, RateLimit]) -> None:
+        self._limits = limits
+        # Шаблоны без параметров проверяются первыми: /menus/all не должен попасть под /menus/{menu_id}
+        routes = sorted((route for route in limits if route != '*'), key=lambda route: route.count('{'))
+        self.routes = [(compile_path(route)[0], route, limits[route]) for route in routes]
+
+    def limit_for(self, path: str) -> tuple[str, RateLimit] | None:
+        for pattern, route, limit in self.routes:
+            if pattern.match(path):
+                return route, limit
+        if '*' in self.limits and path.startswith('/api/'):
+            return '*', self.limits['*']
+        return None
+
+    def acquire_local(self, key: str, limit: RateLimit) -> float:
+        now = time.monotonic()
+        if len(self.buckets) > RATE_LIMIT_LOCAL_BUCKETS:
+            # Полная корзина не отличается от отсутствующей
+            self.buckets = {name: bucket for name, bucket in self.buckets.items() if bucket[2] > now}
+        tokens, updated, _ = self.buckets.get(key, (limit.burst, now, now))
+        tokens = min(limit.burst, tokens + (now - updated) * limit.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / limit.rate
+        self.buckets[key] = (tokens, now, now + (limit.burst - tokens) / limit.rate)
+        return wait
+
+    async def acquire(self, key: str, limit: RateLimit) -> float:
+        """
+        Забирает токен из корзины key.
+
+        Returns:
+            float: 0, если запрос разрешен, иначе сколько секунд ждать следующего токена.
+        """
+        if self.script is not None and time.monotonic() >= self.redis_down_until:
+            try:
+                return await self.script(keys=[key], args=[limit.rate, limit.burst]) / 1000
+            except (RedisError, OSError):
+                logger.warning('Redis недоступен, лимиты запросов считаются в памяти процесса', exc_info=True)
+                self.redis_down_until = time.monotonic() + RATE_LIMIT_REDIS_RETRY_SECONDS
+        return self.acquire_local(key, limit)
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.close()
+
+
+def client_key(scope: Scope) -> str:
+    api_key = Headers(scope=scope).get(RATE_LIMIT_KEY_HEADER)
+    if api_key:
+        # Ключ API не хранится в Redis в открытом виде
+        return 'key:' + hashlib.sha256(api_key.encode()).hexdigest()[:32]
+    client = scope.get('client')
+    return f'ip:{client[0] if client else "unknown"}'
+
+
+class RateLimitMiddleware:
+    """Отвечает 429 с Retry-After, когда в корзине клиента для маршрута нет токенов."""
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        matched = self.limiter.limit_for(scope['path']) if scope['type'] == 'http' else None
+        if matched is None:
+            await self.app(scope, receive, send)
+            return
+
+        route, limit = matched
+        wait = await self.limiter.acquire(f'rate:{route}:{client_key(scope)}', limit)
+        if wait <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        body = json.dumps({'detail': 'rate limit exceeded'}).encode()
+        await send({'type': 'http.response.start', 'status': 429, 'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            (b'retry-after', str(max(1, math.ceil(wait))).encode()),
+        ]})
+        await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,21 @@
+from sqlalchemy import BigInteger, Row, String, and_, cast, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from my_app.models.models import Change, Dish, Menu, SubMenu
+
+
+async def get_changes_since(since: tuple[int, int], limit: int, session: AsyncSession) -> list[Row]:
+    # Номера выдаются без блокировки и фиксируются не по порядку, поэтому журнал читается
+    # только до xmin снимка: транзакции ниже него завершены, а будущие изменения получат xid не меньше
+    horizon = cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), String), BigInteger)
+    # Сущности присоединяются по первичному ключу, выборка по (xid, seq) идет по индексу ix_changes_xid_seq
+    changes = await session.execute(
+        select(Change, Menu, SubMenu, Dish)
+        .outerjoin(Menu, and_(Change.entity == 'menus', Menu.id == Change.entity_id))
+        .outerjoin(SubMenu, and_(Change.entity == 'submenus', SubMenu.id == Change.entity_id))
+        .outerjoin(Dish, and_(Change.entity == 'dishes', Dish.id == Change.entity_id))
+        .filter(tuple_(Change.xid, Change.seq) > tuple_(*since), Change.xid < horizon)
+        .order_by(Change.xid, Change.seq)
+        .limit(limit)
+    )
+    return list(changes)
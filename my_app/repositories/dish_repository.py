@@ -1,12 +1,32 @@
+import uuid
+from datetime import datetime
 from typing import Any
 
-from sqlalchemy import ScalarResult, select
+from sqlalchemy import UUID, ScalarResult, Select, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from my_app.models.models import Dish
+from my_app.fields import Fields, load_fields
+from my_app.models.models import Dish, SubMenu
 from my_app.schemas.dish_schema import DishSchema, DishSchemaAdd, DishSchemaUpdate
 
 
+def in_submenu(menu_id: str, submenu_id: str) -> Select:
+    """Подменю, если оно принадлежит меню: подменю чужого меню не найдется."""
+    return select(SubMenu.id).filter(SubMenu.id == submenu_id, SubMenu.menu_id == menu_id)
+
+
+async def submenu_exists(menu_id: str, submenu_id: str, session: AsyncSession) -> bool:
+    result = await session.execute(in_submenu(menu_id, submenu_id))
+    return result.scalar_one_or_none() is not None
+
+
+def dishes_page(menu_id: str, submenu_id: str, skip: int, limit: int, *columns) -> Select:
+    """Страница блюд подменю, общая для данных и версии списка."""
+    return select(*columns).filter(
+        Dish.submenu_id.in_(in_submenu(menu_id, submenu_id))).order_by(Dish.id).offset(skip).limit(limit)
+
+
 async def create_dish(submenu_id: str,
                       dish_data: DishSchemaAdd,
                       session: AsyncSession) -> DishSchema:
@@ -32,29 +52,60 @@ async def create_dish(submenu_id: str,
     return new_dish
 
 
-async def get_all_dishes(submenu_id: str,
+async def get_all_dishes(menu_id: str,
+                         submenu_id: str,
                          skip: int,
                          limit: int,
-                         session: AsyncSession) -> ScalarResult[Any]:
-    dishes = await session.execute(select(Dish).filter(
-        Dish.submenu_id == submenu_id).offset(skip).limit(limit))
+                         session: AsyncSession,
+                         fields: Fields = None) -> ScalarResult[Any]:
+    dishes = await session.execute(
+        dishes_page(menu_id, submenu_id, skip, limit, Dish).options(load_fields(Dish, fields)))
     return dishes.scalars()
 
 
-async def get_dish_by_id(submenu_id: str, dish_id: str, session: AsyncSession) -> DishSchema | None:
-    dish = await session.execute(select(Dish).filter(
-        Dish.id == dish_id, Dish.submenu_id == submenu_id))
+async def get_dishes_versions(menu_id: str,
+                              submenu_id: str,
+                              skip: int,
+                              limit: int,
+                              session: AsyncSession) -> list[tuple[uuid.UUID, datetime]]:
+    result = await session.execute(dishes_page(menu_id, submenu_id, skip, limit, Dish.id, Dish.updated_at))
+    return list(result.tuples())
+
+
+async def get_dish_version(menu_id: str,
+                           submenu_id: str,
+                           dish_id: str,
+                           session: AsyncSession) -> list[tuple[uuid.UUID, datetime]]:
+    result = await session.execute(select(Dish.id, Dish.updated_at).filter(
+        Dish.id == dish_id, Dish.submenu_id.in_(in_submenu(menu_id, submenu_id))))
+    return list(result.tuples())
+
+
+async def get_dishes_by_ids(dish_ids: list[uuid.UUID], session: AsyncSession) -> list[Dish]:
+    # Один параметр-массив: текст запроса не зависит от числа id
+    result = await session.execute(select(Dish).filter(
+        Dish.id == any_(bindparam('dish_ids', dish_ids, type_=ARRAY(UUID)))))
+    return list(result.scalars())
+
+
+async def get_dish_by_id(menu_id: str, submenu_id: str, dish_id: str, session: AsyncSession,
+                         fields: Fields = None) -> DishSchema | None:
+    dish = await session.execute(select(Dish).options(load_fields(Dish, fields)).filter(
+        Dish.id == dish_id, Dish.submenu_id.in_(in_submenu(menu_id, submenu_id))))
 
     return dish.scalar_one_or_none()
 
 
-async def update_dish_by_id(submenu_id: str,
+async def update_dish_by_id(menu_id: str,
+                            submenu_id: str,
                             dish_id: str,
                             dish_data: DishSchemaUpdate,
-                            session: AsyncSession) -> DishSchemaUpdate:
+                            session: AsyncSession) -> DishSchemaUpdate | None:
     updated_dish = await session.execute(select(Dish).filter(
-        Dish.id == dish_id, Dish.submenu_id == submenu_id))
+        Dish.id == dish_id, Dish.submenu_id.in_(in_submenu(menu_id, submenu_id))))
     updated_dish = updated_dish.scalar_one_or_none()
+    if updated_dish is None:
+        return None
 
     updated_dish.title = dish_data.title
     updated_dish.description = dish_data.description
@@ -65,11 +116,13 @@ async def update_dish_by_id(submenu_id: str,
     return updated_dish
 
 
-async def delete_dish(submenu_id: str, dish_id: str, session: AsyncSession) -> DishSchema:
+async def delete_dish(menu_id: str, submenu_id: str, dish_id: str, session: AsyncSession) -> DishSchema | None:
     query = select(Dish).filter(
-        Dish.id == dish_id, Dish.submenu_id == submenu_id)
+        Dish.id == dish_id, Dish.submenu_id.in_(in_submenu(menu_id, submenu_id)))
     removed_submenu = await session.execute(query)
     removed_submenu = removed_submenu.scalar_one_or_none()
+    if removed_submenu is None:
+        return None
 
     await session.delete(removed_submenu)
     await session.commit()
@@ -0,0 +1,27 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from my_app.models.models import Job
+
+
+async def create_job(kind: str, session: AsyncSession, file_path: str | None = None) -> Job:
+    new_job = Job(kind=kind, status='pending', processed=0, file_path=file_path)
+
+    session.add(new_job)
+    await session.commit()
+    await session.refresh(new_job)
+
+    return new_job
+
+
+async def fail_job(job: Job, error: str, session: AsyncSession) -> None:
+    job.status, job.error, job.finished_at = 'failed', error, datetime.now(timezone.utc)
+    await session.commit()
+
+
+async def get_job_by_id(job_id: str, kind: str, session: AsyncSession) -> Job | None:
+    job = await session.execute(select(Job).filter(Job.id == job_id, Job.kind == kind))
+
+    return job.scalar_one_or_none()
@@ -1,7 +1,11 @@
-from sqlalchemy import ScalarResult, distinct, func, select
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Row, Select, distinct, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, joinedload, selectinload
 
+from my_app.fields import Fields, load_columns, load_fields, wants
 from my_app.models.models import Dish, Menu, SubMenu
 from my_app.schemas.menu_schema import MenuSchema, MenuSchemaAdd, MenuSchemaUpdate
 
@@ -21,18 +25,48 @@ async def create_menu(menu_data: MenuSchemaAdd,
     return new_menu
 
 
-async def get_all_menus(skip: int,
-                        limit: int,
-                        session: AsyncSession
-                        ) -> ScalarResult[MenuSchema]:
-    menus = await session.execute(select(Menu).offset(skip).limit(limit))
-    return menus.scalars()
+def menus_page(skip: int, limit: int | None, *columns) -> Select:
+    """Страница меню. Данные и версия списка читаются по ней, поэтому описывают одни и те же строки."""
+    return select(*columns).order_by(Menu.id).offset(skip).limit(limit)
+
+
+async def get_all_menus_with_counts(skip: int,
+                                    limit: int,
+                                    session: AsyncSession,
+                                    fields: Fields = None,
+                                    ) -> list[Row]:
+    # Количества подменю и блюд считаются для всей страницы одним запросом и только если запрошены
+    columns = [getattr(Menu, name) for name in load_columns(Menu, fields)]
+    menu_page = aliased(Menu, menus_page(skip, limit, *columns).subquery())
+
+    query = select(menu_page).options(load_fields(menu_page, fields)).order_by(menu_page.id)
+    if wants(fields, 'submenus_count') or wants(fields, 'dishes_count'):
+        query = query.outerjoin(SubMenu, SubMenu.menu_id == menu_page.id)
+        if wants(fields, 'dishes_count'):
+            query = (
+                query
+                .outerjoin(Dish, Dish.submenu_id == SubMenu.id)
+                .add_columns(func.count(distinct(Dish.id)).label('dishes_count'))
+            )
+        if wants(fields, 'submenus_count'):
+            query = query.add_columns(func.count(distinct(SubMenu.id)).label('submenus_count'))
+        query = query.group_by(*(getattr(menu_page, column.key) for column in columns))
+
+    result = await session.execute(query)
+    return list(result)
 
 
-async def get_all_menu_with_submenus_and_dishes(session: AsyncSession):
+async def get_all_menu_with_submenus_and_dishes(session: AsyncSession, fields: Fields = None):
     query = (
         select(Menu)
-        .options(selectinload(Menu.submenus).selectinload(SubMenu.dishes))
+        .options(
+            load_fields(Menu, fields),
+            # Подменю и их блюда загружаются одним запросом
+            selectinload(Menu.submenus).options(
+                load_fields(SubMenu, fields),
+                joinedload(SubMenu.dishes).options(load_fields(Dish, fields)),
+            ),
+        )
     )
 
     result = await session.execute(query)
@@ -40,8 +74,40 @@ async def get_all_menu_with_submenus_and_dishes(session: AsyncSession):
     return result
 
 
-async def get_menu_by_id(menu_id: str, session: AsyncSession) -> MenuSchema | None:
-    menu = await session.execute(select(Menu).filter(Menu.id == menu_id))
+async def get_menu_with_submenus_and_dishes(menu_id: str, session: AsyncSession, fields: Fields = None) -> Menu | None:
+    query = (
+        select(Menu)
+        .options(
+            load_fields(Menu, fields),
+            # Три запроса: меню, его подменю и блюда этих подменю
+            selectinload(Menu.submenus).options(
+                load_fields(SubMenu, fields),
+                selectinload(SubMenu.dishes).options(load_fields(Dish, fields)),
+            ),
+        )
+        .filter(Menu.id == menu_id)
+    )
+
+    result = await session.execute(query)
+    return result.scalar_one_or_none()
+
+
+async def get_menus_versions(skip: int,
+                             limit: int | None,
+                             session: AsyncSession
+                             ) -> list[tuple[uuid.UUID, datetime]]:
+    # Та же страница, что в get_all_menus_with_counts, без подсчета вложенных записей
+    result = await session.execute(menus_page(skip, limit, Menu.id, Menu.updated_at))
+    return list(result.tuples())
+
+
+async def get_menu_version(menu_id: str, session: AsyncSession) -> list[tuple[uuid.UUID, datetime]]:
+    result = await session.execute(select(Menu.id, Menu.updated_at).filter(Menu.id == menu_id))
+    return list(result.tuples())
+
+
+async def get_menu_by_id(menu_id: str, session: AsyncSession, fields: Fields = None) -> MenuSchema | None:
+    menu = await session.execute(select(Menu).options(load_fields(Menu, fields)).filter(Menu.id == menu_id))
 
     return menu.scalar_one_or_none()
 
@@ -0,0 +1,42 @@
+from sqlalchemy import Row, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from my_app.models.models import Dish, Menu, SubMenu
+
+PRICE_AGGREGATES = (
+    func.count(Dish.id).label('dishes_count'),
+    func.min(Dish.price).label('min_price'),
+    func.max(Dish.price).label('max_price'),
+    func.avg(Dish.price).label('avg_price'),
+    func.percentile_cont(0.5).within_group(Dish.price).label('median_price'),
+)
+
+
+async def get_menu_price_stats(menu_id: str, session: AsyncSession) -> list[Row]:
+    # Итог по меню и строки подменю считаются одним проходом: строка итога - та, где grouping(submenus.id) = 1.
+    # Подменю без блюд попадают в выборку с dishes_count = 0, несуществующее меню не дает ни одной строки
+    result = await session.execute(
+        select(Menu.id, Menu.title, SubMenu.id.label('submenu_id'), SubMenu.title.label('submenu_title'),
+               func.grouping(SubMenu.id).label('is_total'), *PRICE_AGGREGATES)
+        .select_from(Menu)
+        .outerjoin(SubMenu, SubMenu.menu_id == Menu.id)
+        .outerjoin(Dish, Dish.submenu_id == SubMenu.id)
+        .filter(Menu.id == menu_id)
+        .group_by(func.grouping_sets(tuple_(Menu.id, Menu.title),
+                                     tuple_(Menu.id, Menu.title, SubMenu.id, SubMenu.title)))
+        .order_by(SubMenu.title)
+    )
+    return list(result)
+
+
+async def get_catalog_price_stats(session: AsyncSession) -> list[Row]:
+    # Итог по каталогу - строка группы (), она есть и при пустом каталоге
+    result = await session.execute(
+        select(Menu.id, Menu.title, func.grouping(Menu.id).label('is_total'), *PRICE_AGGREGATES)
+        .select_from(Dish)
+        .join(SubMenu, SubMenu.id == Dish.submenu_id)
+        .join(Menu, Menu.id == SubMenu.menu_id)
+        .group_by(func.grouping_sets(tuple_(Menu.id, Menu.title), tuple_()))
+        .order_by(Menu.title)
+    )
+    return list(result)
@@ -1,8 +1,12 @@
-from typing import Any
+import uuid
+from datetime import datetime
 
-from sqlalchemy import ScalarResult, func, select
+from sqlalchemy import UUID, Row, Select, any_, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from my_app.fields import Fields, load_columns, load_fields, wants
 from my_app.models.models import Dish, SubMenu
 from my_app.schemas.submenu_schema import (
     SubMenuSchema,
@@ -27,17 +31,63 @@ async def create_submenu(menu_id: str,
     return new_submenu
 
 
-async def get_all_submenus(menu_id: str,
-                           skip: int,
-                           limit: int,
-                           session: AsyncSession) -> ScalarResult[Any]:
-    submenus = await session.execute(select(SubMenu).filter(
-        SubMenu.menu_id == menu_id).offset(skip).limit(limit))
-    return submenus.scalars()
+def submenus_page(menu_id: str, skip: int, limit: int, *columns) -> Select:
+    """Страница подменю меню, общая для данных и версии списка."""
+    return select(*columns).filter(SubMenu.menu_id == menu_id).order_by(SubMenu.id).offset(skip).limit(limit)
 
 
-async def get_submenu_by_id(menu_id: str, submenu_id: str, session: AsyncSession) -> SubMenuSchema | None:
-    submenu = await session.execute(select(SubMenu).filter(
+async def get_all_submenus_with_counts(menu_id: str,
+                                       skip: int,
+                                       limit: int,
+                                       session: AsyncSession,
+                                       fields: Fields = None) -> list[Row]:
+    columns = [getattr(SubMenu, name) for name in load_columns(SubMenu, fields)]
+    submenu_page = aliased(SubMenu, submenus_page(menu_id, skip, limit, *columns).subquery())
+
+    query = select(submenu_page).options(load_fields(submenu_page, fields)).order_by(submenu_page.id)
+    if wants(fields, 'dishes_count'):
+        query = (
+            query
+            .add_columns(func.count(Dish.id).label('dishes_count'))
+            .outerjoin(Dish, Dish.submenu_id == submenu_page.id)
+            .group_by(*(getattr(submenu_page, column.key) for column in columns))
+        )
+
+    result = await session.execute(query)
+    return list(result)
+
+
+async def get_submenus_versions(menu_id: str,
+                                skip: int,
+                                limit: int,
+                                session: AsyncSession) -> list[tuple[uuid.UUID, datetime]]:
+    result = await session.execute(submenus_page(menu_id, skip, limit, SubMenu.id, SubMenu.updated_at))
+    return list(result.tuples())
+
+
+async def get_submenu_version(menu_id: str,
+                              submenu_id: str,
+                              session: AsyncSession) -> list[tuple[uuid.UUID, datetime]]:
+    result = await session.execute(select(SubMenu.id, SubMenu.updated_at).filter(
+        SubMenu.id == submenu_id, SubMenu.menu_id == menu_id))
+    return list(result.tuples())
+
+
+async def get_submenus_by_ids_with_counts(submenu_ids: list[uuid.UUID],
+                                          session: AsyncSession) -> list[tuple[SubMenu, int]]:
+    query = (
+        select(SubMenu, func.count(Dish.id).label('dishes_count'))
+        .outerjoin(Dish, Dish.submenu_id == SubMenu.id)
+        .filter(SubMenu.id == any_(bindparam('submenu_ids', submenu_ids, type_=ARRAY(UUID))))
+        .group_by(SubMenu.id)
+    )
+    result = await session.execute(query)
+    return list(result.tuples())
+
+
+async def get_submenu_by_id(menu_id: str, submenu_id: str, session: AsyncSession,
+                            fields: Fields = None) -> SubMenuSchema | None:
+    submenu = await session.execute(select(SubMenu).options(load_fields(SubMenu, fields)).filter(
         SubMenu.id == submenu_id, SubMenu.menu_id == menu_id))
 
     return submenu.scalar_one_or_none()
@@ -46,10 +96,12 @@ async def get_submenu_by_id(menu_id: str, submenu_id: str, session: AsyncSession
 async def update_submenu_by_id(menu_id: str,
                                submenu_id: str,
                                submenu_data: SubMenuSchemaUpdate,
-                               session: AsyncSession) -> SubMenuSchemaUpdate:
+                               session: AsyncSession) -> SubMenuSchemaUpdate | None:
     updated_submenu = await session.execute(select(SubMenu).filter(
         SubMenu.id == submenu_id, SubMenu.menu_id == menu_id))
     updated_submenu = updated_submenu.scalar_one_or_none()
+    if updated_submenu is None:
+        return None
 
     updated_submenu.title = submenu_data.title
     updated_submenu.description = submenu_data.description
@@ -59,11 +111,13 @@ async def update_submenu_by_id(menu_id: str,
     return updated_submenu
 
 
-async def delete_submenu(submenu_id: str, session: AsyncSession) -> SubMenuSchema:
+async def delete_submenu(menu_id: str, submenu_id: str, session: AsyncSession) -> SubMenuSchema | None:
     query = select(SubMenu).filter(
-        SubMenu.id == submenu_id)
+        SubMenu.id == submenu_id, SubMenu.menu_id == menu_id)
     removed_submenu = await session.execute(query)
     removed_submenu = removed_submenu.scalar_one_or_none()
+    if removed_submenu is None:
+        return None
 
     await session.delete(removed_submenu)
     await session.commit()
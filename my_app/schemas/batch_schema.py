@@ -0,0 +1,33 @@
+import uuid
+
+from pydantic import BaseModel, Field
+
+from my_app.schemas.dish_schema import DishSchema
+from my_app.schemas.submenu_schema import SubMenuSchema
+
+BATCH_MAX_IDS = 100
+
+
+class BatchGetSchema(BaseModel):
+    ids: list[uuid.UUID] = Field(min_length=1, max_length=BATCH_MAX_IDS)
+    model_config = {
+        'json_schema_extra': {
+            'examples': [
+                {
+                    'ids': ['c3350036-0df5-42bf-994c-56cb053f513d', '602033b3-0462-4de1-a2f8-d8494795e0c0'],
+                }
+            ]
+        }
+    }
+
+
+class DishBatchItemSchema(BaseModel):
+    id: str
+    found: bool
+    dish: DishSchema | None = None
+
+
+class SubMenuBatchItemSchema(BaseModel):
+    id: str
+    found: bool
+    submenu: SubMenuSchema | None = None
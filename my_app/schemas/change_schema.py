@@ -0,0 +1,61 @@
+from pydantic import BaseModel
+
+from my_app.schemas.dish_schema import DishSchema
+from my_app.schemas.menu_schema import MenuSchema
+from my_app.schemas.submenu_schema import SubMenuSchema
+
+CHANGES_MAX_LIMIT = 1000
+# Позиция в журнале: <xid>.<seq> последнего полученного изменения или 0
+WATERMARK_PATTERN = r'^(0|[0-9]+\.[0-9]+)$'
+
+
+class ChangeSchema(BaseModel):
+    seq: int
+    # Таблица сущности: menus, submenus или dishes
+    entity: str
+    id: str
+    menu_id: str | None = None
+    deleted: bool
+    # Текущее состояние сущности, для удаленных - None
+    data: MenuSchema | SubMenuSchema | DishSchema | None = None
+
+
+class ChangesPageSchema(BaseModel):
+    changes: list[ChangeSchema]
+    # Позиция, которая передается в since следующего запроса
+    watermark: str
+    has_more: bool
+    model_config = {
+        'json_schema_extra': {
+            'examples': [
+                {
+                    'changes': [
+                        {
+                            'seq': 1042,
+                            'entity': 'dishes',
+                            'id': 'c3350036-0df5-42bf-994c-56cb053f513d',
+                            'menu_id': 'a2eb416c-2245-4526-bb4b-6343d5c5016f',
+                            'deleted': False,
+                            'data': {
+                                'id': 'c3350036-0df5-42bf-994c-56cb053f513d',
+                                'title': 'Nice Dish',
+                                'description': 'A very nice Dish',
+                                'submenu_id': '37701f9f-0c6b-4d87-9696-1637a1cc0c7f',
+                                'price': '325.12',
+                            },
+                        },
+                        {
+                            'seq': 1043,
+                            'entity': 'submenus',
+                            'id': '37701f9f-0c6b-4d87-9696-1637a1cc0c7f',
+                            'menu_id': 'a2eb416c-2245-4526-bb4b-6343d5c5016f',
+                            'deleted': True,
+                            'data': None,
+                        },
+                    ],
+                    'watermark': '7815.1043',
+                    'has_more': False,
+                }
+            ]
+        }
+    }
@@ -3,10 +3,11 @@ from pydantic import BaseModel
 
 class DishSchema(BaseModel):
     id: str
-    title: str
-    description: str
-    price: str
-    submenu_id: str
+    # Остальные поля задаются, только если запрошены в ?fields=
+    title: str | None = None
+    description: str | None = None
+    price: str | None = None
+    submenu_id: str | None = None
     model_config = {
         'json_schema_extra': {
             'examples': [
@@ -0,0 +1,57 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class JobSchema(BaseModel):
+    id: str
+    kind: str
+    status: str
+    processed: int | None = 0
+    total: int | None = None
+    error: str | None = None
+    created_at: datetime | None = None
+    finished_at: datetime | None = None
+    model_config = {
+        'json_schema_extra': {
+            'examples': [
+                {
+                    'id': '0b5c7d1e-3f2a-4c6b-9e8d-7a1f2b3c4d5e',
+                    'kind': 'export',
+                    'status': 'running',
+                    'processed': 12000,
+                    'total': 48000,
+                    'error': None,
+                    'created_at': '2026-10-19T10:00:00+00:00',
+                    'finished_at': None,
+                }
+            ]
+        }
+    }
+
+
+class RowErrorSchema(BaseModel):
+    # Номер строки листа, начиная с 1
+    row: int
+    error: str
+
+
+class ImportJobSchema(JobSchema):
+    errors: list[RowErrorSchema] = []
+    model_config = {
+        'json_schema_extra': {
+            'examples': [
+                {
+                    'id': '6f1d2c3b-4a5e-4f60-8b7c-9d0e1f2a3b4c',
+                    'kind': 'import',
+                    'status': 'running',
+                    'processed': 15000,
+                    'total': 100000,
+                    'error': None,
+                    'errors': [{'row': 42, 'error': 'блюдо: некорректная цена abc'}],
+                    'created_at': '2026-10-19T10:00:00+00:00',
+                    'finished_at': None,
+                }
+            ]
+        }
+    }
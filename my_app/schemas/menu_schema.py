@@ -1,12 +1,13 @@
 from pydantic import BaseModel
 
-from my_app.schemas.submenu_schema import SubMenuSchemaWithDish
+from my_app.schemas.submenu_schema import SubMenuSchemaWithDish, SubMenuTreeSchema
 
 
 class MenuSchema(BaseModel):
     id: str
-    title: str
-    description: str
+    # Остальные поля задаются, только если запрошены в ?fields=
+    title: str | None = None
+    description: str | None = None
     submenus_count: int | None = 0
     dishes_count: int | None = 0
     model_config = {
@@ -24,10 +25,14 @@ class MenuSchema(BaseModel):
     }
 
 
+class MenuTreeSchema(MenuSchema):
+    submenus: list[SubMenuTreeSchema] | None = None
+
+
 class MenuSchemaWithAll(BaseModel):
     id: str
-    title: str
-    description: str
+    title: str | None = None
+    description: str | None = None
     submenus: list[SubMenuSchemaWithDish]
 
 
@@ -0,0 +1,55 @@
+from pydantic import BaseModel
+
+
+class PriceStatsSchema(BaseModel):
+    dishes_count: int
+    # Для группы без блюд цены не определены
+    min_price: str | None = None
+    max_price: str | None = None
+    avg_price: str | None = None
+    median_price: str | None = None
+
+
+class SubMenuStatsSchema(PriceStatsSchema):
+    id: str
+    title: str
+
+
+class MenuPriceStatsSchema(PriceStatsSchema):
+    id: str
+    title: str
+
+
+class MenuStatsSchema(MenuPriceStatsSchema):
+    submenus: list[SubMenuStatsSchema]
+    model_config = {
+        'json_schema_extra': {
+            'examples': [
+                {
+                    'id': 'a2eb416c-2245-4526-bb4b-6343d5c5016f',
+                    'title': 'Menu',
+                    'dishes_count': 3,
+                    'min_price': '100.0',
+                    'max_price': '325.12',
+                    'avg_price': '208.37',
+                    'median_price': '200.0',
+                    'submenus': [
+                        {
+                            'id': '37701f9f-0c6b-4d87-9696-1637a1cc0c7f',
+                            'title': 'Submenu',
+                            'dishes_count': 3,
+                            'min_price': '100.0',
+                            'max_price': '325.12',
+                            'avg_price': '208.37',
+                            'median_price': '200.0',
+                        }
+                    ],
+                }
+            ]
+        }
+    }
+
+
+class CatalogStatsSchema(PriceStatsSchema):
+    # Только меню, в которых есть блюда
+    menus: list[MenuPriceStatsSchema]
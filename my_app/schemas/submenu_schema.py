@@ -5,9 +5,10 @@ from my_app.schemas.dish_schema import DishSchema
 
 class SubMenuSchema(BaseModel):
     id: str
-    title: str
-    description: str
-    menu_id: str
+    # Остальные поля задаются, только если запрошены в ?fields=
+    title: str | None = None
+    description: str | None = None
+    menu_id: str | None = None
     dishes_count: int | None = 0
     model_config = {
         'json_schema_extra': {
@@ -24,11 +25,15 @@ class SubMenuSchema(BaseModel):
     }
 
 
+class SubMenuTreeSchema(SubMenuSchema):
+    dishes: list[DishSchema] | None = None
+
+
 class SubMenuSchemaWithDish(BaseModel):
     id: str
-    title: str
-    description: str
-    menu_id: str
+    title: str | None = None
+    description: str | None = None
+    menu_id: str | None = None
     dishes: list[DishSchema]
 
 
@@ -0,0 +1,47 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from my_app.fields import entity_values
+from my_app.repositories import change_repository
+from my_app.schemas.change_schema import ChangeSchema, ChangesPageSchema
+from my_app.schemas.menu_schema import MenuSchema
+from my_app.schemas.submenu_schema import SubMenuSchema
+from my_app.services.dish_service import dish_schema
+
+
+def parse_watermark(watermark: str) -> tuple[int, int]:
+    """Watermark - позиция последнего полученного изменения <xid>.<seq>, 0 - начало журнала."""
+    if watermark == '0':
+        return 0, 0
+    xid, seq = watermark.split('.')
+    return int(xid), int(seq)
+
+
+class ChangeService:
+    @staticmethod
+    async def read_changes(since: str, limit: int, session: AsyncSession) -> ChangesPageSchema:
+        # Лишняя строка показывает, есть ли следующая страница
+        rows = await change_repository.get_changes_since(parse_watermark(since), limit + 1, session)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        changes = []
+        for change, menu, submenu, dish in rows:
+            if menu is not None:
+                data = MenuSchema(**entity_values(menu, MenuSchema, None))
+            elif submenu is not None:
+                data = SubMenuSchema(**entity_values(submenu, SubMenuSchema, None))
+            elif dish is not None:
+                data = dish_schema(dish)
+            else:
+                data = None
+            changes.append(ChangeSchema(
+                seq=change.seq,
+                entity=change.entity,
+                id=str(change.entity_id),
+                menu_id=str(change.menu_id) if change.menu_id else None,
+                deleted=change.deleted,
+                data=data,
+            ))
+
+        watermark = f'{rows[-1][0].xid}.{rows[-1][0].seq}' if rows else since
+        return ChangesPageSchema(changes=changes, watermark=watermark, has_more=has_more)
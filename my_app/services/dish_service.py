@@ -1,13 +1,28 @@
+import uuid
+
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from my_app.conditional import Version, make_list_version, make_version
+from my_app.fields import Fields, entity_values
+from my_app.models.models import Dish
 from my_app.repositories import dish_repository
 from my_app.schemas.dish_schema import DishSchema, DishSchemaAdd, DishSchemaUpdate
 
 
+def dish_schema(dish: Dish, fields: Fields = None) -> DishSchema:
+    values = entity_values(dish, DishSchema, fields)
+    if 'price' in values:
+        values['price'] = str(round(float(values['price']), 2))
+    return DishSchema(**values)
+
+
 class DishService:
     @staticmethod
-    async def create_dish(submenu_id: str, dish_data: DishSchemaAdd, session: AsyncSession) -> DishSchema:
+    async def create_dish(menu_id: str, submenu_id: str, dish_data: DishSchemaAdd, session: AsyncSession) -> DishSchema:
+        if not await dish_repository.submenu_exists(menu_id, submenu_id, session):
+            raise HTTPException(status_code=404, detail='submenu not found')
+
         new_dish = await dish_repository.create_dish(submenu_id, dish_data, session)
 
         return DishSchema(
@@ -19,42 +34,51 @@ class DishService:
         )
 
     @staticmethod
-    async def read_dishes(submenu_id: str, skip: int, limit: int, session: AsyncSession) -> \
-            list[DishSchema]:
-        dishes = await dish_repository.get_all_dishes(submenu_id, skip, limit, session)
-
-        response_data = []
-        for dish in dishes:
-            response_data.append(
-                DishSchema(
-                    id=str(dish.id),
-                    title=dish.title,
-                    description=dish.description,
-                    price=str(round(float(dish.price), 2)),
-                    submenu_id=str(dish.submenu_id)
-                )
+    async def read_dishes(menu_id: str, submenu_id: str, skip: int, limit: int, session: AsyncSession,
+                          fields: Fields = None) -> list[DishSchema]:
+        dishes = await dish_repository.get_all_dishes(menu_id, submenu_id, skip, limit, session, fields)
+        return [dish_schema(dish, fields) for dish in dishes]
+
+    @staticmethod
+    async def read_dishes_version(menu_id: str, submenu_id: str, skip: int, limit: int,
+                                  session: AsyncSession) -> Version:
+        return make_list_version(await dish_repository.get_dishes_versions(menu_id, submenu_id, skip, limit, session))
+
+    @staticmethod
+    async def read_one_dish_version(menu_id: str, submenu_id: str, dish_id: str,
+                                    session: AsyncSession) -> Version | None:
+        rows = await dish_repository.get_dish_version(menu_id, submenu_id, dish_id, session)
+        return make_version(rows) if rows else None
+
+    @staticmethod
+    async def read_dishes_by_ids(dish_ids: list[uuid.UUID], session: AsyncSession) -> dict[str, DishSchema]:
+        dishes = await dish_repository.get_dishes_by_ids(dish_ids, session)
+
+        return {
+            str(dish.id): DishSchema(
+                id=str(dish.id),
+                title=dish.title,
+                description=dish.description,
+                price=str(round(float(dish.price), 2)),
+                submenu_id=str(dish.submenu_id)
             )
-        return response_data
+            for dish in dishes
+        }
 
     @staticmethod
-    async def read_one_dish(submenu_id: str, dish_id: str, session: AsyncSession) -> DishSchema:
-        dish = await dish_repository.get_dish_by_id(submenu_id, dish_id, session)
+    async def read_one_dish(menu_id: str, submenu_id: str, dish_id: str, session: AsyncSession,
+                            fields: Fields = None) -> DishSchema:
+        dish = await dish_repository.get_dish_by_id(menu_id, submenu_id, dish_id, session, fields)
 
         if not dish:
             raise HTTPException(status_code=404, detail='dish not found')
 
-        return DishSchema(
-            id=str(dish.id),
-            title=dish.title,
-            description=dish.description,
-            price=str(round(float(dish.price), 2)),
-            submenu_id=str(dish.submenu_id)
-        )
+        return dish_schema(dish, fields)
 
     @staticmethod
-    async def update_dish(submenu_id: str, dish_id: str, dish_data: DishSchemaUpdate, session: AsyncSession) -> \
-            DishSchema:
-        updated_dish = await dish_repository.update_dish_by_id(submenu_id, dish_id, dish_data, session)
+    async def update_dish(menu_id: str, submenu_id: str, dish_id: str, dish_data: DishSchemaUpdate,
+                          session: AsyncSession) -> DishSchema:
+        updated_dish = await dish_repository.update_dish_by_id(menu_id, submenu_id, dish_id, dish_data, session)
 
         if not updated_dish:
             raise HTTPException(status_code=404, detail='menu not found')
@@ -68,8 +92,10 @@ class DishService:
         )
 
     @staticmethod
-    async def delete_dish(submenu_id: str, dish_id: str, session: AsyncSession) -> DishSchema:
-        deleted_dish = await dish_repository.delete_dish(submenu_id, dish_id, session)
+    async def delete_dish(menu_id: str, submenu_id: str, dish_id: str, session: AsyncSession) -> DishSchema | None:
+        deleted_dish = await dish_repository.delete_dish(menu_id, submenu_id, dish_id, session)
+        if not deleted_dish:
+            return None
         return DishSchema(
             id=str(deleted_dish.id),
             title=deleted_dish.title,
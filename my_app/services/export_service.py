@@ -0,0 +1,65 @@
+import os
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from my_app.models.models import Job
+from my_app.repositories import job_repository
+from my_app.schemas.job_schema import JobSchema
+from my_app.worker import EXPORT_DIR, send_task
+
+EXPORT_TASK = 'tasks.export_catalog_to_xlsx'
+
+
+def job_to_schema(job: Job) -> JobSchema:
+    return JobSchema(
+        id=str(job.id),
+        kind=job.kind,
+        status=job.status,
+        processed=job.processed,
+        total=job.total,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+    )
+
+
+class ExportService:
+    @staticmethod
+    async def create_export(session: AsyncSession) -> JobSchema:
+        job = await job_repository.create_job('export', session)
+        # Публикация в брокер синхронная и не должна блокировать цикл событий. Задание уже
+        # сохранено, поэтому без брокера оно помечается неудачным, а не остается в pending
+        try:
+            await run_in_threadpool(send_task, EXPORT_TASK, str(job.id))
+        except Exception as exc:
+            await job_repository.fail_job(job, repr(exc), session)
+            raise HTTPException(status_code=503, detail='task queue is unavailable') from exc
+
+        return job_to_schema(job)
+
+    @staticmethod
+    async def read_export(job_id: str, session: AsyncSession) -> JobSchema:
+        job = await job_repository.get_job_by_id(job_id, 'export', session)
+
+        if not job:
+            raise HTTPException(status_code=404, detail='export not found')
+
+        return job_to_schema(job)
+
+    @staticmethod
+    async def get_export_file(job_id: str, session: AsyncSession) -> str:
+        job = await job_repository.get_job_by_id(job_id, 'export', session)
+
+        if not job:
+            raise HTTPException(status_code=404, detail='export not found')
+        if job.status != 'success':
+            raise HTTPException(status_code=409, detail='export is not ready')
+
+        # Путь в задании указан в файловой системе воркера, файл ищется в общем каталоге
+        path = os.path.join(EXPORT_DIR, os.path.basename(job.file_path))
+        if not os.path.exists(path):
+            raise HTTPException(status_code=410, detail='export file is gone')
+
+        return path
@@ -0,0 +1,63 @@
+import os
+import shutil
+import uuid
+
+from fastapi import HTTPException, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from my_app.models.models import Job
+from my_app.repositories import job_repository
+from my_app.schemas.job_schema import ImportJobSchema
+from my_app.services.export_service import job_to_schema
+from my_app.worker import IMPORT_DIR, send_task
+
+IMPORT_TASK = 'tasks.import_catalog_from_xlsx'
+IMPORT_MAX_BYTES = int(os.environ.get('IMPORT_MAX_BYTES', 50 * 1024 * 1024))
+
+
+def import_to_schema(job: Job) -> ImportJobSchema:
+    return ImportJobSchema(**job_to_schema(job).model_dump(), errors=job.errors or [])
+
+
+def save_upload(upload: UploadFile, path: str) -> None:
+    # Воркер не должен увидеть недописанный файл
+    partial = f'{path}.partial'
+    with open(partial, 'wb') as file:
+        shutil.copyfileobj(upload.file, file, 1024 * 1024)
+    os.replace(partial, path)
+
+
+class ImportService:
+    @staticmethod
+    async def create_import(upload: UploadFile, session: AsyncSession) -> ImportJobSchema:
+        if not (upload.filename or '').lower().endswith('.xlsx'):
+            raise HTTPException(status_code=415, detail='only .xlsx workbooks are accepted')
+        if upload.size is not None and upload.size > IMPORT_MAX_BYTES:
+            raise HTTPException(status_code=413, detail='workbook is too large')
+
+        # Запрос уже записан starlette во временный файл, копирование не должно блокировать цикл событий
+        os.makedirs(IMPORT_DIR, exist_ok=True)
+        filename = f'{uuid.uuid4()}.xlsx'
+        await run_in_threadpool(save_upload, upload, os.path.join(IMPORT_DIR, filename))
+
+        job = await job_repository.create_job('import', session, file_path=filename)
+        # Как и у выгрузки: публикация не блокирует цикл событий, а без брокера задание
+        # помечается неудачным и загруженный файл удаляется
+        try:
+            await run_in_threadpool(send_task, IMPORT_TASK, str(job.id), filename)
+        except Exception as exc:
+            await job_repository.fail_job(job, repr(exc), session)
+            os.remove(os.path.join(IMPORT_DIR, filename))
+            raise HTTPException(status_code=503, detail='task queue is unavailable') from exc
+
+        return import_to_schema(job)
+
+    @staticmethod
+    async def read_import(job_id: str, session: AsyncSession) -> ImportJobSchema:
+        job = await job_repository.get_job_by_id(job_id, 'import', session)
+
+        if not job:
+            raise HTTPException(status_code=404, detail='import not found')
+
+        return import_to_schema(job)
@@ -1,15 +1,26 @@
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from my_app.repositories import menu_repository
-from my_app.schemas.dish_schema import DishSchema
+from my_app.conditional import Version, make_list_version, make_version
+from my_app.fields import Fields, entity_values, wants
+from my_app.repositories import menu_repository, submenu_repository
 from my_app.schemas.menu_schema import (
     MenuSchema,
     MenuSchemaAdd,
     MenuSchemaUpdate,
     MenuSchemaWithAll,
+    MenuTreeSchema,
 )
-from my_app.schemas.submenu_schema import SubMenuSchemaWithDish
+from my_app.schemas.submenu_schema import (
+    SubMenuSchema,
+    SubMenuSchemaWithDish,
+    SubMenuTreeSchema,
+)
+from my_app.services.dish_service import dish_schema
+
+
+def menu_counts(fields: Fields) -> list[str]:
+    return [name for name in ('dishes_count', 'submenus_count') if wants(fields, name)]
 
 
 class MenuService:
@@ -24,83 +35,106 @@ class MenuService:
         )
 
     @staticmethod
-    async def read_menus(skip: int, limit: int, session: AsyncSession) -> list[
+    async def read_menus(skip: int, limit: int, session: AsyncSession, fields: Fields = None) -> list[
             MenuSchema]:
-        menus = await menu_repository.get_all_menus(skip, limit, session)
+        menus = await menu_repository.get_all_menus_with_counts(skip, limit, session, fields)
 
         response_data = []
-        for menu in menus:
-            counter = await menu_repository.get_dish_and_submenus_count(menu.id, session)
-            response_data.append(
-                MenuSchema(
-                    id=str(menu.id),
-                    title=menu.title,
-                    description=menu.description,
-                    submenus_count=int(counter['submenus_count']),
-                    dishes_count=int(counter['dishes_count']),
-                )
-            )
+        for row in menus:
+            # Количества есть в строке, только если запрошены
+            response_data.append(MenuSchema(**entity_values(row[0], MenuSchema, fields),
+                                            **{name: int(getattr(row, name)) for name in menu_counts(fields)}))
         return response_data
 
     @staticmethod
-    async def read_menus_with_submenus_and_dishes(session: AsyncSession):
-        menus = await menu_repository.get_all_menu_with_submenus_and_dishes(session)
+    async def read_menus_version(skip: int, limit: int, session: AsyncSession) -> Version:
+        return make_list_version(await menu_repository.get_menus_versions(skip, limit, session))
+
+    @staticmethod
+    async def read_menus_with_submenus_and_dishes_version(session: AsyncSession) -> Version:
+        return make_list_version(await menu_repository.get_menus_versions(0, None, session))
+
+    @staticmethod
+    async def read_one_menu_version(menu_id: str, session: AsyncSession) -> Version | None:
+        rows = await menu_repository.get_menu_version(menu_id, session)
+        return make_version(rows) if rows else None
+
+    @staticmethod
+    async def read_menus_with_submenus_and_dishes(session: AsyncSession, fields: Fields = None):
+        menus = await menu_repository.get_all_menu_with_submenus_and_dishes(session, fields)
 
         response_data = []
         for menu in menus:
             submenu_data = []
             for submenu in menu.submenus:
-                dish_data = []
-                for dish in submenu.dishes:
-                    # Добавляем информацию о блюде в список блюд
-                    dish_data.append(
-                        DishSchema(
-                            id=str(dish.id),
-                            title=dish.title,
-                            description=dish.description,
-                            price=str(round(float(dish.price), 2)),
-                            submenu_id=str(dish.submenu_id)
-                        )
-                    )
-
                 # Добавляем информацию о подменю и блюдах в список подменю
                 submenu_data.append(
                     SubMenuSchemaWithDish(
-                        id=str(submenu.id),
-                        title=submenu.title,
-                        description=submenu.description,
-                        menu_id=str(submenu.menu_id),
-                        dishes=dish_data
+                        **entity_values(submenu, SubMenuSchemaWithDish, fields),
+                        dishes=[dish_schema(dish, fields) for dish in submenu.dishes]
                     )
                 )
 
             # Добавляем информацию о меню и подменю в список меню
             response_data.append(
                 MenuSchemaWithAll(
-                    id=str(menu.id),
-                    title=menu.title,
-                    description=menu.description,
+                    **entity_values(menu, MenuSchemaWithAll, fields),
                     submenus=submenu_data
                 )
             )
         return response_data
 
     @staticmethod
-    async def read_one_menu(menu_id: str, session: AsyncSession) -> MenuSchema:
-        menu = await menu_repository.get_menu_by_id(menu_id, session)
+    async def read_one_menu(menu_id: str, session: AsyncSession, fields: Fields = None) -> MenuTreeSchema:
+        menu = await menu_repository.get_menu_by_id(menu_id, session, fields)
 
         if not menu:
             raise HTTPException(status_code=404, detail='menu not found')
 
-        counter = await menu_repository.get_dish_and_submenus_count(menu.id, session)
+        values = entity_values(menu, MenuSchema, fields)
+        if menu_counts(fields):
+            counter = await menu_repository.get_dish_and_submenus_count(menu.id, session)
+            values.update({name: int(counter[name]) for name in menu_counts(fields)})
+        # Тот же класс, что в response_model эндпоинта: иначе FastAPI заполнит незапрошенные поля
+        return MenuTreeSchema(**values)
 
-        return MenuSchema(
-            id=str(menu.id),
-            title=menu.title,
-            description=menu.description,
-            submenus_count=int(counter['submenus_count']),
-            dishes_count=int(counter['dishes_count'])
-        )
+    @staticmethod
+    async def read_menu_tree(menu_id: str, include: tuple[str, ...], session: AsyncSession,
+                             fields: Fields = None) -> MenuTreeSchema:
+        """
+        Меню с подменю (include=submenus) и их блюдами (include=submenus.dishes).
+        Количества считаются по загруженным записям, поэтому запросов к БД два или три.
+        """
+        with_dishes = 'submenus.dishes' in include
+        if with_dishes:
+            menu = await menu_repository.get_menu_with_submenus_and_dishes(menu_id, session, fields)
+        else:
+            menu = await menu_repository.get_menu_by_id(menu_id, session, fields)
+
+        if not menu:
+            raise HTTPException(status_code=404, detail='menu not found')
+
+        submenus = []
+        if with_dishes:
+            for submenu in menu.submenus:
+                values = entity_values(submenu, SubMenuSchema, fields)
+                if wants(fields, 'dishes_count'):
+                    values['dishes_count'] = len(submenu.dishes)
+                dishes = [dish_schema(dish, fields) for dish in submenu.dishes]
+                submenus.append(SubMenuTreeSchema(**values, dishes=dishes))
+        else:
+            for row in await submenu_repository.get_all_submenus_with_counts(menu_id, 0, None, session, fields):
+                values = entity_values(row[0], SubMenuSchema, fields)
+                if wants(fields, 'dishes_count'):
+                    values['dishes_count'] = int(row.dishes_count)
+                submenus.append(SubMenuTreeSchema(**values))
+
+        values = entity_values(menu, MenuSchema, fields)
+        if wants(fields, 'submenus_count'):
+            values['submenus_count'] = len(submenus)
+        if wants(fields, 'dishes_count'):
+            values['dishes_count'] = sum(submenu.dishes_count for submenu in submenus)
+        return MenuTreeSchema(**values, submenus=submenus)
 
     @staticmethod
     async def update_menu(menu_id: str, menu_data: MenuSchemaUpdate, session: AsyncSession) -> MenuSchema:
@@ -0,0 +1,56 @@
+from fastapi import HTTPException
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from my_app.repositories import stats_repository
+from my_app.schemas.stats_schema import (
+    CatalogStatsSchema,
+    MenuPriceStatsSchema,
+    MenuStatsSchema,
+    SubMenuStatsSchema,
+)
+
+
+def _price(value: float | None) -> str | None:
+    # Цены отдаются строками, как и в ответах блюд
+    return None if value is None else str(round(float(value), 2))
+
+
+def price_stats(row: Row) -> dict:
+    return {
+        'dishes_count': row.dishes_count,
+        'min_price': _price(row.min_price),
+        'max_price': _price(row.max_price),
+        'avg_price': _price(row.avg_price),
+        'median_price': _price(row.median_price),
+    }
+
+
+class StatsService:
+    @staticmethod
+    async def read_menu_stats(menu_id: str, session: AsyncSession) -> MenuStatsSchema:
+        rows = await stats_repository.get_menu_price_stats(menu_id, session)
+
+        total = next((row for row in rows if row.is_total), None)
+        if total is None:
+            raise HTTPException(status_code=404, detail='menu not found')
+
+        return MenuStatsSchema(
+            id=str(total.id),
+            title=total.title,
+            **price_stats(total),
+            # Меню без подменю дает одну строку подменю с submenu_id = NULL
+            submenus=[SubMenuStatsSchema(id=str(row.submenu_id), title=row.submenu_title, **price_stats(row))
+                      for row in rows if not row.is_total and row.submenu_id is not None],
+        )
+
+    @staticmethod
+    async def read_catalog_stats(session: AsyncSession) -> CatalogStatsSchema:
+        rows = await stats_repository.get_catalog_price_stats(session)
+
+        total = next(row for row in rows if row.is_total)
+        return CatalogStatsSchema(
+            **price_stats(total),
+            menus=[MenuPriceStatsSchema(id=str(row.id), title=row.title, **price_stats(row))
+                   for row in rows if not row.is_total],
+        )
@@ -1,6 +1,10 @@
+import uuid
+
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from my_app.conditional import Version, make_list_version, make_version
+from my_app.fields import Fields, entity_values, wants
 from my_app.repositories import submenu_repository
 from my_app.schemas.submenu_schema import (
     SubMenuSchema,
@@ -22,39 +26,55 @@ class SubMenuService:
         )
 
     @staticmethod
-    async def read_submenus(menu_id: str, skip: int, limit: int, session: AsyncSession) -> \
+    async def read_submenus(menu_id: str, skip: int, limit: int, session: AsyncSession, fields: Fields = None) -> \
             list[SubMenuSchema]:
-        submenus = await submenu_repository.get_all_submenus(menu_id, skip, limit, session)
+        submenus = await submenu_repository.get_all_submenus_with_counts(menu_id, skip, limit, session, fields)
 
         response_data = []
-        for submenu in submenus:
-            counter = await submenu_repository.get_dish_count(submenu.id, session)
-            response_data.append(
-                SubMenuSchema(
-                    id=str(submenu.id),
-                    title=submenu.title,
-                    description=submenu.description,
-                    menu_id=str(submenu.menu_id),
-                    dishes_count=int(counter)
-                )
-            )
+        for row in submenus:
+            values = entity_values(row[0], SubMenuSchema, fields)
+            # Количество блюд есть в строке, только если запрошено
+            if wants(fields, 'dishes_count'):
+                values['dishes_count'] = int(row.dishes_count)
+            response_data.append(SubMenuSchema(**values))
         return response_data
 
     @staticmethod
-    async def read_one_submenu(menu_id: str, submenu_id: str, session: AsyncSession) -> SubMenuSchema:
-        submenu = await submenu_repository.get_submenu_by_id(menu_id, submenu_id, session)
+    async def read_submenus_version(menu_id: str, skip: int, limit: int, session: AsyncSession) -> Version:
+        return make_list_version(await submenu_repository.get_submenus_versions(menu_id, skip, limit, session))
+
+    @staticmethod
+    async def read_one_submenu_version(menu_id: str, submenu_id: str, session: AsyncSession) -> Version | None:
+        rows = await submenu_repository.get_submenu_version(menu_id, submenu_id, session)
+        return make_version(rows) if rows else None
+
+    @staticmethod
+    async def read_submenus_by_ids(submenu_ids: list[uuid.UUID], session: AsyncSession) -> dict[str, SubMenuSchema]:
+        submenus = await submenu_repository.get_submenus_by_ids_with_counts(submenu_ids, session)
+
+        return {
+            str(submenu.id): SubMenuSchema(
+                id=str(submenu.id),
+                title=submenu.title,
+                description=submenu.description,
+                menu_id=str(submenu.menu_id),
+                dishes_count=int(counter)
+            )
+            for submenu, counter in submenus
+        }
+
+    @staticmethod
+    async def read_one_submenu(menu_id: str, submenu_id: str, session: AsyncSession,
+                               fields: Fields = None) -> SubMenuSchema:
+        submenu = await submenu_repository.get_submenu_by_id(menu_id, submenu_id, session, fields)
 
         if not submenu:
             raise HTTPException(status_code=404, detail='submenu not found')
 
-        counter = await submenu_repository.get_dish_count(submenu.id, session)
-        return SubMenuSchema(
-            id=str(submenu.id),
-            title=submenu.title,
-            description=submenu.description,
-            menu_id=str(submenu.menu_id),
-            dishes_count=int(counter)
-        )
+        values = entity_values(submenu, SubMenuSchema, fields)
+        if wants(fields, 'dishes_count'):
+            values['dishes_count'] = int(await submenu_repository.get_dish_count(submenu.id, session))
+        return SubMenuSchema(**values)
 
     @staticmethod
     async def update_submenu(menu_id: str, submenu_id: str, submenu_data: SubMenuSchemaUpdate, session: AsyncSession) -> \
@@ -72,8 +92,10 @@ class SubMenuService:
         )
 
     @staticmethod
-    async def delete_submenu(submenu_id: str, session: AsyncSession) -> SubMenuSchema:
-        deleted_menu = await submenu_repository.delete_submenu(submenu_id, session)
+    async def delete_submenu(menu_id: str, submenu_id: str, session: AsyncSession) -> SubMenuSchema | None:
+        deleted_menu = await submenu_repository.delete_submenu(menu_id, submenu_id, session)
+        if not deleted_menu:
+            return None
         return SubMenuSchema(
             id=str(deleted_menu.id),
             title=deleted_menu.title,
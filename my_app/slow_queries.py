@@ -0,0 +1,182 @@
+"""
+Журнал медленных запросов к БД.
+
+Запросы дольше SLOW_QUERY_MS миллисекунд пишутся в лог и в таблицу slow_queries
+вместе с параметрами, маршрутом HTTP-запроса и длительностью. Для доли
+SLOW_QUERY_EXPLAIN_RATE медленных SELECT фоновая задача повторно выполняет запрос
+под EXPLAIN (ANALYZE, BUFFERS) на отдельном соединении и сохраняет план в колонку plan.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, NamedTuple
+
+from sqlalchemy import event, insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from my_app.models.models import SlowQuery
+from my_app.query_stats import current_route
+
+# 0 отключает журнал
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))
+SLOW_QUERY_EXPLAIN_RATE = float(os.environ.get('SLOW_QUERY_EXPLAIN_RATE', 0))
+# EXPLAIN ANALYZE выполняет запрос еще раз, поэтому время ограничено
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.environ.get('SLOW_QUERY_EXPLAIN_TIMEOUT_MS', 5000))
+SLOW_QUERY_FLUSH_SECONDS = float(os.environ.get('SLOW_QUERY_FLUSH_SECONDS', 5))
+
+# Параметры executemany могут быть огромными
+MAX_PARAMETERS_LENGTH = 2000
+
+logger = logging.getLogger(__name__)
+
+# Запросы самого журнала (запись в slow_queries и EXPLAIN) не учитываются
+_suppressed: ContextVar[bool] = ContextVar('slow_query_suppressed', default=False)
+
+
+class CapturedQuery(NamedTuple):
+    statement: str
+    parameters: str
+    route: str | None
+    duration: float
+    created_at: datetime
+    # Исходные параметры хранятся только для запросов, выбранных для EXPLAIN
+    explain_parameters: Any = None
+    explain: bool = False
+
+
+def explainable(statement: str, executemany: bool) -> bool:
+    """EXPLAIN ANALYZE выполняет запрос, поэтому повторять можно только чтение."""
+    normalized = statement.lstrip().upper()
+    return not executemany and normalized.startswith('SELECT') and 'FOR UPDATE' not in normalized
+
+
+class SlowQueryLog:
+    """
+    Подключается к движку через события before/after_cursor_execute, поэтому видит
+    все запросы, в том числе из сервисов и репозиториев. Обработчик события только
+    кладет запрос в буфер, запись в БД и EXPLAIN выполняет фоновая задача.
+    """
+
+    def __init__(self, engine: AsyncEngine, threshold_ms: float = SLOW_QUERY_MS,
+                 explain_rate: float = SLOW_QUERY_EXPLAIN_RATE, flush_interval: float = SLOW_QUERY_FLUSH_SECONDS,
+                 buffer_size: int = 1000):
+        self.engine = engine
+        self.threshold_ms = threshold_ms
+        self.explain_rate = explain_rate
+        self.flush_interval = flush_interval
+        # При перегрузке теряются самые старые записи, а не память процесса
+        self.pending: deque[CapturedQuery] = deque(maxlen=buffer_size)
+        self._task: asyncio.Task | None = None
+
+    def install(self) -> None:
+        sync_engine = self.engine.sync_engine
+        event.listen(sync_engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(sync_engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(sync_engine, 'handle_error', self._handle_error)
+
+    def uninstall(self) -> None:
+        sync_engine = self.engine.sync_engine
+        event.remove(sync_engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.remove(sync_engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.remove(sync_engine, 'handle_error', self._handle_error)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('slow_query_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if not conn.info.get('slow_query_started'):
+            return
+        duration = (time.perf_counter() - conn.info['slow_query_started'].pop()) * 1000
+        if duration < self.threshold_ms or _suppressed.get():
+            return
+
+        route = current_route()
+        logger.warning('Медленный запрос %.1f мс (%s): %s', duration, route, statement)
+        eligible = self.explain_rate > 0 and explainable(statement, executemany)
+        explain = eligible and random.random() < self.explain_rate
+        self.pending.append(CapturedQuery(
+            statement=statement,
+            parameters=repr(parameters)[:MAX_PARAMETERS_LENGTH],
+            route=route,
+            duration=duration,
+            created_at=datetime.now(timezone.utc),
+            explain_parameters=parameters if explain else None,
+            explain=explain,
+        ))
+
+    def _handle_error(self, exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get('slow_query_started'):
+            conn.info['slow_query_started'].pop()
+
+    async def explain(self, query: CapturedQuery) -> Any:
+        async with self.engine.connect() as conn:
+            await conn.execute(text(f'SET LOCAL statement_timeout = {SLOW_QUERY_EXPLAIN_TIMEOUT_MS}'))
+            result = await conn.exec_driver_sql(
+                f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query.statement}', query.explain_parameters
+            )
+            plan = result.scalar()
+            # Транзакция откатывается при закрытии соединения
+        return json.loads(plan) if isinstance(plan, str) else plan
+
+    async def flush(self) -> int:
+        """
+        Сохраняет накопленные запросы в таблицу slow_queries.
+
+        Returns:
+            int: Количество сохраненных запросов.
+        """
+        token = _suppressed.set(True)
+        try:
+            captured = []
+            while self.pending:
+                captured.append(self.pending.popleft())
+            if not captured:
+                return 0
+
+            rows = []
+            for query in captured:
+                plan = None
+                if query.explain:
+                    try:
+                        plan = await self.explain(query)
+                    except Exception:
+                        logger.warning('Не удалось получить план запроса', exc_info=True)
+                rows.append({
+                    'statement': query.statement, 'parameters': query.parameters, 'route': query.route,
+                    'duration': query.duration, 'plan': plan, 'created_at': query.created_at,
+                })
+            async with self.engine.begin() as conn:
+                await conn.execute(insert(SlowQuery), rows)
+            return len(rows)
+        finally:
+            _suppressed.reset(token)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception('Не удалось сохранить медленные запросы')
+
+    def start(self) -> None:
+        self.install()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self.uninstall()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
@@ -0,0 +1,98 @@
+"""
+Прогрев API при запуске.
+
+До того как приложение начнет принимать запросы, в пуле открывается
+WARMUP_CONNECTIONS соединений и на каждом выполняются частые запросы
+(asyncpg кеширует подготовленные запросы отдельно для каждого соединения).
+Затем маршруты из WARMUP_PATHS запрашиваются через ASGI, чтобы заполнить кеш.
+/ready отвечает 200 только после прогрева.
+"""
+import asyncio
+import logging
+import os
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.pool import QueuePool
+
+from my_app.repositories import menu_repository, submenu_repository
+
+WARMUP_CONNECTIONS = int(os.environ.get('WARMUP_CONNECTIONS', 5))
+WARMUP_PATHS = [path for path in os.environ.get('WARMUP_PATHS', '/api/v1/menus/,/api/v1/menus/all').split(',')
+                if path]
+WARMUP_TIMEOUT = float(os.environ.get('WARMUP_TIMEOUT', 30))
+
+logger = logging.getLogger(__name__)
+
+
+async def prime_connection(connection: AsyncConnection) -> None:
+    """Выполняет на соединении запросы списков и карточек, результат не важен."""
+    missing_id = str(uuid.UUID(int=0))
+    session = AsyncSession(bind=connection)
+    try:
+        await menu_repository.get_all_menus_with_counts(0, 10, session)
+        await menu_repository.get_dish_and_submenus_count(missing_id, session)
+        await submenu_repository.get_all_submenus_with_counts(missing_id, 0, 10, session)
+    finally:
+        await session.close()
+
+
+async def warm_pool(engine: AsyncEngine, connections: int = WARMUP_CONNECTIONS) -> int:
+    """
+    Держит соединения открытыми одновременно, чтобы пул не выдал одно и то же соединение
+    несколько раз, и возвращает их в пул.
+
+    Returns:
+        int: Количество прогретых соединений.
+    """
+    pool = engine.sync_engine.pool
+    if isinstance(pool, QueuePool):
+        # Соединения сверх размера пула закрываются при возврате
+        connections = min(connections, pool.size())
+
+    opened: list[AsyncConnection] = []
+    try:
+        for _ in range(connections):
+            opened.append(await engine.connect().start())
+        for connection in opened:
+            await prime_connection(connection)
+    finally:
+        for connection in opened:
+            await connection.close()
+    return len(opened)
+
+
+async def warm_cache(app: FastAPI, paths: list[str] = WARMUP_PATHS) -> None:
+    async with AsyncClient(app=app, base_url='http://warmup') as client:
+        for path in paths:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                logger.warning('Прогрев %s: ответ %s', path, response.status_code)
+
+
+async def warm_up(app: FastAPI, engine: AsyncEngine) -> None:
+    """
+    Прогрев не обязателен для работы API: при ошибке или по истечении
+    WARMUP_TIMEOUT приложение все равно становится готовым.
+    """
+    try:
+        await asyncio.wait_for(_warm_up(app, engine), WARMUP_TIMEOUT)
+    except Exception:
+        logger.exception('Прогрев не завершен')
+    finally:
+        app.state.ready = True
+
+
+async def _warm_up(app: FastAPI, engine: AsyncEngine) -> None:
+    connections = await warm_pool(engine)
+    await warm_cache(app)
+    logger.info('Прогрев завершен: %s соединений, %s маршрутов', connections, len(WARMUP_PATHS))
+
+
+async def ready(request: Request) -> JSONResponse:
+    if getattr(request.app.state, 'ready', False):
+        return JSONResponse({'status': 'ready'})
+    return JSONResponse({'status': 'warming up'}, status_code=503)
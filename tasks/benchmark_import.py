@@ -0,0 +1,93 @@
+"""
+Сравнение построчной синхронизации (orm) и загрузки через COPY (copy).
+Режим copy запускается без удаления отсутствующих строк, поэтому
+оба режима выполняют одинаковую работу.
+
+Скрипт очищает таблицы menus/submenus/dishes перед каждым прогоном,
+поэтому его нужно запускать только на отдельной базе данных:
+
+    cd tasks && python benchmark_import.py --menus 5 --submenus 10 --dishes 200
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+
+import pandas as pd
+from database import SessionLocal
+from orm_sync import sync_rows_orm
+from sqlalchemy import text
+from staging import import_with_copy
+from telemetry import RunTelemetry
+
+
+def make_workbook(menus: int, submenus: int, dishes: int, seed: int) -> pd.DataFrame:
+    rng = random.Random(seed)
+
+    def new_id() -> str:
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    rows = []
+    for m in range(menus):
+        rows.append([new_id(), f'Menu {m}', f'Menu description {m}', None, None, None])
+        for s in range(submenus):
+            rows.append([None, new_id(), f'Submenu {m}-{s}', f'Submenu description {m}-{s}', None, None])
+            for d in range(dishes):
+                rows.append([None, None, new_id(), f'Dish {m}-{s}-{d}', f'Dish description {m}-{s}-{d}',
+                             round(rng.uniform(50, 5000), 2)])
+    return pd.DataFrame(rows)
+
+
+def reprice(df: pd.DataFrame, share: float, seed: int) -> pd.DataFrame:
+    rng = random.Random(seed)
+    changed = df.copy()
+    dish_rows = changed.index[changed[5].notna()]
+    for index in rng.sample(list(dish_rows), int(len(dish_rows) * share)):
+        changed.at[index, 5] = round(changed.at[index, 5] * 1.1, 2)
+    return changed
+
+
+def truncate() -> None:
+    with SessionLocal() as db:
+        db.execute(text('TRUNCATE dishes, submenus, menus'))
+        db.commit()
+
+
+def measure(mode: str, df: pd.DataFrame) -> float:
+    with SessionLocal() as db:
+        started = time.perf_counter()
+        run = RunTelemetry(mode, 'benchmark')
+        if mode == 'copy':
+            import_with_copy(db, df, run)
+        else:
+            sync_rows_orm(db, df, run)
+        return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--menus', type=int, default=5)
+    parser.add_argument('--submenus', type=int, default=10)
+    parser.add_argument('--dishes', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    initial = make_workbook(args.menus, args.submenus, args.dishes, args.seed)
+    changed = reprice(initial, 0.1, args.seed)
+
+    results = {'rows': len(initial), 'modes': {}}
+    for mode in ('orm', 'copy'):
+        truncate()
+        results['modes'][mode] = {
+            'initial_load_s': round(measure(mode, initial), 3),
+            'unchanged_resync_s': round(measure(mode, initial), 3),
+            'reprice_10pct_s': round(measure(mode, changed), 3),
+        }
+    truncate()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
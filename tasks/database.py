@@ -0,0 +1,44 @@
+import os
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+load_dotenv()
+
+DB_HOST = os.environ.get('DB_HOST')
+DB_NAME = os.environ.get('DB_NAME')
+DB_PORT = os.environ.get('DB_PORT')
+DB_PASSWORD = os.environ.get('DB_PASSWORD')
+DB_USER = os.environ.get('DB_USER')
+DATABASE_URL = f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}'
+
+
+def pool_options() -> dict:
+    """
+    Настройки пула соединений воркера из переменных окружения.
+
+    Пул создается в каждом дочернем процессе prefork, поэтому итоговое число
+    соединений с БД равно concurrency * (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+    """
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 2)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 2)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes'),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+    }
+
+
+engine = create_engine(DATABASE_URL, **pool_options())
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def reset_engine_after_fork() -> None:
+    # Дочерний процесс получает копию пула родителя вместе с его сокетами.
+    # close=False заменяет пул на новый, не закрывая чужие соединения.
+    engine.dispose(close=False)
+
+
+def dispose_engine() -> None:
+    engine.dispose()
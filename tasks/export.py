@@ -0,0 +1,80 @@
+import os
+from collections.abc import Callable
+
+from models import Dish, Menu, SubMenu
+from openpyxl import Workbook
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+EXPORT_BATCH = 1000
+
+# Меню без подменю и подменю без блюд тоже попадают в файл
+CATALOG_QUERY = (
+    select(
+        Menu.id, Menu.title, Menu.description,
+        SubMenu.id, SubMenu.title, SubMenu.description,
+        Dish.id, Dish.title, Dish.description, Dish.price,
+    )
+    .select_from(Menu)
+    .outerjoin(SubMenu, SubMenu.menu_id == Menu.id)
+    .outerjoin(Dish, Dish.submenu_id == SubMenu.id)
+    .order_by(Menu.title, Menu.id, SubMenu.title, SubMenu.id, Dish.title, Dish.id)
+)
+
+
+def count_catalog_rows(db: Session) -> int:
+    return sum(db.scalar(select(func.count()).select_from(model)) for model in (Menu, SubMenu, Dish))
+
+
+def iter_sheet_rows(records):
+    """
+    Превращает плоский результат запроса в строки листа в формате Menu.xlsx:
+    меню в колонках A-C, подменю в B-D, блюда в C-F.
+    """
+    menu_id = submenu_id = None
+    for record in records:
+        (m_id, m_title, m_description, s_id, s_title, s_description,
+         d_id, d_title, d_description, d_price) = record
+
+        if m_id != menu_id:
+            menu_id, submenu_id = m_id, None
+            yield [str(m_id), m_title, m_description]
+        if s_id is not None and s_id != submenu_id:
+            submenu_id = s_id
+            yield [None, str(s_id), s_title, s_description]
+        if d_id is not None:
+            yield [None, None, str(d_id), d_title, d_description, d_price]
+
+
+def export_catalog(db: Session, path: str, report: Callable[[int], None] | None = None) -> int:
+    """
+    Выгружает меню, подменю и блюда в книгу Excel, которую может прочитать синхронизация.
+
+    Строки читаются серверным курсором порциями по EXPORT_BATCH, книга пишется
+    в режиме write-only, поэтому потребление памяти не зависит от размера каталога.
+
+    Parameters:
+        db (Session): Сессия с базой данных.
+        path (str): Путь к итоговому файлу. Файл появляется только после полной записи.
+        report (Callable[[int], None] | None): Получает число записанных строк после каждой порции.
+
+    Returns:
+        int: Количество записанных строк.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+
+    records = db.execute(CATALOG_QUERY.execution_options(stream_results=True, yield_per=EXPORT_BATCH))
+    written = 0
+    for row in iter_sheet_rows(records):
+        sheet.append(row)
+        written += 1
+        if report and written % EXPORT_BATCH == 0:
+            report(written)
+
+    partial_path = f'{path}.partial'
+    workbook.save(partial_path)
+    os.replace(partial_path, path)
+    if report:
+        report(written)
+    return written
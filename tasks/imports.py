@@ -0,0 +1,173 @@
+"""
+Загрузка каталога из книги, присланной через API (POST /api/v1/imports).
+
+В отличие от синхронизации каталога admin строки проверяются по одной:
+ошибочная строка не останавливает загрузку, а попадает в список ошибок задания.
+Строки переносятся в БД пачками по IMPORT_BATCH_ROWS, каждая в своей транзакции,
+поэтому большой файл не держит одну длинную транзакцию и блокировки.
+"""
+import math
+import os
+import uuid
+from collections.abc import Callable, Iterator
+from typing import NamedTuple
+
+import pandas as pd
+import psycopg2
+from sqlalchemy.orm import Session
+from staging import apply_rows
+from telemetry import RunTelemetry
+
+IMPORT_BATCH_ROWS = int(os.environ.get('IMPORT_BATCH_ROWS', 5000))
+# Ошибки хранятся в задании и отдаются API целиком, поэтому их число ограничено
+IMPORT_MAX_ERRORS = int(os.environ.get('IMPORT_MAX_ERRORS', 1000))
+
+# Родители загружаются раньше потомков, в том числе в предыдущих пачках
+STAGING_ORDER = ('staging_menus', 'staging_submenus', 'staging_dishes')
+
+
+class ImportRow(NamedTuple):
+    # Номер строки листа, начиная с 1
+    number: int
+    table: str
+    values: tuple
+
+
+def _id(value, entity: str) -> str:
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        raise ValueError(f'{entity}: некорректный id {value}') from None
+
+
+def _title(value, entity: str) -> str:
+    if pd.isna(value) or not str(value).strip():
+        raise ValueError(f'{entity}: не указано название')
+    return str(value)
+
+
+def _description(value) -> str:
+    return '' if pd.isna(value) else str(value)
+
+
+def _price(value) -> float:
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'блюдо: некорректная цена {value}') from None
+    if not math.isfinite(price) or price < 0:
+        raise ValueError(f'блюдо: некорректная цена {value}')
+    return price
+
+
+def parse_rows(df: pd.DataFrame) -> tuple[list[ImportRow], list[dict]]:
+    """
+    Проверяет строки листа в формате Menu.xlsx.
+
+    Parameters:
+        df (pd.DataFrame): Содержимое листа без заголовка.
+
+    Returns:
+        tuple: Строки для загрузки (сначала меню, затем подменю и блюда)
+        и ошибки в виде {'row': номер строки, 'error': текст}. Подменю и блюда
+        отклоненного меню или подменю тоже отклоняются.
+    """
+    rows: dict[str, list[ImportRow]] = {table: [] for table in STAGING_ORDER}
+    errors = []
+    menu_id = submenu_id = None
+    # Номер отклоненной строки меню или подменю, к которому относятся следующие строки
+    rejected_menu = rejected_submenu = None
+
+    for number, row in enumerate(df.itertuples(index=False), start=1):
+        try:
+            if pd.notna(row[0]):
+                menu_id = submenu_id = rejected_submenu = None
+                rejected_menu = number
+                values = (_id(row[0], 'меню'), _title(row[1], 'меню'), _description(row[2]))
+                rows['staging_menus'].append(ImportRow(number, 'staging_menus', values))
+                menu_id, rejected_menu = values[0], None
+            elif pd.notna(row[1]):
+                submenu_id = None
+                rejected_submenu = number
+                if rejected_menu is not None:
+                    raise ValueError(f'меню в строке {rejected_menu} не загружено')
+                if menu_id is None:
+                    raise ValueError('подменю указано до первого меню')
+                values = (_id(row[1], 'подменю'), _title(row[2], 'подменю'), _description(row[3]), menu_id)
+                rows['staging_submenus'].append(ImportRow(number, 'staging_submenus', values))
+                submenu_id, rejected_submenu = values[0], None
+            else:
+                if rejected_submenu is not None:
+                    raise ValueError(f'подменю в строке {rejected_submenu} не загружено')
+                if submenu_id is None:
+                    raise ValueError('блюдо указано до первого подменю')
+                values = (_id(row[2], 'блюдо'), _title(row[3], 'блюдо'), _description(row[4]), _price(row[5]),
+                          submenu_id)
+                rows['staging_dishes'].append(ImportRow(number, 'staging_dishes', values))
+        except ValueError as exc:
+            errors.append({'row': number, 'error': str(exc)})
+
+    return [row for table in STAGING_ORDER for row in rows[table]], errors
+
+
+def _staging_rows(batch: list[ImportRow]) -> dict[str, list[tuple]]:
+    rows: dict[str, list[tuple]] = {table: [] for table in STAGING_ORDER}
+    for row in batch:
+        rows[row.table].append(row.values)
+    return rows
+
+
+def import_batch(db: Session, batch: list[ImportRow], run: RunTelemetry) -> list[dict]:
+    """
+    Загружает пачку строк одной транзакцией. Если БД отклонила пачку (например,
+    название уже занято), пачка делится пополам и половины загружаются отдельно,
+    пока ошибочные строки не останутся по одной. На одну ошибочную строку приходится
+    порядка log2(IMPORT_BATCH_ROWS) загрузок, а не по загрузке на каждую строку пачки.
+
+    Returns:
+        list[dict]: Ошибки строк, отклоненных БД.
+    """
+    try:
+        apply_rows(db, _staging_rows(batch), run)
+        return []
+    except psycopg2.Error as exc:
+        if len(batch) == 1:
+            return [{'row': batch[0].number, 'error': str(exc).strip().splitlines()[0]}]
+
+    # Половины загружаются по порядку, поэтому родители по-прежнему идут раньше потомков
+    middle = len(batch) // 2
+    return import_batch(db, batch[:middle], run) + import_batch(db, batch[middle:], run)
+
+
+def _batches(rows: list[ImportRow], size: int) -> Iterator[list[ImportRow]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def import_catalog(db: Session, df: pd.DataFrame, run: RunTelemetry,
+                   progress: Callable[[int, list[dict]], None] | None = None,
+                   batch_rows: int = IMPORT_BATCH_ROWS) -> list[dict]:
+    """
+    Загружает каталог из листа пачками: меню, подменю и блюда создаются и обновляются, ничего не удаляется.
+
+    Parameters:
+        db (Session): Сессия с базой данных.
+        df (pd.DataFrame): Содержимое листа без заголовка.
+        run (RunTelemetry): Телеметрия запуска.
+        progress (Callable[[int, list[dict]], None], optional): Вызывается после каждой пачки
+            с числом обработанных строк листа и первыми IMPORT_MAX_ERRORS ошибками.
+        batch_rows (int, optional): Количество строк в одной транзакции.
+
+    Returns:
+        list[dict]: Ошибки строк по возрастанию номера строки.
+    """
+    rows, errors = parse_rows(df)
+    processed = len(errors)
+
+    for batch in _batches(rows, batch_rows):
+        errors.extend(import_batch(db, batch, run))
+        processed += len(batch)
+        if progress is not None:
+            progress(processed, sorted(errors, key=lambda error: error['row'])[:IMPORT_MAX_ERRORS])
+
+    return sorted(errors, key=lambda error: error['row'])
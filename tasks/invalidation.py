@@ -0,0 +1,38 @@
+import logging
+import os
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.environ.get('REDIS_URL')
+# Ключи, которые cashews создает для закешированных эндпоинтов API
+API_CACHE_PATTERN = os.environ.get('API_CACHE_PATTERN', 'my_app.endpoints.*')
+
+
+def invalidate_api_cache() -> int:
+    """
+    Удаляет закешированные ответы API после изменения данных синхронизацией.
+
+    Returns:
+        int: Количество удаленных ключей.
+    """
+    if not REDIS_URL:
+        logger.warning('REDIS_URL не задан, кеш API не сброшен после синхронизации')
+        return 0
+
+    client = redis.Redis.from_url(REDIS_URL)
+    try:
+        removed = 0
+        batch = []
+        for key in client.scan_iter(match=API_CACHE_PATTERN, count=500):
+            batch.append(key)
+            if len(batch) == 500:
+                removed += client.delete(*batch)
+                batch.clear()
+        if batch:
+            removed += client.delete(*batch)
+        logger.info('Сброшено %s ключей кеша API', removed)
+        return removed
+    finally:
+        client.close()
@@ -1,6 +1,16 @@
 import uuid
 
-from sqlalchemy import UUID, Column, Float, ForeignKey, String
+from sqlalchemy import (
+    JSON,
+    UUID,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    String,
+    func,
+)
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -12,6 +22,7 @@ class Menu(Base):  # type: ignore
     id = Column(UUID, primary_key=True, index=True, default=uuid.uuid4)
     title = Column(String, index=True, unique=True)
     description = Column(String)
+    updated_at = Column(DateTime(timezone=True), server_default=func.clock_timestamp())
 
     submenus = relationship('SubMenu', back_populates='menu', cascade='all, delete-orphan')
 
@@ -23,6 +34,7 @@ class SubMenu(Base):  # type: ignore
     title = Column(String, index=True, unique=True)
     description = Column(String)
     menu_id = Column(UUID, ForeignKey('menus.id'))
+    updated_at = Column(DateTime(timezone=True), server_default=func.clock_timestamp())
 
     menu = relationship('Menu', back_populates='submenus')
     dishes = relationship('Dish', back_populates='submenu', cascade='all, delete-orphan')
@@ -36,5 +48,36 @@ class Dish(Base):  # type: ignore
     description = Column(String)
     price = Column(Float, index=True)
     submenu_id = Column(UUID, ForeignKey('submenus.id'))
+    updated_at = Column(DateTime(timezone=True), server_default=func.clock_timestamp())
 
     submenu = relationship('SubMenu', back_populates='dishes')
+
+
+class SyncRun(Base):  # type: ignore
+    __tablename__ = 'sync_runs'
+
+    id = Column(UUID, primary_key=True, index=True, default=uuid.uuid4)
+    source = Column(String)
+    mode = Column(String)
+    status = Column(String, index=True)
+    started_at = Column(DateTime(timezone=True), index=True)
+    duration = Column(Float)
+    phases = Column(JSON)
+    rows = Column(JSON)
+    error = Column(String)
+
+
+class Job(Base):  # type: ignore
+    __tablename__ = 'jobs'
+
+    id = Column(UUID, primary_key=True, index=True, default=uuid.uuid4)
+    kind = Column(String, index=True)
+    status = Column(String, index=True, default='pending')
+    processed = Column(Integer, default=0)
+    total = Column(Integer)
+    file_path = Column(String)
+    error = Column(String)
+    # Ошибки строк загрузки: [{'row': номер строки, 'error': текст}]
+    errors = Column(JSON)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True))
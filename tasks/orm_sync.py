@@ -0,0 +1,65 @@
+import pandas as pd
+from models import Dish, Menu, SubMenu
+from sqlalchemy.orm import Session
+from telemetry import RunTelemetry
+
+
+def _sync_entity(db: Session, run: RunTelemetry, model, entity: str,
+                 filters: tuple, values: dict, fields: tuple[str, ...]) -> None:
+    with run.phase('diff'):
+        existing = db.query(model).filter(*filters).first()
+        if existing is not None:
+            changes = {name: values[name] for name in fields if getattr(existing, name) != values[name]}
+
+    with run.phase('write'):
+        if existing is None:
+            db.add(model(**values))
+            db.commit()
+            run.count(entity, 'created')
+        elif changes:
+            for name, value in changes.items():
+                setattr(existing, name, value)
+            db.commit()
+            run.count(entity, 'updated')
+        else:
+            run.count(entity, 'unchanged')
+
+
+def sync_rows_orm(db: Session, df: pd.DataFrame, run: RunTelemetry) -> None:
+    current_menu_id = None
+    current_submenu_id = None
+
+    for index, row in df.iterrows():
+        if pd.notna(row[0]):
+            menu_id, menu_title, menu_description, _, _, _ = row
+            current_menu_id = menu_id
+
+            _sync_entity(db, run, Menu, 'menus', (Menu.id == menu_id,), {
+                'id': menu_id,
+                'title': menu_title,
+                'description': menu_description,
+            }, ('title', 'description'))
+
+        elif pd.notna(row[1]):
+            _, submenu_id, submenu_title, submenu_description, _, _ = row
+            current_submenu_id = submenu_id
+
+            _sync_entity(db, run, SubMenu, 'submenus', (SubMenu.menu_id == current_menu_id,
+                                                        SubMenu.id == submenu_id), {
+                'id': submenu_id,
+                'title': submenu_title,
+                'description': submenu_description,
+                'menu_id': current_menu_id,
+            }, ('title', 'description'))
+
+        else:
+            _, _, dish_id, dish_title, dish_description, price = row
+
+            _sync_entity(db, run, Dish, 'dishes', (Dish.id == dish_id,
+                                                   Dish.submenu_id == current_submenu_id), {
+                'id': dish_id,
+                'title': dish_title,
+                'description': dish_description,
+                'submenu_id': current_submenu_id,
+                'price': float(price),
+            }, ('title', 'description', 'price'))
@@ -0,0 +1,117 @@
+"""
+Проверка, что число соединений воркера с БД не растет со временем.
+
+Скрипт многократно выполняет синхронизацию небольшого меню и после каждой
+порции задач считает соединения с базой в pg_stat_activity. Число соединений
+не должно превышать concurrency * (DB_POOL_SIZE + DB_MAX_OVERFLOW) сверх
+исходного и не должно расти от порции к порции.
+
+По умолчанию задачи отправляются запущенному воркеру через брокер
+(нужен CELERY_RESULT_BACKEND). С --local воркер имитируется пулом
+форкнутых процессов, как в prefork:
+
+    cd tasks && python soak_connections.py --runs 1000 --local --concurrency 4
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+
+from benchmark_import import make_workbook
+from database import DATABASE_URL, engine, pool_options, reset_engine_after_fork
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+from workbooks import to_message_rows
+
+TASK_NAME = 'tasks.sync_menu_block'
+
+COUNT_CONNECTIONS = text("""
+    SELECT count(*) FROM pg_stat_activity
+    WHERE datname = current_database() AND pid <> pg_backend_pid()
+""")
+
+
+def count_connections(monitor) -> int:
+    with monitor.connect() as connection:
+        return connection.scalar(COUNT_CONNECTIONS)
+
+
+def run_task(args: tuple) -> str:
+    from tasks import celery_app
+
+    return celery_app.tasks[TASK_NAME].apply(args=args).get()['status']
+
+
+def send_tasks(args: tuple, size: int) -> list[str]:
+    from tasks import celery_app
+
+    results = [celery_app.send_task(TASK_NAME, args=args) for _ in range(size)]
+    return [result.get(timeout=120)['status'] for result in results]
+
+
+def delete_menu(menu_id: str) -> None:
+    with engine.begin() as connection:
+        connection.execute(text("""
+            DELETE FROM dishes WHERE submenu_id IN (SELECT id FROM submenus WHERE menu_id = :menu_id)
+        """), {'menu_id': menu_id})
+        connection.execute(text('DELETE FROM submenus WHERE menu_id = :menu_id'), {'menu_id': menu_id})
+        connection.execute(text('DELETE FROM menus WHERE id = :menu_id'), {'menu_id': menu_id})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=1000)
+    parser.add_argument('--batch', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--mode', choices=('orm', 'copy'), default='orm')
+    parser.add_argument('--local', action='store_true', help='выполнять задачи в форкнутых процессах без брокера')
+    args = parser.parse_args()
+
+    monitor = create_engine(DATABASE_URL, poolclass=NullPool)
+    rows = to_message_rows(make_workbook(1, 2, 10, seed=7))
+    task_args = ('soak', rows, args.mode)
+
+    # Первый запуск создает меню, дальше задачи только сверяют строки.
+    # В режиме --local родитель к тому же пользуется пулом до форка, как воркер.
+    if args.local:
+        run_task(task_args)
+        pool = multiprocessing.get_context('fork').Pool(args.concurrency, initializer=reset_engine_after_fork)
+    else:
+        send_tasks(task_args, 1)
+
+    baseline = count_connections(monitor)
+    samples = []
+    done = failed = 0
+    while done < args.runs:
+        size = min(args.batch, args.runs - done)
+        statuses = pool.map(run_task, [task_args] * size) if args.local else send_tasks(task_args, size)
+        failed += sum(1 for status in statuses if status != 'success')
+        done += size
+        samples.append(count_connections(monitor) - baseline)
+
+    if args.local:
+        pool.close()
+        pool.join()
+    delete_menu(rows[0][0])
+
+    options = pool_options()
+    limit = args.concurrency * (options['pool_size'] + options['max_overflow'])
+    # Рост между второй половиной прогона и первой означает утечку
+    half = len(samples) // 2
+    growing = bool(half) and max(samples[half:]) > max(samples[:half])
+
+    report = {
+        'runs': done,
+        'failed': failed,
+        'baseline_connections': baseline,
+        'extra_connections': samples,
+        'limit': limit,
+        'growing': growing,
+        'ok': not failed and max(samples) <= limit and not growing,
+    }
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report['ok'] else 1)
+
+
+if __name__ == '__main__':
+    main()
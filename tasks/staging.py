@@ -0,0 +1,224 @@
+import csv
+import io
+from collections.abc import Iterable, Iterator
+
+import pandas as pd
+from sqlalchemy.orm import Session
+from telemetry import RunTelemetry
+
+# Временные таблицы живут до конца транзакции и видны только текущему соединению
+STAGING_TABLES = {
+    'staging_menus': ('id uuid, title varchar, description varchar', ('id', 'title', 'description')),
+    'staging_submenus': ('id uuid, title varchar, description varchar, menu_id uuid',
+                         ('id', 'title', 'description', 'menu_id')),
+    'staging_dishes': ('id uuid, title varchar, description varchar, price float, submenu_id uuid',
+                       ('id', 'title', 'description', 'price', 'submenu_id')),
+}
+
+# Удаление подменю и блюд, отсутствующих в файле. Построчная синхронизация (orm)
+# ничего не удаляет, поэтому эти запросы выполняются только при delete_missing=True.
+# Удаление ограничено меню из файла, но внутри них удаляются и подменю/блюда,
+# созданные через API. Сами меню синхронизация не удаляет никогда.
+DELETE_DISHES = ('dishes', 'deleted', """
+        DELETE FROM dishes d
+        USING submenus s
+        WHERE d.submenu_id = s.id
+          AND s.menu_id IN (SELECT id FROM staging_menus)
+          AND NOT EXISTS (SELECT 1 FROM staging_dishes sd WHERE sd.id = d.id)
+""")
+DELETE_SUBMENUS = ('submenus', 'deleted', """
+        DELETE FROM submenus m
+        WHERE m.menu_id IN (SELECT id FROM staging_menus)
+          AND NOT EXISTS (SELECT 1 FROM staging_submenus s WHERE s.id = m.id)
+""")
+
+# Родители обновляются и добавляются раньше потомков
+UPSERT_STATEMENTS = (
+    ('menus', 'updated', """
+        UPDATE menus m
+        SET title = s.title, description = s.description
+        FROM staging_menus s
+        WHERE m.id = s.id
+          AND (m.title IS DISTINCT FROM s.title OR m.description IS DISTINCT FROM s.description)
+    """),
+    ('menus', 'created', """
+        INSERT INTO menus (id, title, description)
+        SELECT id, title, description FROM staging_menus
+        ON CONFLICT (id) DO NOTHING
+    """),
+    ('submenus', 'updated', """
+        UPDATE submenus m
+        SET title = s.title, description = s.description, menu_id = s.menu_id
+        FROM staging_submenus s
+        WHERE m.id = s.id
+          AND (m.title IS DISTINCT FROM s.title
+               OR m.description IS DISTINCT FROM s.description
+               OR m.menu_id IS DISTINCT FROM s.menu_id)
+    """),
+    ('submenus', 'created', """
+        INSERT INTO submenus (id, title, description, menu_id)
+        SELECT id, title, description, menu_id FROM staging_submenus
+        ON CONFLICT (id) DO NOTHING
+    """),
+    ('dishes', 'updated', """
+        UPDATE dishes d
+        SET title = s.title, description = s.description, price = s.price, submenu_id = s.submenu_id
+        FROM staging_dishes s
+        WHERE d.id = s.id
+          AND (d.title IS DISTINCT FROM s.title
+               OR d.description IS DISTINCT FROM s.description
+               OR d.price IS DISTINCT FROM s.price
+               OR d.submenu_id IS DISTINCT FROM s.submenu_id)
+    """),
+    ('dishes', 'created', """
+        INSERT INTO dishes (id, title, description, price, submenu_id)
+        SELECT id, title, description, price, submenu_id FROM staging_dishes
+        ON CONFLICT (id) DO NOTHING
+    """),
+)
+
+# Лишние блюда удаляются до вставки новых (освобождаются уникальные названия),
+# а подменю - в самом конце, когда на них больше не ссылается ни одно блюдо.
+APPLY_STATEMENTS_WITH_DELETE = (DELETE_DISHES, *UPSERT_STATEMENTS, DELETE_SUBMENUS)
+
+
+def _text(value) -> str:
+    return '' if pd.isna(value) else str(value)
+
+
+def collect_rows(df: pd.DataFrame) -> dict[str, list[tuple]]:
+    """
+    Разбирает таблицу Menu.xlsx на строки для промежуточных таблиц.
+
+    Parameters:
+        df (pd.DataFrame): Содержимое листа без заголовка.
+
+    Returns:
+        dict: Кортежи строк для каждой промежуточной таблицы.
+
+    Raises:
+        ValueError: Если подменю встречается раньше первого меню
+        или блюдо раньше первого подменю.
+    """
+    rows: dict[str, list[tuple]] = {table: [] for table in STAGING_TABLES}
+    current_menu_id = None
+    current_submenu_id = None
+
+    for number, row in enumerate(df.itertuples(index=False), start=1):
+        if pd.notna(row[0]):
+            current_menu_id = str(row[0])
+            rows['staging_menus'].append((current_menu_id, _text(row[1]), _text(row[2])))
+        elif pd.notna(row[1]):
+            if current_menu_id is None:
+                raise ValueError(f'Строка {number}: подменю {row[1]} указано до первого меню')
+            current_submenu_id = str(row[1])
+            rows['staging_submenus'].append(
+                (current_submenu_id, _text(row[2]), _text(row[3]), current_menu_id))
+        else:
+            if current_submenu_id is None:
+                raise ValueError(f'Строка {number}: блюдо {row[2]} указано до первого подменю')
+            rows['staging_dishes'].append(
+                (str(row[2]), _text(row[3]), _text(row[4]), float(row[5]), current_submenu_id))
+
+    return rows
+
+
+class _CsvStream:
+    """Файлоподобный объект, отдающий строки в CSV по мере чтения COPY."""
+
+    def __init__(self, rows: Iterable[tuple]):
+        self._rows: Iterator[tuple] = iter(rows)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, quoting=csv.QUOTE_ALL)
+        self._pending = ''
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._pending) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._writer.writerow(row)
+            self._pending += self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate()
+
+        if size < 0:
+            size = len(self._pending)
+        chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+
+def apply_rows(db: Session, rows: dict[str, list[tuple]], run: RunTelemetry,
+               statements=UPSERT_STATEMENTS) -> dict[str, dict[str, int]]:
+    """
+    Загружает строки во временные таблицы через COPY и переносит их
+    в menus/submenus/dishes одной транзакцией за фиксированное число запросов.
+
+    Parameters:
+        db (Session): Сессия с базой данных.
+        rows (dict): Кортежи строк для каждой промежуточной таблицы, как их возвращает collect_rows.
+        run (RunTelemetry): Телеметрия запуска: загрузка во временные таблицы
+            учитывается как фаза diff, перенос изменений и commit - как write.
+        statements (tuple, optional): Запросы переноса изменений, по умолчанию без удаления.
+
+    Returns:
+        dict: Количество созданных, обновленных, удаленных и неизмененных строк по таблицам.
+
+    Raises:
+        Exception: Ошибка БД после отката транзакции, в этом случае строки не учитываются в run.
+    """
+    counts: dict[str, dict[str, int]] = {
+        table: {'created': 0, 'updated': 0, 'deleted': 0} for table in ('menus', 'submenus', 'dishes')
+    }
+
+    try:
+        with db.connection().connection.cursor() as cursor:
+            with run.phase('diff'):
+                for table, (columns, names) in STAGING_TABLES.items():
+                    cursor.execute(f'CREATE TEMP TABLE {table} ({columns}) ON COMMIT DROP')
+                    cursor.copy_expert(
+                        f'COPY {table} ({", ".join(names)}) FROM STDIN WITH (FORMAT csv)',
+                        _CsvStream(rows.get(table, ())),
+                    )
+                    cursor.execute(f'ANALYZE {table}')
+
+            with run.phase('write'):
+                for table, operation, statement in statements:
+                    cursor.execute(statement)
+                    counts[table][operation] += cursor.rowcount
+
+                db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    for table, operations in counts.items():
+        # Строки файла, которые не потребовали ни вставки, ни обновления
+        staged = len(rows.get(f'staging_{table}', ()))
+        operations['unchanged'] = staged - operations['created'] - operations['updated']
+        for operation, amount in operations.items():
+            run.count(table, operation, amount)
+
+    return counts
+
+
+def import_with_copy(db: Session, df: pd.DataFrame, run: RunTelemetry,
+                     delete_missing: bool = False) -> dict[str, dict[str, int]]:
+    """
+    Синхронизирует БД с Menu.xlsx набором множественных операций:
+    строки загружаются во временные таблицы через COPY, а затем
+    переносятся в menus/submenus/dishes за фиксированное число запросов.
+
+    Parameters:
+        db (Session): Сессия с базой данных.
+        df (pd.DataFrame): Содержимое листа без заголовка.
+        run (RunTelemetry): Телеметрия запуска: загрузка во временные таблицы
+            учитывается как фаза diff, перенос изменений и commit - как write.
+        delete_missing (bool, optional): Удалять подменю и блюда меню из файла,
+            которых в файле нет. По умолчанию, как и в режиме orm, ничего не удаляется.
+
+    Returns:
+        dict: Количество созданных, обновленных, удаленных и неизмененных строк по таблицам.
+    """
+    statements = APPLY_STATEMENTS_WITH_DELETE if delete_missing else UPSERT_STATEMENTS
+    return apply_rows(db, collect_rows(df), run, statements)
@@ -0,0 +1,135 @@
+import os
+import tempfile
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from models import SyncRun
+
+# Воркер запускается с пулом prefork: метрики обновляются в дочерних процессах,
+# а HTTP-сервер работает в родительском. prometheus_client выбирает хранилище
+# значений при импорте, поэтому каталог нужно задать до импорта библиотеки.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'sync_metrics'))
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+from prometheus_client import (  # noqa: E402
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    multiprocess,
+    start_http_server,
+)
+
+PHASES = ('read', 'diff', 'write', 'invalidate')
+
+SYNC_PHASE_SECONDS = Histogram(
+    'sync_phase_duration_seconds',
+    'Длительность фаз синхронизации Menu.xlsx с БД',
+    ['mode', 'phase'],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+SYNC_ROWS = Counter(
+    'sync_rows_total',
+    'Количество строк, обработанных синхронизацией',
+    ['mode', 'entity', 'operation'],
+)
+SYNC_RUNS = Counter(
+    'sync_runs_total',
+    'Количество запусков синхронизации',
+    ['mode', 'status'],
+)
+SYNC_FAILURES = Counter(
+    'sync_failures_total',
+    'Количество неудачных запусков синхронизации по фазе, в которой произошла ошибка',
+    ['mode', 'phase'],
+)
+
+
+class RunTelemetry:
+    """Собирает длительности фаз и количество измененных строк одного запуска синхронизации."""
+
+    def __init__(self, mode: str, source: str):
+        self.mode = mode
+        self.source = source
+        self.started_at = datetime.now(timezone.utc)
+        # Только фазы, которые действительно выполнялись в этом запуске
+        self.phases: dict[str, float] = {}
+        self.rows: dict[str, dict[str, int]] = {}
+        self.failed_phase: str | None = None
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if name not in PHASES:
+            raise ValueError(f'Неизвестная фаза синхронизации: {name}')
+
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.failed_phase = self.failed_phase or name
+            raise
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+    def count(self, entity: str, operation: str, amount: int = 1) -> None:
+        operations = self.rows.setdefault(entity, {})
+        operations[operation] = operations.get(operation, 0) + amount
+
+    @property
+    def changed(self) -> bool:
+        return any(amount for operations in self.rows.values()
+                   for operation, amount in operations.items() if operation != 'unchanged')
+
+    def finish(self, status: str, error: str | None = None) -> SyncRun:
+        """
+        Публикует метрики запуска и возвращает его сводку для сохранения в БД.
+
+        Parameters:
+            status (str): Итог запуска: success или failed.
+            error (str | None): Текст ошибки для неудачного запуска.
+
+        Returns:
+            SyncRun: Запись со сводкой запуска.
+        """
+        for name, seconds in self.phases.items():
+            SYNC_PHASE_SECONDS.labels(self.mode, name).observe(seconds)
+        for entity, operations in self.rows.items():
+            for operation, amount in operations.items():
+                SYNC_ROWS.labels(self.mode, entity, operation).inc(amount)
+        SYNC_RUNS.labels(self.mode, status).inc()
+        if status != 'success':
+            SYNC_FAILURES.labels(self.mode, self.failed_phase or 'unknown').inc()
+
+        return SyncRun(
+            source=self.source,
+            mode=self.mode,
+            status=status,
+            started_at=self.started_at,
+            duration=time.perf_counter() - self._started,
+            phases=self.phases,
+            rows=self.rows,
+            error=error,
+        )
+
+
+def start_metrics_server(port: int) -> None:
+    """
+    Запускает HTTP-сервер с метриками, собранными всеми процессами воркера
+    из PROMETHEUS_MULTIPROC_DIR.
+    """
+    multiproc_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+
+    # Файлы метрик от предыдущего запуска воркера искажают счетчики
+    for name in os.listdir(multiproc_dir):
+        if name.endswith('.db'):
+            os.remove(os.path.join(multiproc_dir, name))
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    start_http_server(port, registry=registry)
+
+
+def mark_process_dead(pid: int) -> None:
+    multiprocess.mark_process_dead(pid)
@@ -0,0 +1,85 @@
+import os
+
+import pandas as pd
+
+
+def read_workbook(path: str) -> pd.DataFrame:
+    return pd.read_excel(path, header=None, engine='openpyxl')
+
+
+def discover_workbooks(directory: str) -> list[str]:
+    """
+    Находит все книги Excel в каталоге admin.
+
+    Parameters:
+        directory (str): Каталог с файлами ресторанов.
+
+    Returns:
+        list[str]: Отсортированные пути к файлам .xlsx без временных файлов Excel (~$...).
+    """
+    if not os.path.isdir(directory):
+        return []
+
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.lower().endswith('.xlsx') and not name.startswith('~$')
+    )
+
+
+def split_menu_blocks(df: pd.DataFrame) -> list[pd.DataFrame]:
+    """
+    Делит лист на блоки, каждый из которых начинается со строки меню
+    и содержит все его подменю и блюда.
+
+    Parameters:
+        df (pd.DataFrame): Содержимое листа без заголовка.
+
+    Returns:
+        list[pd.DataFrame]: Блоки строк в исходном порядке. Строки до первого
+        меню попадают в отдельный блок, чтобы синхронизация сообщила об ошибке.
+    """
+    starts = [index for index, value in enumerate(df[0]) if pd.notna(value)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+
+    bounds = starts + [len(df)]
+    return [df.iloc[start:stop].reset_index(drop=True) for start, stop in zip(bounds, bounds[1:]) if stop > start]
+
+
+def to_message_rows(df: pd.DataFrame) -> list[list]:
+    """Готовит блок строк к передаче в сообщении Celery (JSON без NaN)."""
+    return df.astype(object).where(df.notna(), None).values.tolist()
+
+
+def aggregate_results(results: list[dict]) -> dict:
+    """
+    Сводит результаты параллельных задач синхронизации в один отчет.
+
+    Parameters:
+        results (list[dict]): Результаты задач sync_workbook/sync_menu_block.
+
+    Returns:
+        dict: Количество задач, неудачные источники и суммарное число строк по операциям.
+    """
+    rows: dict[str, dict[str, int]] = {}
+    failed = []
+    duration = 0.0
+
+    for result in results:
+        if result.get('status') != 'success':
+            failed.append({'source': result.get('source'), 'error': result.get('error')})
+        duration = max(duration, sum(result.get('phases', {}).values()))
+        for entity, operations in result.get('rows', {}).items():
+            totals = rows.setdefault(entity, {})
+            for operation, amount in operations.items():
+                totals[operation] = totals.get(operation, 0) + amount
+
+    return {
+        'tasks': len(results),
+        'failed': failed,
+        'rows': rows,
+        'slowest_task_s': duration,
+        'changed': any(amount for operations in rows.values()
+                       for operation, amount in operations.items() if operation != 'unchanged'),
+    }
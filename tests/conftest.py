@@ -3,6 +3,7 @@ import os
 from typing import AsyncGenerator
 
 import pytest
+from cashews import cache
 from dotenv import load_dotenv
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
@@ -10,8 +11,10 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 
 from my_app.config import get_session
+from my_app.deadlines import install_statement_timeout
 from my_app.main_onion import app
 from my_app.models.models import Base
+from my_app.query_stats import instrument_engine, track_queries
 
 load_dotenv()
 
@@ -26,6 +29,12 @@ DATABASE_URL_TEST = f'postgresql+asyncpg://{DB_USER_TEST}:{DB_PASSWORD_TEST}@{DB
 engine_test = create_async_engine(DATABASE_URL_TEST, poolclass=NullPool)
 async_session_maker = sessionmaker(engine_test, class_=AsyncSession, expire_on_commit=False)
 Base.metadata.bind = engine_test
+instrument_engine(engine_test)
+install_statement_timeout(engine_test)
+
+# По умолчанию кеш отключен, тесты кеша включают его фикстурой memory_cache
+CACHE_URL = 'mem://'
+cache.setup(CACHE_URL, disable=True)
 
 
 async def override_get_session() -> AsyncGenerator[AsyncSession, None]:
@@ -56,3 +65,26 @@ def event_loop(request):
 async def ac() -> AsyncGenerator[AsyncClient, None]:
     async with AsyncClient(app=app, base_url='http://test') as ac:
         yield ac
+
+
+@pytest.fixture
+def count_queries():
+    """
+    Считает запросы к БД внутри блока with:
+
+        with count_queries() as queries:
+            await ac.get(url)
+        assert queries.count <= 2
+    """
+    return track_queries
+
+
+@pytest.fixture
+def memory_cache():
+    """Включает кеш cashews в памяти на время теста, без него кеш отключен."""
+    # Флаг disable бэкенда хранится в ContextVar, а задачи тестов копируют контекст
+    # основного потока. Поэтому фикстура синхронная: отключенный бэкенд,
+    # восстановленный после теста, отключен и для следующих тестов
+    backend = cache.setup('mem://')
+    yield backend
+    cache.setup(CACHE_URL, disable=True)
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from conftest import DATABASE_URL_TEST, app
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.datastructures import URLPath
+
+from my_app.admission import AdmissionPool, Overloaded, shed_on_checkout
+from my_app.main_onion import admission_controller
+
+
+@pytest.fixture
+def saturated_pool(monkeypatch):
+    """Пул API выглядит так, будто соединений ждут больше запросов, чем допускается."""
+    pool = admission_controller.pool
+    monkeypatch.setattr(pool, 'waiting', pool.shed_waiters)
+
+
+async def test_saturated_pool_sheds_db_bound_requests(ac: AsyncClient, saturated_pool):
+    response = await ac.post(URLPath(app.url_path_for('post_menu')),
+                             json={'title': 'Admission_menu', 'description': 'Admission'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert (await ac.get(URLPath(app.url_path_for('get_menus_with_all')))).status_code == 503
+    assert (await ac.get(URLPath(app.url_path_for('get_changes')))).status_code == 503
+
+    # Чтения, которые отдаются из кеша, допускаются
+    assert (await ac.get(URLPath(app.url_path_for('get_menus')))).status_code == 200
+    # Служебные маршруты не ограничиваются
+    assert (await ac.get('/metrics')).status_code == 200
+
+
+def test_batch_reads_are_not_writes():
+    def classify(method: str, path: str) -> str | None:
+        scope = {'type': 'http', 'method': method, 'path': path, 'root_path': '', 'query_string': b''}
+        return admission_controller.classify(scope, app.router.routes)
+
+    assert classify('POST', str(app.url_path_for('batch_get_dishes'))) == 'db'
+    assert classify('POST', str(app.url_path_for('batch_get_submenus'))) == 'db'
+    assert classify('POST', str(app.url_path_for('post_menu'))) == 'write'
+    assert classify('GET', str(app.url_path_for('get_menus'))) == 'cached'
+
+
+async def test_class_limit_queues_with_deadline(ac: AsyncClient, monkeypatch):
+    monkeypatch.setattr(admission_controller, 'queue_timeout', 0.05)
+    semaphore = admission_controller.semaphores['tree']
+    url = URLPath(app.url_path_for('get_menus_with_all'))
+
+    for _ in range(admission_controller.limits['tree']):
+        await semaphore.acquire()
+    try:
+        assert (await ac.get(url)).status_code == 503
+        # Запрос ждет в очереди и проходит, если место освободилось до дедлайна
+        pending = asyncio.create_task(ac.get(url))
+        await asyncio.sleep(0.01)
+        semaphore.release()
+        assert (await pending).status_code == 200
+    finally:
+        for _ in range(admission_controller.limits['tree'] - 1):
+            semaphore.release()
+    assert not semaphore.locked()
+
+    # Другие классы очередь tree не задерживает
+    assert (await ac.get(URLPath(app.url_path_for('get_menus')))).status_code == 200
+
+
+async def test_cache_miss_is_shed_at_checkout():
+    engine = create_async_engine(DATABASE_URL_TEST, poolclass=AdmissionPool, pool_size=1, max_overflow=0)
+    pool = engine.sync_engine.pool
+    pool.shed_waiters = 1
+    held = await engine.connect().start()
+    waiter = asyncio.create_task(engine.connect().start())
+    try:
+        await asyncio.sleep(0.05)
+        assert pool.waiting == 1
+
+        with shed_on_checkout():
+            with pytest.raises(Overloaded):
+                await engine.connect().start()
+
+        await held.close()
+        conn = await waiter
+        assert (await conn.execute(text('SELECT 1'))).scalar() == 1
+        await conn.close()
+    finally:
+        await held.close()
+        await engine.dispose()
@@ -0,0 +1,91 @@
+import uuid
+
+from conftest import app
+from httpx import AsyncClient
+from starlette.datastructures import URLPath
+
+
+async def create_catalog(ac: AsyncClient) -> tuple[str, str, list[str]]:
+    response = await ac.post(URLPath(app.url_path_for('post_menu')),
+                             json={'title': 'Batch_menu', 'description': 'Batch_menu_description'})
+    menu_id = response.json()['id']
+    response = await ac.post(URLPath(app.url_path_for('post_submenu', menu_id=menu_id)),
+                             json={'title': 'Batch_submenu', 'description': 'Batch_submenu_description'})
+    submenu_id = response.json()['id']
+    dish_ids = []
+    for d in range(3):
+        response = await ac.post(URLPath(app.url_path_for('post_dish', menu_id=menu_id, submenu_id=submenu_id)),
+                                 json={'title': f'Batch_dish_{d}', 'description': 'Batch', 'price': '10.5'})
+        dish_ids.append(response.json()['id'])
+    return menu_id, submenu_id, dish_ids
+
+
+async def test_dishes_batch_keeps_order_and_reports_misses(ac: AsyncClient, count_queries):
+    menu_id, _, dish_ids = await create_catalog(ac)
+    missing_id = str(uuid.uuid4())
+    ids = [dish_ids[2], missing_id, dish_ids[0], dish_ids[2]]
+
+    with count_queries() as queries:
+        response = await ac.get(URLPath(app.url_path_for('get_dishes_batch')), params={'ids': ','.join(ids)})
+    assert response.status_code == 200
+    assert queries.count == 1
+    items = response.json()
+    assert [item['id'] for item in items] == ids
+    assert [item['found'] for item in items] == [True, False, True, True]
+    assert items[1]['dish'] is None
+    assert items[0]['dish']['title'] == 'Batch_dish_2'
+    assert items[0]['dish']['price'] == '10.5'
+
+    response = await ac.post(URLPath(app.url_path_for('batch_get_dishes')), json={'ids': ids})
+    assert response.json() == items
+
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+
+
+async def test_submenus_batch_counts_dishes(ac: AsyncClient):
+    menu_id, submenu_id, _ = await create_catalog(ac)
+
+    response = await ac.post(URLPath(app.url_path_for('batch_get_submenus')),
+                             json={'ids': [submenu_id, str(uuid.uuid4())]})
+    assert response.status_code == 200
+    found, missing = response.json()
+    assert found['submenu']['dishes_count'] == 3
+    assert found['submenu']['menu_id'] == menu_id
+    assert missing['found'] is False
+
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+
+
+async def test_batch_rejects_invalid_ids(ac: AsyncClient):
+    url = URLPath(app.url_path_for('get_dishes_batch'))
+    assert (await ac.get(url, params={'ids': 'not-a-uuid'})).status_code == 422
+    assert (await ac.get(url, params={'ids': ''})).status_code == 422
+    too_many = ','.join(str(uuid.uuid4()) for _ in range(101))
+    assert (await ac.get(url, params={'ids': too_many})).status_code == 422
+    response = await ac.post(URLPath(app.url_path_for('batch_get_submenus')), json={'ids': []})
+    assert response.status_code == 422
+
+
+async def test_batch_uses_entity_cache(ac: AsyncClient, memory_cache, count_queries):
+    menu_id, submenu_id, dish_ids = await create_catalog(ac)
+    url = URLPath(app.url_path_for('get_dishes_batch'))
+
+    await ac.get(url, params={'ids': ','.join(dish_ids[:2])})
+    # Первые два блюда берутся из кеша, в БД запрашивается только третье
+    with count_queries() as queries:
+        response = await ac.get(url, params={'ids': ','.join(dish_ids)})
+    assert all(item['found'] for item in response.json())
+    assert queries.count == 1
+    with count_queries() as queries:
+        await ac.get(url, params={'ids': ','.join(dish_ids)})
+    assert queries.count == 0
+
+    await ac.patch(URLPath(app.url_path_for('patch_dish', menu_id=menu_id, submenu_id=submenu_id,
+                                            dish_id=dish_ids[0])),
+                   json={'title': 'Batch_dish_updated', 'description': 'Batch', 'price': '11'})
+    response = await ac.get(url, params={'ids': dish_ids[0]})
+    assert response.json()[0]['dish']['title'] == 'Batch_dish_updated'
+
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+    response = await ac.get(url, params={'ids': ','.join(dish_ids)})
+    assert not any(item['found'] for item in response.json())
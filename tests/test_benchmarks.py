@@ -0,0 +1,74 @@
+from benchmarks.generator import build_catalog, delete_catalog, title_prefix
+from benchmarks.runner import percentile
+from benchmarks.scenarios import SCENARIOS, Context
+from benchmarks.seed import (
+    Shape,
+    allocate,
+    menu_records,
+    plan_catalog,
+    seed_catalog,
+    zipf_weights,
+)
+from conftest import DATABASE_URL_TEST, async_session_maker
+from sqlalchemy import func, select
+
+from my_app.endpoints import dish_endpoints, menu_endpoints, submenu_endpoints
+from my_app.models.models import Dish
+
+
+def test_catalog_is_seeded():
+    catalog = build_catalog(menus=2, submenus=3, dishes=4, seed=1)
+
+    assert [len(catalog[table]) for table in ('menus', 'submenus', 'dishes')] == [2, 6, 24]
+    assert catalog == build_catalog(menus=2, submenus=3, dishes=4, seed=1)
+    assert catalog['menus'][0]['id'] != build_catalog(menus=2, submenus=3, dishes=4, seed=2)['menus'][0]['id']
+
+    ctx = Context(catalog, seed=1)
+    menu_id, submenu_id, dish_id = ctx.dish()
+    assert (menu_id, submenu_id) in ctx.submenus
+
+
+def test_scenarios_cover_every_route():
+    routes = {route.name for router in (menu_endpoints.router, submenu_endpoints.router, dish_endpoints.router)
+              for route in router.routes}
+
+    assert {scenario.name for scenario in SCENARIOS} == routes
+
+
+def test_percentile():
+    latencies = [float(value) for value in range(1, 101)]
+
+    assert percentile(latencies, 50) == 50.5
+    assert percentile(latencies, 99) == 99.01
+    assert percentile([3.0], 95) == 3.0
+
+
+def test_allocate_keeps_total_and_minimum():
+    assert allocate(10, [1, 1, 1]) == [4, 3, 3]
+    assert allocate(5, zipf_weights(4, 1.0), minimum=1) == [2, 1, 1, 1]
+    assert sum(allocate(1000, zipf_weights(7, 1.3))) == 1000
+
+
+def test_seed_plan_is_skewed_and_deterministic():
+    plan = plan_catalog(Shape(menus=5, submenus=20, dishes=1000, skew=1.0))
+
+    assert sum(len(dish_counts) for dish_counts in plan) == 20
+    assert sum(map(sum, plan)) == 1000
+    assert sum(plan[0]) > 4 * sum(plan[-1])
+    assert menu_records(plan, seed=3) == menu_records(plan, seed=3)
+    assert menu_records(plan, seed=3)[0][0][0] != menu_records(plan, seed=4)[0][0][0]
+
+
+async def test_seed_catalog_copies_rows():
+    seed = 1036
+    async with async_session_maker() as session:
+        await delete_catalog(seed, session)
+
+    loaded = await seed_catalog(Shape(menus=3, submenus=6, dishes=50, skew=1.5), seed,
+                                batch_size=7, workers=3, dsn=DATABASE_URL_TEST.replace('+asyncpg', ''))
+
+    async with async_session_maker() as session:
+        dishes = await session.scalar(select(func.count(Dish.id)).filter(Dish.title.startswith(title_prefix(seed))))
+        await delete_catalog(seed, session)
+    assert loaded == {'menus': 3, 'submenus': 6, 'dishes': 50}
+    assert dishes == 50
@@ -0,0 +1,102 @@
+from conftest import app
+from httpx import AsyncClient
+from starlette.datastructures import URLPath
+
+
+async def create_menu(ac: AsyncClient, title: str) -> tuple[str, str, str]:
+    response = await ac.post(URLPath(app.url_path_for('post_menu')), json={'title': title, 'description': 'Cache'})
+    menu_id = response.json()['id']
+    response = await ac.post(URLPath(app.url_path_for('post_submenu', menu_id=menu_id)),
+                             json={'title': f'{title}_submenu', 'description': 'Cache'})
+    submenu_id = response.json()['id']
+    response = await ac.post(URLPath(app.url_path_for('post_dish', menu_id=menu_id, submenu_id=submenu_id)),
+                             json={'title': f'{title}_dish', 'description': 'Cache', 'price': '3.5'})
+    return menu_id, submenu_id, response.json()['id']
+
+
+def menu_urls(menu_id: str, submenu_id: str, dish_id: str) -> list[tuple[str, dict]]:
+    return [
+        (URLPath(app.url_path_for('get_menus')), {'limit': 1000}),
+        (URLPath(app.url_path_for('get_menu', menu_id=menu_id)), {}),
+        (URLPath(app.url_path_for('get_menu', menu_id=menu_id)), {'include': 'submenus'}),
+        (URLPath(app.url_path_for('get_submenus', menu_id=menu_id)), {'fields': 'id,title'}),
+        (URLPath(app.url_path_for('get_submenu', menu_id=menu_id, submenu_id=submenu_id)), {}),
+        (URLPath(app.url_path_for('get_dishes', menu_id=menu_id, submenu_id=submenu_id)), {'skip': 0}),
+        (URLPath(app.url_path_for('get_dish', menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id)), {}),
+        (URLPath(app.url_path_for('get_menu_stats', menu_id=menu_id)), {}),
+        (URLPath(app.url_path_for('get_stats')), {}),
+    ]
+
+
+async def test_repeated_reads_are_served_from_cache(ac: AsyncClient, memory_cache, count_queries):
+    menu_id, submenu_id, dish_id = await create_menu(ac, 'Cache_menu')
+    urls = menu_urls(menu_id, submenu_id, dish_id)
+
+    first = [(await ac.get(url, params=params)).json() for url, params in urls]
+    # Каждый запрос приходит со своей сессией БД, но ключ кеша от нее не зависит
+    with count_queries() as queries:
+        second = [(await ac.get(url, params=params)).json() for url, params in urls]
+    assert queries.count == 0
+    assert second == first
+
+    # Другой набор параметров - другой ключ
+    with count_queries() as queries:
+        response = await ac.get(URLPath(app.url_path_for('get_dishes', menu_id=menu_id, submenu_id=submenu_id)),
+                                params={'skip': 0, 'fields': 'title'})
+    assert response.json() == [{'id': dish_id, 'title': 'Cache_menu_dish'}]
+    assert queries.count > 0
+
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+
+
+async def test_write_forgets_only_its_menu(ac: AsyncClient, memory_cache, count_queries):
+    changed = await create_menu(ac, 'Cache_changed')
+    other = await create_menu(ac, 'Cache_other')
+    menu_id, submenu_id, dish_id = changed
+    dish_url = URLPath(app.url_path_for('get_dish', menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id))
+    other_urls = menu_urls(*other)[1:-1]
+    for url, params in [(dish_url, {}), *other_urls]:
+        await ac.get(url, params=params)
+
+    await ac.patch(URLPath(app.url_path_for('patch_dish', menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id)),
+                   json={'title': 'Cache_changed_dish', 'description': 'Cache', 'price': '4.5'})
+
+    assert (await ac.get(dish_url)).json()['price'] == '4.5'
+    with count_queries() as queries:
+        for url, params in other_urls:
+            await ac.get(url, params=params)
+    assert queries.count == 0
+
+    for menu_id, _, _ in (changed, other):
+        await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+
+
+async def test_submenu_under_other_menu_is_not_found(ac: AsyncClient, memory_cache):
+    menu_id, submenu_id, dish_id = await create_menu(ac, 'Cache_owner')
+    other_id, _, _ = await create_menu(ac, 'Cache_stranger')
+    dish = {'title': 'Cache_owner_dish', 'description': 'Cache', 'price': '5.5'}
+
+    # Подменю чужого меню не читается и не меняется, иначе его ответ попал бы в кеш чужого меню
+    for response in [
+        await ac.get(URLPath(app.url_path_for('get_submenu', menu_id=other_id, submenu_id=submenu_id))),
+        await ac.get(URLPath(app.url_path_for('get_dish', menu_id=other_id, submenu_id=submenu_id,
+                                              dish_id=dish_id))),
+        await ac.patch(URLPath(app.url_path_for('patch_submenu', menu_id=other_id, submenu_id=submenu_id)),
+                       json={'title': 'Cache_moved', 'description': 'Cache'}),
+        await ac.post(URLPath(app.url_path_for('post_dish', menu_id=other_id, submenu_id=submenu_id)), json=dish),
+        await ac.patch(URLPath(app.url_path_for('patch_dish', menu_id=other_id, submenu_id=submenu_id,
+                                                dish_id=dish_id)), json=dish),
+        await ac.delete(URLPath(app.url_path_for('delete_dish', menu_id=other_id, submenu_id=submenu_id,
+                                                 dish_id=dish_id))),
+        await ac.delete(URLPath(app.url_path_for('delete_submenu', menu_id=other_id, submenu_id=submenu_id))),
+    ]:
+        assert response.status_code == 404
+    response = await ac.get(URLPath(app.url_path_for('get_dishes', menu_id=other_id, submenu_id=submenu_id)))
+    assert response.json() == []
+
+    response = await ac.get(URLPath(app.url_path_for('get_dish', menu_id=menu_id, submenu_id=submenu_id,
+                                                     dish_id=dish_id)))
+    assert response.json()['price'] == '3.5'
+
+    for menu_id in (menu_id, other_id):
+        await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
@@ -0,0 +1,109 @@
+from conftest import app, engine_test
+from httpx import AsyncClient
+from sqlalchemy import text
+from starlette.datastructures import URLPath
+
+
+async def latest_watermark(ac: AsyncClient) -> str:
+    url = URLPath(app.url_path_for('get_changes'))
+    since = '0'
+    while True:
+        page = (await ac.get(url, params={'since': since, 'limit': 1000})).json()
+        since = page['watermark']
+        if not page['has_more']:
+            return since
+
+
+async def test_changes_since_watermark(ac: AsyncClient):
+    since = await latest_watermark(ac)
+    url = URLPath(app.url_path_for('get_changes'))
+
+    response = await ac.post(URLPath(app.url_path_for('post_menu')),
+                             json={'title': 'Changes_menu', 'description': 'Changes'})
+    menu_id = response.json()['id']
+    response = await ac.post(URLPath(app.url_path_for('post_submenu', menu_id=menu_id)),
+                             json={'title': 'Changes_submenu', 'description': 'Changes'})
+    submenu_id = response.json()['id']
+    response = await ac.post(URLPath(app.url_path_for('post_dish', menu_id=menu_id, submenu_id=submenu_id)),
+                             json={'title': 'Changes_dish', 'description': 'Changes', 'price': '7.5'})
+    dish_id = response.json()['id']
+
+    page = (await ac.get(url, params={'since': since})).json()
+    assert [(change['entity'], change['id']) for change in page['changes']] == [
+        ('menus', menu_id), ('submenus', submenu_id), ('dishes', dish_id)]
+    assert page['watermark'].endswith(f".{page['changes'][-1]['seq']}")
+    assert page['has_more'] is False
+    dish = page['changes'][2]
+    assert dish['menu_id'] == menu_id
+    assert dish['data'] == {'id': dish_id, 'title': 'Changes_dish', 'description': 'Changes', 'price': '7.5',
+                            'submenu_id': submenu_id}
+
+    # Повторное изменение переносит сущность в конец журнала, а не добавляет вторую запись
+    await ac.patch(URLPath(app.url_path_for('patch_menu', menu_id=menu_id)),
+                   json={'title': 'Changes_menu_updated', 'description': 'Changes'})
+    page = (await ac.get(url, params={'since': since, 'limit': 2})).json()
+    assert [change['entity'] for change in page['changes']] == ['submenus', 'dishes']
+    assert page['has_more'] is True
+    page = (await ac.get(url, params={'since': page['watermark']})).json()
+    assert [change['data']['title'] for change in page['changes']] == ['Changes_menu_updated']
+
+    watermark = page['watermark']
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+    page = (await ac.get(url, params={'since': watermark})).json()
+    assert {change['entity']: change['deleted'] for change in page['changes']} == {
+        'menus': True, 'submenus': True, 'dishes': True}
+    assert all(change['data'] is None for change in page['changes'])
+    assert page['changes'][0]['menu_id'] == menu_id
+
+
+async def test_bulk_write_is_recorded(ac: AsyncClient):
+    response = await ac.post(URLPath(app.url_path_for('post_menu')),
+                             json={'title': 'Changes_bulk', 'description': 'Changes'})
+    menu_id = response.json()['id']
+    since = await latest_watermark(ac)
+
+    # Так пишет синхронизация с Excel в режиме copy: одним оператором мимо репозиториев
+    async with engine_test.begin() as conn:
+        await conn.execute(text("INSERT INTO submenus (id, title, description, menu_id) "
+                                "SELECT gen_random_uuid(), 'Changes_bulk_' || n, 'Changes', :menu_id "
+                                "FROM generate_series(1, 3) n"), {'menu_id': menu_id})
+
+    page = (await ac.get(URLPath(app.url_path_for('get_changes')), params={'since': since})).json()
+    assert [change['entity'] for change in page['changes']] == ['submenus'] * 3
+    assert len({change['seq'] for change in page['changes']}) == 3
+
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+
+
+async def test_move_is_recorded_for_old_menu(ac: AsyncClient):
+    menu_ids = []
+    for title in ('Changes_from', 'Changes_to'):
+        response = await ac.post(URLPath(app.url_path_for('post_menu')), json={'title': title, 'description': 'Changes'})
+        menu_ids.append(response.json()['id'])
+    old_menu_id, new_menu_id = menu_ids
+    response = await ac.post(URLPath(app.url_path_for('post_submenu', menu_id=old_menu_id)),
+                             json={'title': 'Changes_moved', 'description': 'Changes'})
+    submenu_id = response.json()['id']
+    response = await ac.post(URLPath(app.url_path_for('post_dish', menu_id=old_menu_id, submenu_id=submenu_id)),
+                             json={'title': 'Changes_moved_dish', 'description': 'Changes', 'price': '2.5'})
+    dish_id = response.json()['id']
+    since = await latest_watermark(ac)
+
+    async with engine_test.begin() as conn:
+        await conn.execute(text('UPDATE submenus SET menu_id = :menu_id WHERE id = :submenu_id'),
+                           {'menu_id': new_menu_id, 'submenu_id': submenu_id})
+
+    page = (await ac.get(URLPath(app.url_path_for('get_changes')), params={'since': since})).json()
+    assert {(change['entity'], change['id'], change['menu_id'], change['deleted']) for change in page['changes']} == {
+        ('submenus', submenu_id, old_menu_id, True), ('submenus', submenu_id, new_menu_id, False),
+        ('dishes', dish_id, old_menu_id, True), ('dishes', dish_id, new_menu_id, False)}
+
+    for menu_id in menu_ids:
+        await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+
+
+async def test_changes_rejects_bad_params(ac: AsyncClient):
+    url = URLPath(app.url_path_for('get_changes'))
+    assert (await ac.get(url, params={'since': -1})).status_code == 422
+    assert (await ac.get(url, params={'since': '12'})).status_code == 422
+    assert (await ac.get(url, params={'limit': 0})).status_code == 422
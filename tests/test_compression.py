@@ -0,0 +1,97 @@
+import gzip
+
+from conftest import app
+from httpx import AsyncClient
+from starlette.datastructures import URLPath
+
+from my_app import compression
+from my_app.compression import negotiate
+
+
+def test_negotiate():
+    assert negotiate('') == 'identity'
+    assert negotiate('gzip, deflate') == 'gzip'
+    assert negotiate('gzip;q=0, deflate') == 'identity'
+    assert negotiate('*') == next(iter(compression.ENCODERS))
+    assert negotiate('identity, gzip;q=0.5') == 'gzip'
+
+
+async def create_catalog(ac: AsyncClient) -> str:
+    response = await ac.post(URLPath(app.url_path_for('post_menu')),
+                             json={'title': 'Gzip_menu', 'description': 'Gzip ' * 50})
+    menu_id = response.json()['id']
+    response = await ac.post(URLPath(app.url_path_for('post_submenu', menu_id=menu_id)),
+                             json={'title': 'Gzip_submenu', 'description': 'Gzip ' * 50})
+    for d in range(10):
+        await ac.post(URLPath(app.url_path_for('post_dish', menu_id=menu_id, submenu_id=response.json()['id'])),
+                      json={'title': f'Gzip_dish_{d}', 'description': 'Gzip ' * 50, 'price': '10'})
+    return menu_id
+
+
+async def test_menus_with_all_variants_are_cached(ac: AsyncClient, memory_cache, count_queries, monkeypatch):
+    menu_id = await create_catalog(ac)
+    url = URLPath(app.url_path_for('get_menus_with_all'))
+
+    plain = await ac.get(url, headers={'Accept-Encoding': 'identity'})
+    assert plain.status_code == 200
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.headers['Vary'] == 'Accept-Encoding'
+    assert 'ETag' in plain.headers
+
+    compressed = await ac.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.json() == plain.json()
+
+    # Повторный запрос отдает сжатый вариант из кеша, не обращаясь к БД и не сжимая заново
+    monkeypatch.setitem(compression.ENCODERS, 'gzip', lambda body: 1 / 0)
+    with count_queries() as queries:
+        again = await ac.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert again.headers['Content-Encoding'] == 'gzip'
+    assert again.content == compressed.content
+    assert queries.count <= 1
+
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+
+
+async def test_middleware_compresses_large_responses(ac: AsyncClient, monkeypatch):
+    menu_id = await create_catalog(ac)
+    url = URLPath(app.url_path_for('get_menus'))
+    monkeypatch.setattr(compression, 'COMPRESSION_MIN_SIZE', 100)
+
+    response = await ac.get(url, params={'limit': 100}, headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert int(response.headers['Content-Length']) < len(response.content)
+
+    monkeypatch.setattr(compression, 'COMPRESSION_MIN_SIZE', 10 ** 9)
+    response = await ac.get(url, params={'limit': 100}, headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['Vary'] == 'Accept-Encoding'
+
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+
+
+def test_gzip_is_deterministic():
+    body = b'{"title": "menu"}' * 100
+    assert compression.ENCODERS['gzip'](body) == compression.ENCODERS['gzip'](body)
+    assert gzip.decompress(compression.ENCODERS['gzip'](body)) == body
+
+
+async def test_compressed_variants_have_own_etag(ac: AsyncClient):
+    menu_id = await create_catalog(ac)
+    url = URLPath(app.url_path_for('get_menus_with_all'))
+
+    plain = await ac.get(url, headers={'Accept-Encoding': 'identity'})
+    compressed = await ac.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['ETag'] == compression.variant_etag(plain.headers['ETag'], 'gzip')
+    assert compressed.headers['ETag'] != plain.headers['ETag']
+
+    # Суффикс кодировки не мешает условному запросу
+    response = await ac.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': compressed.headers['ETag']})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == compressed.headers['ETag']
+    response = await ac.get(url, headers={'Accept-Encoding': 'identity', 'If-None-Match': plain.headers['ETag']})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == plain.headers['ETag']
+
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
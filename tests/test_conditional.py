@@ -0,0 +1,104 @@
+from conftest import app
+from fastapi import Request
+from httpx import AsyncClient
+from starlette.datastructures import URLPath
+
+from my_app.conditional import is_not_modified, make_version
+
+
+async def create_tree(ac: AsyncClient, suffix: str) -> tuple[str, str, str]:
+    response = await ac.post(URLPath(app.url_path_for('post_menu')),
+                             json={'title': f'ETag_menu_{suffix}', 'description': 'ETag'})
+    menu_id = response.json()['id']
+    response = await ac.post(URLPath(app.url_path_for('post_submenu', menu_id=menu_id)),
+                             json={'title': f'ETag_submenu_{suffix}', 'description': 'ETag'})
+    submenu_id = response.json()['id']
+    response = await ac.post(URLPath(app.url_path_for('post_dish', menu_id=menu_id, submenu_id=submenu_id)),
+                             json={'title': f'ETag_dish_{suffix}', 'description': 'ETag', 'price': '10'})
+    return menu_id, submenu_id, response.json()['id']
+
+
+def make_request(**headers: str) -> Request:
+    return Request({'type': 'http', 'headers': [(name.replace('_', '-').encode(), value.encode())
+                                                for name, value in headers.items()]})
+
+
+def test_if_none_match_takes_precedence():
+    version = make_version([])
+
+    assert version.last_modified is None
+    assert not is_not_modified(make_request(if_none_match='"other"',
+                                            if_modified_since='Mon, 19 Oct 2026 00:00:00 GMT'), version)
+    assert is_not_modified(make_request(if_none_match=f'W/{version.etag}, "other"'), version)
+    assert is_not_modified(make_request(if_none_match='*'), version)
+
+
+async def test_not_modified_without_loading_rows(ac: AsyncClient, count_queries):
+    menu_id, _, _ = await create_tree(ac, '1')
+    url = URLPath(app.url_path_for('get_menu', menu_id=menu_id))
+
+    response = await ac.get(url)
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert 'Last-Modified' in response.headers
+
+    with count_queries() as queries:
+        response = await ac.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.content == b''
+    assert response.headers['ETag'] == etag
+    # Только запрос версии
+    assert queries.count == 1
+
+    response = await ac.get(url, headers={'If-Modified-Since': response.headers['Last-Modified']})
+    assert response.status_code == 304
+
+    await ac.delete(url)
+    response = await ac.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 404
+
+
+async def test_dish_change_bubbles_up_to_menu(ac: AsyncClient):
+    menu_id, submenu_id, dish_id = await create_tree(ac, '2')
+    urls = [
+        URLPath(app.url_path_for('get_menu', menu_id=menu_id)),
+        URLPath(app.url_path_for('get_menus')),
+        URLPath(app.url_path_for('get_menus_with_all')),
+        URLPath(app.url_path_for('get_submenu', menu_id=menu_id, submenu_id=submenu_id)),
+        URLPath(app.url_path_for('get_dishes', menu_id=menu_id, submenu_id=submenu_id)),
+    ]
+    etags = [(await ac.get(url)).headers['ETag'] for url in urls]
+
+    response = await ac.patch(URLPath(app.url_path_for('patch_dish', menu_id=menu_id, submenu_id=submenu_id,
+                                                       dish_id=dish_id)),
+                              json={'title': 'ETag_dish_2', 'description': 'ETag', 'price': '11'})
+    assert response.status_code == 200
+
+    for url, etag in zip(urls, etags):
+        response = await ac.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200, url
+        assert response.headers['ETag'] != etag
+
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+
+
+async def test_list_has_no_last_modified(ac: AsyncClient):
+    menu_id, submenu_id, _ = await create_tree(ac, '3')
+    url = URLPath(app.url_path_for('get_dishes', menu_id=menu_id, submenu_id=submenu_id))
+    response = await ac.post(url, json={'title': 'ETag_dish_3_newest', 'description': 'ETag', 'price': '12'})
+    assert response.status_code == 201
+
+    response = await ac.get(url)
+    assert 'ETag' in response.headers
+    assert 'Last-Modified' not in response.headers
+    etag = response.headers['ETag']
+
+    # Удаление не самого нового блюда не двигает max(updated_at) списка, но меняет его ETag
+    dish_id = response.json()[0]['id']
+    await ac.delete(URLPath(app.url_path_for('delete_dish', menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id)))
+    response = await ac.get(url, headers={'If-Modified-Since': 'Mon, 19 Oct 2099 00:00:00 GMT'})
+    assert response.status_code == 200
+    response = await ac.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
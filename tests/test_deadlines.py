@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+from conftest import app
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from starlette.datastructures import URLPath
+
+from my_app.deadlines import parse_timeouts
+from my_app.endpoints.change_endpoints import change_service
+from my_app.main_onion import route_timeouts
+
+ROUTE = '/api/v1/changes/'
+
+
+def timeouts(source: str) -> float:
+    return REGISTRY.get_sample_value('http_request_timeouts_total', {'route': ROUTE, 'source': source}) or 0
+
+
+@pytest.fixture
+def short_budget(monkeypatch):
+    monkeypatch.setitem(route_timeouts, ROUTE, 0.3)
+
+
+async def test_slow_query_is_cancelled_by_database(ac: AsyncClient, short_budget, monkeypatch):
+    async def slow_read_changes(since, limit, session):
+        await session.execute(text('SELECT pg_sleep(5)'))
+
+    monkeypatch.setattr(change_service, 'read_changes', slow_read_changes)
+    before = timeouts('db')
+
+    started = asyncio.get_running_loop().time()
+    response = await ac.get(URLPath(app.url_path_for('get_changes')))
+    assert response.status_code == 504
+    assert response.json() == {'detail': 'request exceeded its time budget of 0.3 s'}
+    assert asyncio.get_running_loop().time() - started < 1
+    assert timeouts('db') == before + 1
+
+
+async def test_slow_handler_is_cancelled(ac: AsyncClient, short_budget, monkeypatch):
+    async def slow_read_changes(since, limit, session):
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(change_service, 'read_changes', slow_read_changes)
+    before = timeouts('app')
+
+    assert (await ac.get(URLPath(app.url_path_for('get_changes')))).status_code == 504
+    assert timeouts('app') == before + 1
+    # Бюджет соседних маршрутов не меняется
+    assert (await ac.get(URLPath(app.url_path_for('get_menus')))).status_code == 200
+
+
+def test_parse_timeouts():
+    assert parse_timeouts('/api/v1/menus/all=10; *=2.5') == {'/api/v1/menus/all': 10, '*': 2.5}
+    with pytest.raises(ValueError):
+        parse_timeouts('*=0')
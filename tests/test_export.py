@@ -0,0 +1,115 @@
+import uuid
+
+import pandas as pd
+from conftest import DATABASE_URL_TEST, app
+from export import count_catalog_rows, export_catalog
+from httpx import AsyncClient
+from orm_sync import sync_rows_orm
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from staging import collect_rows
+from starlette.datastructures import URLPath
+from telemetry import RunTelemetry
+from workbooks import read_workbook
+
+from my_app.models.models import Job, Menu
+from my_app.services import export_service
+
+engine_sync = create_engine(DATABASE_URL_TEST.replace('+asyncpg', ''))
+session_maker_sync = sessionmaker(engine_sync, autoflush=False)
+
+
+def make_catalog() -> pd.DataFrame:
+    menu_id, submenu_id, empty_submenu_id = (str(uuid.uuid4()) for _ in range(3))
+    df = pd.DataFrame([
+        [menu_id, f'Export_menu_{menu_id}', 'Export_menu_description', None, None, None],
+        [None, submenu_id, f'Export_submenu_{submenu_id}', 'Export_submenu_description', None, None],
+        [None, None, str(uuid.uuid4()), f'Export_dish_1_{menu_id}', 'Export_dish_description', 12.5],
+        [None, None, str(uuid.uuid4()), f'Export_dish_2_{menu_id}', 'Export_dish_description', 99.99],
+        [None, empty_submenu_id, f'Export_submenu_{empty_submenu_id}', 'Empty', None, None],
+    ])
+    with session_maker_sync() as db:
+        sync_rows_orm(db, df, RunTelemetry('orm', 'test'))
+    return df
+
+
+def cleanup(menu_id: str) -> None:
+    with session_maker_sync() as db:
+        db.delete(db.get(Menu, menu_id))
+        db.commit()
+
+
+def test_export_round_trip(tmp_path):
+    df = make_catalog()
+    path = str(tmp_path / 'export.xlsx')
+    reported = []
+
+    with session_maker_sync() as db:
+        total = count_catalog_rows(db)
+        written = export_catalog(db, path, reported.append)
+
+    assert written == total
+    assert reported[-1] == written
+    assert not (tmp_path / 'export.xlsx.partial').exists()
+
+    # Выгрузка читается синхронизацией без ошибок и содержит те же строки
+    exported = collect_rows(read_workbook(path))
+    expected = collect_rows(df)
+    for table, rows in expected.items():
+        assert set(rows) <= set(exported[table]), table
+
+    cleanup(df.at[0, 0])
+
+
+async def test_export_endpoints(ac: AsyncClient, tmp_path, monkeypatch):
+    sent = []
+    monkeypatch.setattr(export_service, 'send_task', lambda name, *args: sent.append((name, args)))
+    monkeypatch.setattr(export_service, 'EXPORT_DIR', str(tmp_path))
+
+    response = await ac.post(URLPath(app.url_path_for('post_export')))
+    assert response.status_code == 202
+    job_id = response.json()['id']
+    assert sent == [('tasks.export_catalog_to_xlsx', (job_id,))]
+
+    response = await ac.get(URLPath(app.url_path_for('get_export', job_id=job_id)))
+    assert response.status_code == 200
+    assert response.json()['status'] == 'pending'
+
+    response = await ac.get(URLPath(app.url_path_for('download_export', job_id=job_id)))
+    assert response.status_code == 409
+
+    # Выполняем работу воркера
+    path = tmp_path / f'{job_id}.xlsx'
+    with session_maker_sync() as db:
+        written = export_catalog(db, str(path))
+        job = db.get(Job, job_id)
+        job.status, job.processed, job.total, job.file_path = 'success', written, written, f'/exports/{path.name}'
+        db.commit()
+
+    response = await ac.get(URLPath(app.url_path_for('get_export', job_id=job_id)))
+    assert response.json()['processed'] == written
+
+    response = await ac.get(URLPath(app.url_path_for('download_export', job_id=job_id)))
+    assert response.status_code == 200
+    assert response.content == path.read_bytes()
+
+    response = await ac.get(URLPath(app.url_path_for('get_export', job_id=str(uuid.uuid4()))))
+    assert response.status_code == 404
+
+
+async def test_export_fails_when_broker_is_down(ac: AsyncClient, monkeypatch):
+    sent = []
+
+    def send_task(name: str, *args) -> None:
+        sent.append(args)
+        raise ConnectionRefusedError('broker is down')
+
+    monkeypatch.setattr(export_service, 'send_task', send_task)
+
+    response = await ac.post(URLPath(app.url_path_for('post_export')))
+    assert response.status_code == 503
+    [(job_id,)] = sent
+
+    response = await ac.get(URLPath(app.url_path_for('get_export', job_id=job_id)))
+    assert response.json()['status'] == 'failed'
+    assert 'broker is down' in response.json()['error']
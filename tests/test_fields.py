@@ -0,0 +1,91 @@
+import pytest
+from conftest import app, engine_test
+from httpx import AsyncClient
+from sqlalchemy import event
+from starlette.datastructures import URLPath
+
+
+@pytest.fixture
+def statements():
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append(statement)
+
+    event.listen(engine_test.sync_engine, 'before_cursor_execute', capture)
+    yield captured
+    event.remove(engine_test.sync_engine, 'before_cursor_execute', capture)
+
+
+async def create_catalog(ac: AsyncClient) -> tuple[str, str]:
+    response = await ac.post(URLPath(app.url_path_for('post_menu')),
+                             json={'title': 'Fields_menu', 'description': 'Fields_menu_description'})
+    menu_id = response.json()['id']
+    response = await ac.post(URLPath(app.url_path_for('post_submenu', menu_id=menu_id)),
+                             json={'title': 'Fields_submenu', 'description': 'Fields_submenu_description'})
+    submenu_id = response.json()['id']
+    for d in range(2):
+        await ac.post(URLPath(app.url_path_for('post_dish', menu_id=menu_id, submenu_id=submenu_id)),
+                      json={'title': f'Fields_dish_{d}', 'description': 'Fields', 'price': '12.5'})
+    return menu_id, submenu_id
+
+
+async def test_list_selects_only_requested_columns(ac: AsyncClient, statements):
+    menu_id, submenu_id = await create_catalog(ac)
+    statements.clear()
+
+    response = await ac.get(URLPath(app.url_path_for('get_menus')), params={'fields': 'title', 'limit': 100})
+    assert response.status_code == 200
+    menu = next(item for item in response.json() if item['id'] == menu_id)
+    assert menu == {'id': menu_id, 'title': 'Fields_menu'}
+    assert not any('description' in statement or 'count(' in statement for statement in statements)
+
+    statements.clear()
+    response = await ac.get(URLPath(app.url_path_for('get_dishes', menu_id=menu_id, submenu_id=submenu_id)),
+                            params={'fields': 'title,price'})
+    assert {tuple(sorted(dish)) for dish in response.json()} == {('id', 'price', 'title')}
+    assert response.json()[0]['price'] == '12.5'
+    assert not any('description' in statement for statement in statements)
+
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+
+
+async def test_counts_only_when_requested(ac: AsyncClient, statements):
+    menu_id, submenu_id = await create_catalog(ac)
+
+    response = await ac.get(URLPath(app.url_path_for('get_menu', menu_id=menu_id)),
+                            params={'fields': 'dishes_count'})
+    assert response.json() == {'id': menu_id, 'dishes_count': 2}
+
+    statements.clear()
+    response = await ac.get(URLPath(app.url_path_for('get_submenu', menu_id=menu_id, submenu_id=submenu_id)),
+                            params={'fields': 'title,menu_id'})
+    assert response.json() == {'id': submenu_id, 'title': 'Fields_submenu', 'menu_id': menu_id}
+    assert not any('count(' in statement for statement in statements)
+
+    # Без fields ответ не меняется
+    response = await ac.get(URLPath(app.url_path_for('get_submenu', menu_id=menu_id, submenu_id=submenu_id)))
+    assert response.json() == {'id': submenu_id, 'title': 'Fields_submenu', 'description': 'Fields_submenu_description',
+                               'menu_id': menu_id, 'dishes_count': 2}
+
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+
+
+async def test_menus_with_all_applies_fields_on_every_level(ac: AsyncClient):
+    menu_id, submenu_id = await create_catalog(ac)
+
+    response = await ac.get(URLPath(app.url_path_for('get_menus_with_all')), params={'fields': 'title,price'})
+    assert response.status_code == 200
+    menu = next(item for item in response.json() if item['id'] == menu_id)
+    assert set(menu) == {'id', 'title', 'submenus'}
+    assert set(menu['submenus'][0]) == {'id', 'title', 'dishes'}
+    assert {tuple(sorted(dish)) for dish in menu['submenus'][0]['dishes']} == {('id', 'price', 'title')}
+
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+
+
+async def test_unknown_fields_are_rejected(ac: AsyncClient):
+    response = await ac.get(URLPath(app.url_path_for('get_menus')), params={'fields': 'title,price'})
+    assert response.status_code == 422
+    response = await ac.get(URLPath(app.url_path_for('get_menus')), params={'fields': ','})
+    assert response.status_code == 422
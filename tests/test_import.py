@@ -0,0 +1,157 @@
+import io
+import uuid
+
+import imports
+import pandas as pd
+import psycopg2
+from conftest import DATABASE_URL_TEST, app
+from httpx import AsyncClient
+from imports import ImportRow, import_batch, import_catalog, parse_rows
+from openpyxl import Workbook
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.datastructures import URLPath
+from telemetry import RunTelemetry
+
+from my_app.models.models import Dish, Job, Menu, SubMenu
+from my_app.services import import_service
+
+engine_sync = create_engine(DATABASE_URL_TEST.replace('+asyncpg', ''))
+session_maker_sync = sessionmaker(engine_sync, autoflush=False)
+
+
+def test_parse_rows_reports_each_bad_row():
+    menu_id, submenu_id, bad_submenu_id = (str(uuid.uuid4()) for _ in range(3))
+    df = pd.DataFrame([
+        [None, None, str(uuid.uuid4()), 'Import_orphan', 'Import', 1],
+        [menu_id, 'Import_menu', 'Import', None, None, None],
+        [None, submenu_id, 'Import_submenu', 'Import', None, None],
+        [None, None, str(uuid.uuid4()), 'Import_dish', 'Import', 'abc'],
+        [None, None, str(uuid.uuid4()), 'Import_dish_ok', 'Import', 5],
+        [None, bad_submenu_id, None, 'Import', None, None],
+        [None, None, str(uuid.uuid4()), 'Import_dish_skipped', 'Import', 5],
+        ['not-a-uuid', 'Import_bad_menu', 'Import', None, None, None],
+        [None, str(uuid.uuid4()), 'Import_submenu_skipped', 'Import', None, None],
+    ])
+
+    rows, errors = parse_rows(df)
+
+    assert [(row.number, row.table) for row in rows] == [
+        (2, 'staging_menus'), (3, 'staging_submenus'), (5, 'staging_dishes')]
+    assert [error['row'] for error in errors] == [1, 4, 6, 7, 8, 9]
+    assert errors[1]['error'] == 'блюдо: некорректная цена abc'
+    assert errors[3]['error'] == 'подменю в строке 6 не загружено'
+    assert errors[5]['error'] == 'меню в строке 8 не загружено'
+
+
+def test_import_catalog_in_batches():
+    menu_id, submenu_id, taken_id = (str(uuid.uuid4()) for _ in range(3))
+    with session_maker_sync() as db:
+        db.add(Menu(id=taken_id, title=f'Import_taken_{taken_id}', description='Import'))
+        db.commit()
+
+    df = pd.DataFrame([
+        [menu_id, f'Import_menu_{menu_id}', 'Import', None, None, None],
+        [None, submenu_id, f'Import_submenu_{submenu_id}', 'Import', None, None],
+    ] + [
+        [None, None, str(uuid.uuid4()), f'Import_dish_{n}_{menu_id}', 'Import', n] for n in range(5)
+    ] + [
+        # Название занято другим меню: БД отклоняет строку, остальные загружаются
+        [str(uuid.uuid4()), f'Import_taken_{taken_id}', 'Import', None, None, None],
+    ])
+    reported = []
+    run = RunTelemetry('copy', 'test')
+
+    with session_maker_sync() as db:
+        errors = import_catalog(db, df, run, lambda processed, errors: reported.append(processed), batch_rows=3)
+
+    assert [error['row'] for error in errors] == [8]
+    assert reported == [3, 6, 8]
+    assert run.rows['dishes']['created'] == 5
+    with session_maker_sync() as db:
+        assert db.query(Dish).join(SubMenu).filter(SubMenu.menu_id == menu_id).count() == 5
+        for removed in (menu_id, taken_id):
+            db.delete(db.get(Menu, removed))
+        db.commit()
+
+
+def test_import_batch_bisects_rejected_batch(monkeypatch):
+    batch = [ImportRow(number, 'staging_dishes', (number,)) for number in range(1, 65)]
+    calls = []
+
+    def apply_rows(db, rows, run):
+        numbers = [values[0] for values in rows['staging_dishes']]
+        calls.append(numbers)
+        if 17 in numbers:
+            raise psycopg2.IntegrityError('duplicate key value violates unique constraint')
+
+    monkeypatch.setattr(imports, 'apply_rows', apply_rows)
+
+    errors = import_batch(None, batch, RunTelemetry('copy', 'test'))
+
+    assert errors == [{'row': 17, 'error': 'duplicate key value violates unique constraint'}]
+    # Пачка из 64 строк делится 6 раз: 1 + 2 * 6 загрузок вместо 1 + 64
+    assert len(calls) == 13
+    assert sorted(number for numbers in calls[1:] for number in numbers if len(numbers) == 1) == [17, 18]
+
+
+def workbook_bytes() -> bytes:
+    workbook = Workbook()
+    workbook.active.append([str(uuid.uuid4()), 'Import_upload', 'Import'])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+async def test_import_endpoints(ac: AsyncClient, tmp_path, monkeypatch):
+    sent = []
+    monkeypatch.setattr(import_service, 'send_task', lambda name, *args: sent.append((name, args)))
+    monkeypatch.setattr(import_service, 'IMPORT_DIR', str(tmp_path))
+    content = workbook_bytes()
+
+    response = await ac.post(URLPath(app.url_path_for('post_import')),
+                             files={'file': ('Menu.xlsx', content, 'application/octet-stream')})
+    assert response.status_code == 202
+    job = response.json()
+    assert (job['kind'], job['status'], job['errors']) == ('import', 'pending', [])
+    [(name, (job_id, filename))] = sent
+    assert (name, job_id) == ('tasks.import_catalog_from_xlsx', job['id'])
+    assert (tmp_path / filename).read_bytes() == content
+
+    # Так воркер сообщает о прогрессе
+    with session_maker_sync() as db:
+        stored = db.get(Job, job_id)
+        stored.status, stored.processed, stored.total = 'running', 1, 2
+        stored.errors = [{'row': 2, 'error': 'блюдо: некорректная цена abc'}]
+        db.commit()
+
+    response = await ac.get(URLPath(app.url_path_for('get_import', job_id=job_id)))
+    assert response.status_code == 200
+    assert response.json()['errors'] == [{'row': 2, 'error': 'блюдо: некорректная цена abc'}]
+
+    response = await ac.post(URLPath(app.url_path_for('post_import')),
+                             files={'file': ('Menu.csv', b'id,title', 'text/csv')})
+    assert response.status_code == 415
+    response = await ac.get(URLPath(app.url_path_for('get_import', job_id=str(uuid.uuid4()))))
+    assert response.status_code == 404
+
+
+async def test_import_fails_when_broker_is_down(ac: AsyncClient, tmp_path, monkeypatch):
+    sent = []
+
+    def send_task(name: str, *args) -> None:
+        sent.append(args)
+        raise ConnectionRefusedError('broker is down')
+
+    monkeypatch.setattr(import_service, 'send_task', send_task)
+    monkeypatch.setattr(import_service, 'IMPORT_DIR', str(tmp_path))
+
+    response = await ac.post(URLPath(app.url_path_for('post_import')),
+                             files={'file': ('Menu.xlsx', workbook_bytes(), 'application/octet-stream')})
+    assert response.status_code == 503
+    [(job_id, filename)] = sent
+    assert not (tmp_path / filename).exists()
+
+    response = await ac.get(URLPath(app.url_path_for('get_import', job_id=job_id)))
+    assert response.json()['status'] == 'failed'
+    assert 'broker is down' in response.json()['error']
@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import pytest
+from conftest import app, engine_test
+from httpx import AsyncClient
+from sqlalchemy import text
+from starlette.datastructures import URLPath
+
+from my_app.change_feed import ChangeFeed
+from my_app.endpoints.stream_endpoints import event_stream
+
+
+@pytest.fixture
+async def feed():
+    feed = ChangeFeed(engine_test)
+    yield feed
+    await feed.stop()
+
+
+async def create_menu(ac: AsyncClient, title: str) -> tuple[str, str]:
+    response = await ac.post(URLPath(app.url_path_for('post_menu')),
+                             json={'title': title, 'description': 'Stream'})
+    menu_id = response.json()['id']
+    response = await ac.post(URLPath(app.url_path_for('post_submenu', menu_id=menu_id)),
+                             json={'title': f'{title}_submenu', 'description': 'Stream'})
+    return menu_id, response.json()['id']
+
+
+async def next_event(queue: asyncio.Queue, timeout: float = 5) -> dict:
+    return await asyncio.wait_for(queue.get(), timeout)
+
+
+async def test_stream_filters_by_menu(ac: AsyncClient, feed: ChangeFeed):
+    menu_id, submenu_id = await create_menu(ac, 'Stream_menu')
+    other_id, other_submenu_id = await create_menu(ac, 'Stream_other')
+    subscription = await feed.subscribe(frozenset({menu_id}))
+
+    await ac.post(URLPath(app.url_path_for('post_dish', menu_id=other_id, submenu_id=other_submenu_id)),
+                  json={'title': 'Stream_other_dish', 'description': 'Stream', 'price': '3'})
+    response = await ac.post(URLPath(app.url_path_for('post_dish', menu_id=menu_id, submenu_id=submenu_id)),
+                             json={'title': 'Stream_dish', 'description': 'Stream', 'price': '3'})
+
+    event = await next_event(subscription.queue)
+    assert event == {'table': 'dishes', 'op': 'insert', 'menu_id': menu_id, 'count': 1,
+                     'ids': [response.json()['id']]}
+    # Обновление updated_at подменю и меню триггером - не отдельное событие
+    with pytest.raises(asyncio.TimeoutError):
+        await next_event(subscription.queue, timeout=0.3)
+
+    feed.unsubscribe(subscription)
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=other_id)))
+
+
+async def test_bulk_update_is_one_event(ac: AsyncClient, feed: ChangeFeed):
+    menu_id, submenu_id = await create_menu(ac, 'Stream_bulk')
+    for d in range(3):
+        await ac.post(URLPath(app.url_path_for('post_dish', menu_id=menu_id, submenu_id=submenu_id)),
+                      json={'title': f'Stream_bulk_dish_{d}', 'description': 'Stream', 'price': '3'})
+    subscription = await feed.subscribe()
+
+    # Так меняет цены синхронизация с Excel в режиме copy: одним оператором
+    async with engine_test.begin() as conn:
+        await conn.execute(text('UPDATE dishes SET price = price + 1 WHERE submenu_id = :submenu_id'),
+                           {'submenu_id': submenu_id})
+
+    event = await next_event(subscription.queue)
+    assert (event['table'], event['op'], event['menu_id'], event['count']) == ('dishes', 'update', menu_id, 3)
+    assert len(event['ids']) == 3
+
+    feed.unsubscribe(subscription)
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+
+
+async def test_event_stream_format_and_overflow(feed: ChangeFeed):
+    subscription = await feed.subscribe()
+    stream = event_stream(feed, subscription, ping_interval=0.1)
+    assert (await anext(stream)).startswith('retry:')
+    assert await anext(stream) == ': ping\n\n'
+
+    feed.publish({'table': 'menus', 'op': 'update', 'menu_id': 'a', 'count': 1, 'ids': ['a']})
+    message = await anext(stream)
+    event, data = message.strip().split('\n')
+    assert event == 'event: change'
+    assert json.loads(data.removeprefix('data: '))['menu_id'] == 'a'
+
+    # Переполненная очередь медленного клиента заменяется одним resync
+    for _ in range(subscription.queue.maxsize + 1):
+        feed.publish({'table': 'menus', 'op': 'update', 'menu_id': 'a', 'count': 1, 'ids': ['a']})
+    assert subscription.queue.qsize() == 1
+    assert (await anext(stream)).startswith('event: resync')
+
+    await stream.aclose()
+    assert subscription not in feed.subscribers
@@ -0,0 +1,82 @@
+from conftest import app
+from httpx import AsyncClient
+from starlette.datastructures import URLPath
+
+
+async def create_menu(ac: AsyncClient, title: str, submenus: int = 2, dishes: int = 2) -> str:
+    response = await ac.post(URLPath(app.url_path_for('post_menu')),
+                             json={'title': title, 'description': f'{title}_description'})
+    menu_id = response.json()['id']
+    for s in range(submenus):
+        response = await ac.post(URLPath(app.url_path_for('post_submenu', menu_id=menu_id)),
+                                 json={'title': f'{title}_submenu_{s}', 'description': 'Tree'})
+        submenu_id = response.json()['id']
+        for d in range(dishes):
+            await ac.post(URLPath(app.url_path_for('post_dish', menu_id=menu_id, submenu_id=submenu_id)),
+                          json={'title': f'{title}_dish_{s}_{d}', 'description': 'Tree', 'price': '10'})
+    return menu_id
+
+
+async def test_menu_tree_with_dishes(ac: AsyncClient, count_queries):
+    menu_id = await create_menu(ac, 'Tree_menu')
+    url = URLPath(app.url_path_for('get_menu', menu_id=menu_id))
+
+    # Меню, подменю и блюда, плюс запрос версии для ETag
+    with count_queries() as queries:
+        response = await ac.get(url, params={'include': 'submenus.dishes'})
+    assert response.status_code == 200
+    assert queries.count <= 4
+    menu = response.json()
+    assert menu['submenus_count'] == 2
+    assert menu['dishes_count'] == 4
+    assert sorted(submenu['title'] for submenu in menu['submenus']) == ['Tree_menu_submenu_0', 'Tree_menu_submenu_1']
+    for submenu in menu['submenus']:
+        assert submenu['dishes_count'] == 2
+        assert len(submenu['dishes']) == 2
+        assert submenu['dishes'][0]['price'] == '10.0'
+
+    with count_queries() as queries:
+        response = await ac.get(url, params={'include': 'submenus', 'fields': 'title'})
+    assert queries.count <= 3
+    menu = response.json()
+    assert set(menu) == {'id', 'title', 'submenus'}
+    assert all(set(submenu) == {'id', 'title'} for submenu in menu['submenus'])
+
+    # Без include ответ прежний
+    response = await ac.get(url)
+    assert 'submenus' not in response.json()
+    assert response.json()['dishes_count'] == 4
+
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+
+
+async def test_menu_tree_rejects_unknown_include(ac: AsyncClient):
+    menu_id = await create_menu(ac, 'Tree_bad_include', submenus=0)
+    response = await ac.get(URLPath(app.url_path_for('get_menu', menu_id=menu_id)), params={'include': 'dishes'})
+    assert response.status_code == 422
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+
+
+async def test_menu_tree_cache_is_per_menu(ac: AsyncClient, memory_cache, count_queries):
+    menu_id = await create_menu(ac, 'Tree_cached', submenus=1, dishes=1)
+    other_id = await create_menu(ac, 'Tree_other', submenus=1, dishes=0)
+    url = URLPath(app.url_path_for('get_menu', menu_id=menu_id))
+    params = {'include': 'submenus,submenus.dishes'}
+
+    await ac.get(url, params=params)
+    # Изменения в другом меню не сбрасывают дерево этого меню
+    await ac.patch(URLPath(app.url_path_for('patch_menu', menu_id=other_id)),
+                   json={'title': 'Tree_other_updated', 'description': 'Tree'})
+    with count_queries() as queries:
+        cached = await ac.get(url, params=params)
+    assert queries.count <= 1
+    assert cached.json()['dishes_count'] == 1
+
+    submenu_id = cached.json()['submenus'][0]['id']
+    await ac.post(URLPath(app.url_path_for('post_dish', menu_id=menu_id, submenu_id=submenu_id)),
+                  json={'title': 'Tree_cached_new_dish', 'description': 'Tree', 'price': '5'})
+    response = await ac.get(url, params=params)
+    assert response.json()['dishes_count'] == 2
+
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=other_id)))
@@ -0,0 +1,65 @@
+from cashews import Command
+from conftest import app
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from starlette.datastructures import URLPath
+
+from my_app.config import engine
+from my_app.metrics import PoolCollector, cache_metrics_middleware, cached_function
+
+MENU_ROUTE = '/api/v1/menus/{menu_id}'
+
+
+def sample(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+async def test_route_latency_uses_template(ac: AsyncClient):
+    labels = {'method': 'GET', 'route': MENU_ROUTE, 'status': '404'}
+    before = sample('http_request_duration_seconds_count', labels)
+
+    url = URLPath(app.url_path_for('get_menu', menu_id='5f0ae2f3-6d43-4a69-9a53-52d36a4d5b3c'))
+    response = await ac.get(url)
+    assert response.status_code == 404
+
+    assert sample('http_request_duration_seconds_count', labels) == before + 1
+    assert sample('http_requests_in_flight', {}) == 0
+
+
+async def test_metrics_endpoint(ac: AsyncClient):
+    response = await ac.get('/metrics')
+
+    assert response.status_code == 200
+    assert 'http_request_duration_seconds_bucket' in response.text
+
+
+async def test_cache_middleware_counts_hits_and_misses():
+    key = 'my_app.endpoints.menu_endpoints:read_menus:skip:0:limit:10'
+    assert cached_function(key) == 'menu_endpoints:read_menus'
+    labels = {'function': 'menu_endpoints:read_menus'}
+    empty = object()
+    storage = {}
+
+    async def get(key, default=None):
+        return storage.get(key, default)
+
+    async def set(key, value, expire=None):
+        storage[key] = value
+
+    hits = sample('cache_requests_total', {**labels, 'result': 'hit'})
+    misses = sample('cache_requests_total', {**labels, 'result': 'miss'})
+
+    assert await cache_metrics_middleware(get, Command.GET, None, key, default=empty) is empty
+    await cache_metrics_middleware(set, Command.SET, None, key, [1], expire=120)
+    assert await cache_metrics_middleware(get, Command.GET, None, key, default=empty) == [1]
+
+    assert sample('cache_requests_total', {**labels, 'result': 'hit'}) == hits + 1
+    assert sample('cache_requests_total', {**labels, 'result': 'miss'}) == misses + 1
+    assert sample('cache_operation_duration_seconds_count', {**labels, 'operation': 'set'}) >= 1
+
+
+def test_pool_collector():
+    metrics = {family.name: family.samples[0].value for family in PoolCollector(engine).collect()}
+
+    assert metrics['db_pool_size'] == engine.sync_engine.pool.size()
+    assert metrics['db_pool_overflow'] == 0
@@ -0,0 +1,61 @@
+from conftest import app
+from httpx import AsyncClient
+from starlette.datastructures import URLPath
+
+from my_app.profiling import (
+    ProfilingMiddleware,
+    check_profile_token,
+    make_profile_token,
+)
+
+SECRET = 'test-secret'
+
+
+def test_profile_token():
+    token = make_profile_token(SECRET, ttl=60)
+
+    assert check_profile_token(SECRET, token)
+    assert not check_profile_token('other-secret', token)
+    assert not check_profile_token(SECRET, make_profile_token(SECRET, ttl=-1))
+    assert not check_profile_token(SECRET, 'garbage')
+    assert not check_profile_token('', token)
+
+
+async def test_signed_request_is_profiled(tmp_path):
+    profiled = ProfilingMiddleware(app, secret=SECRET, directory=str(tmp_path), interval=0.001)
+    url = URLPath(app.url_path_for('get_menus_with_all'))
+
+    async with AsyncClient(app=profiled, base_url='http://test') as client:
+        response = await client.get(url, headers={'X-Profile': 'bad.token', 'X-Request-ID': 'unsigned'})
+        assert response.status_code == 200
+        assert 'X-Profile-Report' not in response.headers
+
+        response = await client.get(url, params={'profile': make_profile_token(SECRET, ttl=60)},
+                                    headers={'X-Request-ID': 'req-42'})
+
+    assert response.status_code == 200
+    report = tmp_path / response.headers['X-Profile-Report']
+    assert response.headers['X-Request-ID'] == 'req-42'
+    assert 'req-42' in report.name
+
+    lines = report.read_text().splitlines()
+    assert lines, 'Профиль пустой'
+    for line in lines:
+        stack, count = line.rsplit(' ', 1)
+        assert stack.startswith('GET /api/v1/menus/all;request req-42;')
+        assert int(count) > 0
+
+
+async def test_sample_rate(tmp_path):
+    sampled = ProfilingMiddleware(app, sample_rate=1.0, directory=str(tmp_path))
+
+    async with AsyncClient(app=sampled, base_url='http://test') as client:
+        response = await client.get(URLPath(app.url_path_for('get_menus')))
+
+    assert (tmp_path / response.headers['X-Profile-Report']).exists()
+
+    async with AsyncClient(app=sampled, base_url='http://test') as client:
+        response = await client.get(URLPath(app.url_path_for('get_menus')), headers={'X-Request-ID': '../../x'})
+
+    assert response.headers['X-Request-ID'] != '../../x'
+    assert (tmp_path / response.headers['X-Profile-Report']).exists()
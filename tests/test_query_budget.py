@@ -0,0 +1,70 @@
+from conftest import app, async_session_maker
+from httpx import AsyncClient
+from starlette.datastructures import URLPath
+
+from my_app import query_stats
+from my_app.schemas.dish_schema import DishSchemaAdd
+from my_app.schemas.menu_schema import MenuSchemaAdd
+from my_app.schemas.submenu_schema import SubMenuSchemaAdd
+from my_app.services.dish_service import DishService
+from my_app.services.menu_service import MenuService
+from my_app.services.submenu_service import SubMenuService
+
+
+async def create_catalog(prefix: str, menus: int = 3, submenus: int = 3) -> list[str]:
+    menu_ids = []
+    async with async_session_maker() as session:
+        for m in range(menus):
+            menu = await MenuService.create_menu(
+                MenuSchemaAdd(title=f'{prefix}_menu_{m}', description='Budget'), session)
+            menu_ids.append(menu.id)
+            for s in range(submenus):
+                submenu = await SubMenuService.create_submenu(
+                    menu.id, SubMenuSchemaAdd(title=f'{prefix}_submenu_{m}_{s}', description='Budget'), session)
+                await DishService.create_dish(
+                    menu.id, submenu.id,
+                    DishSchemaAdd(title=f'{prefix}_dish_{m}_{s}', description='Budget', price='1.5'), session)
+    return menu_ids
+
+
+async def delete_catalog(menu_ids: list[str]) -> None:
+    async with async_session_maker() as session:
+        for menu_id in menu_ids:
+            await MenuService.delete_menu(menu_id, session)
+
+
+async def test_list_endpoints_have_no_n_plus_one(ac: AsyncClient, count_queries):
+    menu_ids = await create_catalog('Budget')
+
+    with count_queries() as queries:
+        response = await ac.get(URLPath(app.url_path_for('get_menus')), params={'limit': 50})
+    assert response.status_code == 200
+    assert len(response.json()) >= 3
+    assert queries.count <= 2, queries
+
+    counts = {menu['id']: (menu['submenus_count'], menu['dishes_count']) for menu in response.json()}
+    assert counts[menu_ids[0]] == (3, 3)
+
+    with count_queries() as queries:
+        response = await ac.get(URLPath(app.url_path_for('get_submenus', menu_id=menu_ids[0])),
+                                params={'limit': 50})
+    assert [submenu['dishes_count'] for submenu in response.json()] == [1, 1, 1]
+    assert queries.count <= 2, queries
+
+    with count_queries() as queries:
+        await ac.get(URLPath(app.url_path_for('get_menus_with_all')))
+    assert queries.count <= 3, queries
+
+    await delete_catalog(menu_ids)
+
+
+async def test_query_headers(ac: AsyncClient, monkeypatch):
+    url = URLPath(app.url_path_for('get_menus'))
+
+    response = await ac.get(url)
+    assert 'X-DB-Queries' not in response.headers
+
+    monkeypatch.setattr(query_stats, 'DB_QUERY_HEADERS', True)
+    response = await ac.get(url)
+    assert int(response.headers['X-DB-Queries']) >= 1
+    assert response.headers['Server-Timing'].startswith('db;dur=')
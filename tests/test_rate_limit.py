@@ -0,0 +1,69 @@
+import pytest
+from conftest import app
+from httpx import AsyncClient
+from starlette.datastructures import URLPath
+
+from my_app.main_onion import rate_limiter
+from my_app.rate_limit import RateLimiter, parse_rate_limits
+
+
+@pytest.fixture
+def limits():
+    def configure(value: str) -> None:
+        rate_limiter.limits = parse_rate_limits(value)
+        rate_limiter.buckets.clear()
+
+    previous = rate_limiter.limits
+    yield configure
+    rate_limiter.limits = previous
+    rate_limiter.buckets.clear()
+
+
+async def test_route_limit_returns_429_with_retry_after(ac: AsyncClient, limits):
+    limits('/api/v1/menus/all=0.5:2')
+    url = URLPath(app.url_path_for('get_menus_with_all'))
+
+    assert (await ac.get(url)).status_code == 200
+    assert (await ac.get(url)).status_code == 200
+    response = await ac.get(url)
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '2'
+    assert response.json() == {'detail': 'rate limit exceeded'}
+
+    # Другие маршруты и другие ключи API ограничиваются отдельно
+    assert (await ac.get(URLPath(app.url_path_for('get_menus')))).status_code == 200
+    assert (await ac.get(url, headers={'X-API-Key': 'integration-1'})).status_code == 200
+
+
+async def test_default_limit_applies_to_unlisted_routes(ac: AsyncClient, limits):
+    limits('/api/v1/menus/all=100:100;*=0.1:1')
+    url = URLPath(app.url_path_for('get_menus'))
+
+    assert (await ac.get(url)).status_code == 200
+    assert (await ac.get(url)).status_code == 429
+    assert (await ac.get(URLPath(app.url_path_for('get_menus_with_all')))).status_code == 200
+    # Служебные маршруты вне /api/ не ограничиваются
+    assert (await ac.get('/metrics')).status_code == 200
+
+
+async def test_unavailable_redis_falls_back_to_local_buckets():
+    limiter = RateLimiter(parse_rate_limits('*=1:1'), 'redis://127.0.0.1:1/0')
+    limit = limiter.limits['*']
+
+    assert await limiter.acquire('rate:*:ip:test', limit) == 0
+    assert await limiter.acquire('rate:*:ip:test', limit) > 0
+    assert limiter.buckets
+    await limiter.close()
+
+
+def test_parse_rate_limits():
+    assert parse_rate_limits('') == {}
+    limits = parse_rate_limits('/api/v1/menus/{menu_id}=5:10; *=20')
+    assert limits['/api/v1/menus/{menu_id}'] == (5.0, 10)
+    assert limits['*'] == (20.0, 20)
+    with pytest.raises(ValueError):
+        parse_rate_limits('/api/v1/menus/all=0:1')
+    # Шаблон с параметром не перехватывает /menus/all
+    limiter = RateLimiter(parse_rate_limits('/api/v1/menus/{menu_id}=5:10;/api/v1/menus/all=1:1'))
+    assert limiter.limit_for('/api/v1/menus/all')[0] == '/api/v1/menus/all'
+    assert limiter.limit_for('/docs') is None
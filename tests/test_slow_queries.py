@@ -0,0 +1,54 @@
+from conftest import app, async_session_maker, engine_test
+from httpx import AsyncClient
+from sqlalchemy import delete, select
+from starlette.datastructures import URLPath
+
+from my_app.models.models import SlowQuery
+from my_app.slow_queries import SlowQueryLog, explainable
+
+
+def test_explainable_only_reads():
+    assert explainable('  select * from menus', executemany=False)
+    assert not explainable('SELECT * FROM menus FOR UPDATE', executemany=False)
+    assert not explainable('UPDATE menus SET title = $1', executemany=False)
+    assert not explainable('SELECT 1', executemany=True)
+
+
+async def test_slow_queries_are_recorded_with_route_and_plan(ac: AsyncClient):
+    # Нулевой порог делает медленным любой запрос
+    log = SlowQueryLog(engine_test, threshold_ms=0, explain_rate=1)
+    log.install()
+    try:
+        response = await ac.get(URLPath(app.url_path_for('get_menus')))
+        assert response.status_code == 200
+    finally:
+        log.uninstall()
+
+    assert log.pending
+    assert await log.flush() >= 1
+    assert not log.pending
+
+    async with async_session_maker() as session:
+        recorded = (await session.scalars(select(SlowQuery))).all()
+        await session.execute(delete(SlowQuery))
+        await session.commit()
+
+    query = next(query for query in recorded if 'FROM menus' in query.statement)
+    assert query.route == 'GET /api/v1/menus/'
+    assert query.duration >= 0
+    assert 'Plan' in query.plan[0]
+    assert 'Shared Hit Blocks' in query.plan[0]['Plan']
+    # Запись в slow_queries и EXPLAIN сами в журнал не попадают
+    assert not any('slow_queries' in query.statement or 'EXPLAIN' in query.statement for query in recorded)
+
+
+async def test_fast_queries_are_ignored(ac: AsyncClient):
+    log = SlowQueryLog(engine_test, threshold_ms=60_000)
+    log.install()
+    try:
+        await ac.get(URLPath(app.url_path_for('get_menus')))
+    finally:
+        log.uninstall()
+
+    assert not log.pending
+    assert await log.flush() == 0
@@ -0,0 +1,79 @@
+import uuid
+
+from conftest import app
+from httpx import AsyncClient
+from starlette.datastructures import URLPath
+
+
+async def create_menu(ac: AsyncClient, title: str, prices: list[list[str]]) -> tuple[str, list[str]]:
+    response = await ac.post(URLPath(app.url_path_for('post_menu')), json={'title': title, 'description': 'Stats'})
+    menu_id = response.json()['id']
+    submenu_ids = []
+    for s, submenu_prices in enumerate(prices):
+        response = await ac.post(URLPath(app.url_path_for('post_submenu', menu_id=menu_id)),
+                                 json={'title': f'{title}_submenu_{s}', 'description': 'Stats'})
+        submenu_ids.append(response.json()['id'])
+        for d, price in enumerate(submenu_prices):
+            await ac.post(URLPath(app.url_path_for('post_dish', menu_id=menu_id, submenu_id=submenu_ids[-1])),
+                          json={'title': f'{title}_dish_{s}_{d}', 'description': 'Stats', 'price': price})
+    return menu_id, submenu_ids
+
+
+async def test_menu_stats(ac: AsyncClient):
+    menu_id, (first_id, second_id, empty_id) = await create_menu(ac, 'Stats_menu', [['1', '2', '3'], ['10'], []])
+
+    response = await ac.get(URLPath(app.url_path_for('get_menu_stats', menu_id=menu_id)))
+    assert response.status_code == 200
+    stats = response.json()
+    assert (stats['id'], stats['dishes_count']) == (menu_id, 4)
+    assert (stats['min_price'], stats['max_price'], stats['avg_price'], stats['median_price']) == (
+        '1.0', '10.0', '4.0', '2.5')
+    assert stats['submenus'] == [
+        {'id': first_id, 'title': 'Stats_menu_submenu_0', 'dishes_count': 3, 'min_price': '1.0',
+         'max_price': '3.0', 'avg_price': '2.0', 'median_price': '2.0'},
+        {'id': second_id, 'title': 'Stats_menu_submenu_1', 'dishes_count': 1, 'min_price': '10.0',
+         'max_price': '10.0', 'avg_price': '10.0', 'median_price': '10.0'},
+        {'id': empty_id, 'title': 'Stats_menu_submenu_2', 'dishes_count': 0, 'min_price': None,
+         'max_price': None, 'avg_price': None, 'median_price': None},
+    ]
+
+    response = await ac.get(URLPath(app.url_path_for('get_menu_stats', menu_id=str(uuid.uuid4()))))
+    assert response.status_code == 404
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+
+
+async def test_catalog_stats(ac: AsyncClient):
+    menu_id, _ = await create_menu(ac, 'Stats_catalog', [['4', '6']])
+    empty_id, _ = await create_menu(ac, 'Stats_catalog_empty', [[]])
+
+    stats = (await ac.get(URLPath(app.url_path_for('get_stats')))).json()
+    menus = {menu['id']: menu for menu in stats['menus']}
+    assert menus[menu_id]['median_price'] == '5.0'
+    assert empty_id not in menus
+    assert stats['dishes_count'] == sum(menu['dishes_count'] for menu in stats['menus'])
+
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=empty_id)))
+
+
+async def test_stats_are_cached_until_prices_change(ac: AsyncClient, memory_cache, count_queries):
+    menu_id, (submenu_id,) = await create_menu(ac, 'Stats_cached', [['7']])
+    menu_url = URLPath(app.url_path_for('get_menu_stats', menu_id=menu_id))
+    catalog_url = URLPath(app.url_path_for('get_stats'))
+
+    await ac.get(menu_url)
+    await ac.get(catalog_url)
+    with count_queries() as queries:
+        assert (await ac.get(menu_url)).json()['max_price'] == '7.0'
+        await ac.get(catalog_url)
+    assert queries.count == 0
+
+    dishes_url = URLPath(app.url_path_for('get_dishes', menu_id=menu_id, submenu_id=submenu_id))
+    dish_id = (await ac.get(dishes_url)).json()[0]['id']
+    await ac.patch(URLPath(app.url_path_for('patch_dish', menu_id=menu_id, submenu_id=submenu_id, dish_id=dish_id)),
+                   json={'title': 'Stats_cached_dish_0_0', 'description': 'Stats', 'price': '9'})
+    assert (await ac.get(menu_url)).json()['max_price'] == '9.0'
+    menus = {menu['id']: menu for menu in (await ac.get(catalog_url)).json()['menus']}
+    assert menus[menu_id]['max_price'] == '9.0'
+
+    await ac.delete(URLPath(app.url_path_for('delete_menu', menu_id=menu_id)))
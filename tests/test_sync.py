@@ -0,0 +1,200 @@
+import uuid
+
+import pandas as pd
+import pytest
+from conftest import DATABASE_URL_TEST
+from database import engine, pool_options, reset_engine_after_fork
+from orm_sync import sync_rows_orm
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from staging import _CsvStream, collect_rows, import_with_copy
+from telemetry import RunTelemetry
+from workbooks import aggregate_results, discover_workbooks, split_menu_blocks, to_message_rows
+
+from my_app.models.models import Dish, Menu, SubMenu
+
+engine_sync = create_engine(DATABASE_URL_TEST.replace('+asyncpg', ''))
+session_maker_sync = sessionmaker(engine_sync, autoflush=False)
+
+
+def make_workbook(price: float = 100.0, extra_dish: bool = False) -> pd.DataFrame:
+    menu_id, submenu_id = str(uuid.uuid4()), str(uuid.uuid4())
+    rows = [
+        [menu_id, f'Sync_menu_{menu_id}', 'Sync_menu_description', None, None, None],
+        [None, submenu_id, f'Sync_submenu_{submenu_id}', 'Sync_submenu_description', None, None],
+    ]
+    for number in range(2 + extra_dish):
+        dish_id = str(uuid.uuid4())
+        rows.append([None, None, dish_id, f'Sync_dish_{dish_id}', f'Sync_dish_description_{number}', price])
+    return pd.DataFrame(rows)
+
+
+def changed_workbook(df: pd.DataFrame) -> pd.DataFrame:
+    changed = df.copy()
+    changed.at[0, 2] = 'Changed_menu_description'
+    changed.at[2, 5] = 250.5
+    new_dish_id = str(uuid.uuid4())
+    changed.loc[len(changed)] = [None, None, new_dish_id, f'Sync_dish_{new_dish_id}', 'New dish', 10.0]
+    return changed
+
+
+def snapshot(menu_id: str) -> dict:
+    with session_maker_sync() as db:
+        menu = db.get(Menu, menu_id)
+        submenus = db.scalars(select(SubMenu).filter(SubMenu.menu_id == menu_id)).all()
+        dishes = db.scalars(select(Dish).filter(Dish.submenu_id.in_([s.id for s in submenus]))).all()
+        return {
+            'menu': (menu.title, menu.description),
+            'submenus': sorted((str(s.id), s.title, s.description) for s in submenus),
+            'dishes': sorted((str(d.id), d.title, d.description, d.price, str(d.submenu_id)) for d in dishes),
+        }
+
+
+def cleanup(menu_id: str) -> None:
+    with session_maker_sync() as db:
+        menu = db.get(Menu, menu_id)
+        db.delete(menu)
+        db.commit()
+
+
+def changes(run: RunTelemetry) -> dict:
+    result = {}
+    for entity, operations in run.rows.items():
+        changed = {operation: amount for operation, amount in operations.items()
+                   if amount and operation != 'unchanged'}
+        if changed:
+            result[entity] = changed
+    return result
+
+
+def apply(mode: str, df: pd.DataFrame, **kwargs) -> RunTelemetry:
+    run = RunTelemetry(mode, 'test')
+    with session_maker_sync() as db:
+        if mode == 'copy':
+            import_with_copy(db, df, run, **kwargs)
+        else:
+            sync_rows_orm(db, df, run)
+    return run
+
+
+def test_collect_rows():
+    df = make_workbook()
+    rows = collect_rows(df)
+
+    assert rows['staging_menus'] == [(df.at[0, 0], df.at[0, 1], 'Sync_menu_description')]
+    assert rows['staging_submenus'] == [(df.at[1, 1], df.at[1, 2], 'Sync_submenu_description', df.at[0, 0])]
+    assert len(rows['staging_dishes']) == 2
+    assert all(dish[4] == df.at[1, 1] for dish in rows['staging_dishes']), 'Блюдо привязано не к тому подменю'
+    assert rows['staging_dishes'][0][3] == 100.0
+
+
+def test_collect_rows_rejects_orphans():
+    with pytest.raises(ValueError, match='до первого меню'):
+        collect_rows(pd.DataFrame([[None, str(uuid.uuid4()), 'Submenu', 'Description', None, None]]))
+
+    with pytest.raises(ValueError, match='до первого подменю'):
+        collect_rows(pd.DataFrame([
+            [str(uuid.uuid4()), 'Menu', 'Description', None, None, None],
+            [None, None, str(uuid.uuid4()), 'Dish', 'Description', 1.0],
+        ]))
+
+
+def test_csv_stream_chunks():
+    rows = [('a', 'b "quoted"', 1.5), ('c', '', 2.0), ('d', 'multi,comma', 3.25)]
+    expected = _CsvStream(rows).read()
+
+    assert expected == '"a","b ""quoted""","1.5"\r\n"c","","2.0"\r\n"d","multi,comma","3.25"\r\n'
+
+    stream = _CsvStream(rows)
+    chunks = []
+    while chunk := stream.read(7):
+        assert len(chunk) <= 7
+        chunks.append(chunk)
+    assert ''.join(chunks) == expected
+    assert stream.read() == ''
+
+
+def test_orm_and_copy_produce_same_catalog():
+    results = {}
+    for mode in ('orm', 'copy'):
+        initial = make_workbook()
+        changed = changed_workbook(initial)
+        menu_id = initial.at[0, 0]
+
+        first, second = apply(mode, initial), apply(mode, changed)
+
+        state = snapshot(menu_id)
+        # Идентификаторы отличаются между режимами, сравниваем все остальное
+        results[mode] = {
+            'menu': state['menu'][1],
+            'dishes': sorted((d[2], d[3]) for d in state['dishes']),
+            'changes': (changes(first), changes(second)),
+        }
+        cleanup(menu_id)
+
+    assert results['orm'] == results['copy']
+    assert results['copy']['changes'][1] == {'menus': {'updated': 1}, 'dishes': {'updated': 1, 'created': 1}}
+
+
+def test_copy_deletes_missing_only_when_requested():
+    initial = make_workbook(extra_dish=True)
+    menu_id = initial.at[0, 0]
+    shortened = initial.drop(index=[len(initial) - 1]).reset_index(drop=True)
+    apply('copy', initial)
+
+    apply('copy', shortened)
+    assert len(snapshot(menu_id)['dishes']) == 3, 'Без delete_missing блюда не удаляются'
+
+    run = apply('copy', shortened, delete_missing=True)
+    assert len(snapshot(menu_id)['dishes']) == 2
+    assert run.rows['dishes']['deleted'] == 1
+
+    cleanup(menu_id)
+
+
+def test_discover_workbooks(tmp_path):
+    for name in ('b.xlsx', 'A.XLSX', '~$b.xlsx', 'notes.txt'):
+        (tmp_path / name).write_bytes(b'')
+
+    assert discover_workbooks(str(tmp_path)) == [str(tmp_path / 'A.XLSX'), str(tmp_path / 'b.xlsx')]
+    assert discover_workbooks(str(tmp_path / 'missing')) == []
+
+
+def test_split_menu_blocks():
+    df = pd.concat([make_workbook(), make_workbook(price=5.0)], ignore_index=True)
+    blocks = split_menu_blocks(df)
+
+    assert [len(block) for block in blocks] == [4, 4]
+    assert pd.concat(blocks, ignore_index=True).equals(df)
+    # Каждый блок синхронизируется самостоятельно
+    assert all(collect_rows(block)['staging_menus'] for block in blocks)
+
+    message_rows = to_message_rows(blocks[0])
+    assert message_rows[1][0] is None
+    assert collect_rows(pd.DataFrame(message_rows)) == collect_rows(blocks[0])
+
+
+def test_aggregate_results():
+    summary = aggregate_results([
+        {'source': 'a.xlsx', 'status': 'success', 'phases': {'read': 1.0, 'write': 2.0},
+         'rows': {'dishes': {'created': 2, 'unchanged': 1}}},
+        {'source': 'b.xlsx#2', 'status': 'failed', 'error': 'boom', 'phases': {'read': 0.5}, 'rows': {}},
+        {'source': 'c.xlsx', 'status': 'success', 'phases': {}, 'rows': {'dishes': {'unchanged': 3}}},
+    ])
+
+    assert summary['tasks'] == 3
+    assert summary['failed'] == [{'source': 'b.xlsx#2', 'error': 'boom'}]
+    assert summary['rows'] == {'dishes': {'created': 2, 'unchanged': 4}}
+    assert summary['slowest_task_s'] == 3.0
+    assert summary['changed'] is True
+
+
+def test_engine_pool_is_replaced_after_fork(monkeypatch):
+    monkeypatch.setenv('DB_POOL_SIZE', '7')
+    monkeypatch.setenv('DB_POOL_PRE_PING', 'false')
+    assert pool_options()['pool_size'] == 7
+    assert pool_options()['pool_pre_ping'] is False
+
+    parent_pool = engine.pool
+    reset_engine_after_fork()
+    assert engine.pool is not parent_pool
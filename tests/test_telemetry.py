@@ -0,0 +1,74 @@
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+from telemetry import RunTelemetry
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_phase_accumulates_duration():
+    run = RunTelemetry('orm', 'test')
+
+    with run.phase('diff'):
+        time.sleep(0.01)
+    with run.phase('diff'):
+        time.sleep(0.01)
+
+    assert run.phases['diff'] >= 0.02
+    assert 'invalidate' not in run.phases, 'Невыполненная фаза не должна учитываться'
+
+    with pytest.raises(ValueError):
+        with run.phase('unknown'):
+            pass
+
+
+def test_phase_records_failed_phase():
+    run = RunTelemetry('orm', 'test')
+
+    with pytest.raises(RuntimeError):
+        with run.phase('write'):
+            raise RuntimeError('boom')
+
+    assert run.failed_phase == 'write'
+    assert 'write' in run.phases
+
+
+def test_count_and_changed():
+    run = RunTelemetry('copy', 'test')
+    run.count('dishes', 'unchanged', 5)
+    assert not run.changed
+
+    run.count('dishes', 'updated')
+    run.count('dishes', 'updated', 2)
+    assert run.changed
+    assert run.rows == {'dishes': {'unchanged': 5, 'updated': 3}}
+
+
+def test_finish_publishes_metrics():
+    rows_before = sample('sync_rows_total', mode='telemetry-test', entity='menus', operation='created')
+    runs_before = sample('sync_runs_total', mode='telemetry-test', status='failed')
+    failures_before = sample('sync_failures_total', mode='telemetry-test', phase='read')
+    observed_before = sample('sync_phase_duration_seconds_count', mode='telemetry-test', phase='read')
+
+    run = RunTelemetry('telemetry-test', 'test')
+    with pytest.raises(OSError):
+        with run.phase('read'):
+            raise OSError('file not found')
+    run.count('menus', 'created', 2)
+
+    summary = run.finish('failed', 'file not found')
+
+    assert summary.status == 'failed'
+    assert summary.error == 'file not found'
+    assert summary.phases == run.phases
+    assert summary.rows == {'menus': {'created': 2}}
+    assert summary.duration >= 0
+
+    assert sample('sync_rows_total', mode='telemetry-test', entity='menus', operation='created') == rows_before + 2
+    assert sample('sync_runs_total', mode='telemetry-test', status='failed') == runs_before + 1
+    assert sample('sync_failures_total', mode='telemetry-test', phase='read') == failures_before + 1
+    assert sample('sync_phase_duration_seconds_count', mode='telemetry-test', phase='read') == observed_before + 1
+    assert sample('sync_phase_duration_seconds_count', mode='telemetry-test', phase='invalidate') == 0
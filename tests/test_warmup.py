@@ -0,0 +1,50 @@
+from conftest import DATABASE_URL_TEST, app, engine_test
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from my_app import warmup
+
+
+async def test_warm_pool_fills_pool():
+    engine = create_async_engine(DATABASE_URL_TEST, pool_size=3)
+    try:
+        # Больше соединений, чем размер пула, не открывается
+        assert await warmup.warm_pool(engine, connections=5) == 3
+        assert engine.sync_engine.pool.checkedin() == 3
+    finally:
+        await engine.dispose()
+
+
+async def test_ready_after_warm_up(ac: AsyncClient, monkeypatch):
+    requested = []
+    original_warm_cache = warmup.warm_cache
+
+    async def warm_cache(app, paths=warmup.WARMUP_PATHS):
+        requested.extend(paths)
+        await original_warm_cache(app, paths)
+
+    monkeypatch.setattr(warmup, 'warm_cache', warm_cache)
+    monkeypatch.setattr(app.state, 'ready', False)
+
+    response = await ac.get('/ready')
+    assert response.status_code == 503
+
+    await warmup.warm_up(app, engine_test)
+
+    assert requested == ['/api/v1/menus/', '/api/v1/menus/all']
+    response = await ac.get('/ready')
+    assert response.status_code == 200
+    assert response.json() == {'status': 'ready'}
+
+
+async def test_failed_warm_up_still_becomes_ready(ac: AsyncClient, monkeypatch):
+    async def warm_pool(engine):
+        raise OSError('connection refused')
+
+    monkeypatch.setattr(warmup, 'warm_pool', warm_pool)
+    monkeypatch.setattr(app.state, 'ready', False)
+
+    await warmup.warm_up(app, engine_test)
+
+    response = await ac.get('/ready')
+    assert response.status_code == 200